@@ -0,0 +1,145 @@
+"""Benchmark de capacidad de espectadores concurrentes del streaming de videos.
+
+Abre N descargas simultáneas de un video y, mientras tanto, mide la latencia de
+``/healthz/`` para comprobar si el resto del API sigue respondiendo. Con el streaming
+síncrono cada bloque leído ocupa uno de los 40 hilos del threadpool de Starlette mientras
+espera a MongoDB, así que con muchos espectadores las rutas síncronas como ``/healthz/``
+esperan turno y el caudal total queda limitado por el threadpool; con el streaming
+asíncrono las esperas no ocupan hilos. Los resultados medidos están en ``README.md``.
+
+Uso (con el servidor corriendo y un video ya subido):
+
+    python benchmarks/video_concurrencia.py --url http://localhost:8000 \\
+        --video <video_id> --espectadores 10 50 100 200
+
+Para comparar antes y después se ejecuta el mismo comando contra el servidor levantado
+desde la versión anterior del endpoint y desde la actual.
+
+Solo usa la biblioteca estándar.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List, Tuple
+from urllib.parse import urlsplit
+
+
+TAMANO_LECTURA = 64 * 1024
+"""Bytes que lee el cliente en cada llamada al socket."""
+
+
+async def peticion(host: str, puerto: int, ruta: str) -> Tuple[int, int]:
+    """Hace una petición GET HTTP/1.1 y descarga el cuerpo completo.
+
+    Args:
+        host: Host del servidor
+        puerto: Puerto del servidor
+        ruta: Ruta a pedir
+
+    Returns:
+        Tupla (código de estado, bytes recibidos en el cuerpo)
+    """
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    escritor.write(
+        f"GET {ruta} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode("ascii")
+    )
+    await escritor.drain()
+
+    estado = int((await lector.readline()).split()[1])
+    while (await lector.readline()) not in (b"\r\n", b""):
+        pass
+
+    recibidos = 0
+    while True:
+        datos = await lector.read(TAMANO_LECTURA)
+        if not datos:
+            break
+        recibidos += len(datos)
+
+    escritor.close()
+    await escritor.wait_closed()
+    return estado, recibidos
+
+
+async def sondear(host: str, puerto: int, fin: asyncio.Event) -> List[float]:
+    """Mide la latencia de /healthz/ repetidamente hasta que termine la carga.
+
+    Args:
+        host: Host del servidor
+        puerto: Puerto del servidor
+        fin: Evento que indica que terminaron las descargas
+
+    Returns:
+        Lista de latencias en milisegundos
+    """
+    latencias = []
+    while not fin.is_set():
+        inicio = time.perf_counter()
+        await peticion(host, puerto, "/healthz/")
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        await asyncio.sleep(0.05)
+    return latencias
+
+
+async def medir(host: str, puerto: int, video: str, espectadores: int) -> dict:
+    """Ejecuta una ronda con un número de espectadores concurrentes.
+
+    Args:
+        host: Host del servidor
+        puerto: Puerto del servidor
+        video: ID del video en GridFS
+        espectadores: Número de descargas simultáneas
+
+    Returns:
+        dict: Métricas de la ronda
+    """
+    fin = asyncio.Event()
+    sonda = asyncio.create_task(sondear(host, puerto, fin))
+
+    inicio = time.perf_counter()
+    resultados = await asyncio.gather(
+        *(peticion(host, puerto, f"/publicacion/video/{video}") for _ in range(espectadores)),
+        return_exceptions=True,
+    )
+    duracion = time.perf_counter() - inicio
+    fin.set()
+    latencias = await sonda
+
+    exitosas = [r for r in resultados if not isinstance(r, BaseException) and r[0] == 200]
+    total_bytes = sum(recibidos for _, recibidos in exitosas)
+    latencias = latencias or [0.0]
+    return {
+        "espectadores": espectadores,
+        "exitosas": len(exitosas),
+        "segundos": duracion,
+        "mb_por_segundo": total_bytes / duracion / 1e6 if duracion else 0.0,
+        "healthz_p50_ms": statistics.median(latencias),
+        "healthz_max_ms": max(latencias),
+    }
+
+
+async def principal(argumentos: argparse.Namespace) -> None:
+    """Ejecuta las rondas pedidas e imprime la tabla de resultados."""
+    url = urlsplit(argumentos.url)
+    host, puerto = url.hostname or "localhost", url.port or 80
+
+    print(f"{'espect.':>8} {'ok':>5} {'seg':>8} {'MB/s':>8} {'healthz p50':>12} {'max':>9}")
+    for espectadores in argumentos.espectadores:
+        r = await medir(host, puerto, argumentos.video, espectadores)
+        print(
+            f"{r['espectadores']:>8} {r['exitosas']:>5} {r['segundos']:>8.2f} "
+            f"{r['mb_por_segundo']:>8.1f} {r['healthz_p50_ms']:>10.1f}ms "
+            f"{r['healthz_max_ms']:>7.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000", help="URL base del API")
+    parser.add_argument("--video", required=True, help="ID del video en GridFS")
+    parser.add_argument(
+        "--espectadores", type=int, nargs="+", default=[10, 50, 100], help="Rondas a medir"
+    )
+    asyncio.run(principal(parser.parse_args()))
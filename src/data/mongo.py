@@ -1,13 +1,24 @@
 """Conexión con la base de datos de MongoDB."""
 
 import os
+import sys
+from datetime import datetime
 from threading import Lock
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
 from dotenv import load_dotenv
+from bson.objectid import ObjectId
+from pymongo import ASCENDING, DESCENDING, TEXT
+from pymongo import AsyncMongoClient
+from pymongo.errors import OperationFailure
 from pymongo.mongo_client import MongoClient
 from pymongo.server_api import ServerApi
 
 
+BASE_DE_DATOS = "UCOfit"
+"""Nombre de la base de datos de la aplicación."""
+
+
 class MongoDBClientSingleton:
     """Instancia única para conexión con la base de datos de MongoDB."""
 
@@ -61,3 +72,260 @@ class MongoDBClientSingleton:
         """
         db = self.client[database]
         return db[collection]
+
+
+class MongoDBAsyncClientSingleton:
+    """Instancia única del cliente asíncrono de MongoDB.
+
+    Se usa en las rutas ``async`` que transfieren muchos datos, como el streaming de
+    videos, para no ocupar un hilo del threadpool mientras esperan a la base de datos.
+    El cliente se conecta en su primera operación dentro del event loop del servidor.
+    """
+
+    _instance = None
+    """Instancia única de la clase."""
+
+    _lock = Lock()
+    """Lock para la sincronización de la instancia."""
+
+    def __new__(cls):
+        """Crea una instancia única de la clase."""
+        if not cls._instance:
+            with cls._lock:
+                if not cls._instance:
+                    load_dotenv()
+                    mongo_url = os.getenv("MONGO_URI")
+
+                    if not mongo_url:
+                        raise ValueError(
+                            "MONGO_URI no está configurada en las variables de entorno"
+                        )
+
+                    instancia = super(MongoDBAsyncClientSingleton, cls).__new__(cls)
+                    instancia.client = AsyncMongoClient(mongo_url, server_api=ServerApi("1"))
+                    cls._instance = instancia
+        return cls._instance
+
+    def get_database(self, database: str = BASE_DE_DATOS):
+        """Obtiene una base de datos con el cliente asíncrono.
+
+        Args:
+            database: Nombre de la base de datos
+
+        Returns:
+            Base de datos asíncrona
+        """
+        return self.client[database]
+
+    @classmethod
+    async def cerrar(cls) -> None:
+        """Cierra el cliente asíncrono si se llegó a crear.
+
+        Se llama al apagar el servidor, dentro del mismo event loop en el que se usó.
+        """
+        with cls._lock:
+            instancia, cls._instance = cls._instance, None
+        if instancia is not None:
+            await instancia.client.close()
+
+
+class Indice(NamedTuple):
+    """Índice requerido por las consultas de la aplicación."""
+
+    coleccion: str
+    """Nombre de la colección"""
+
+    claves: List[Tuple[str, int]]
+    """Campos y dirección del índice"""
+
+    unico: bool = False
+    """Si el código asume que los valores son únicos"""
+
+    consulta: Optional[Dict[str, Any]] = None
+    """Forma de la consulta que debe resolverse con el índice"""
+
+    orden: Optional[List[Tuple[str, int]]] = None
+    """Orden con el que se ejecuta la consulta"""
+
+    opciones: Optional[Dict[str, Any]] = None
+    """Opciones adicionales de create_index, como el idioma de un índice de texto"""
+
+
+ORDEN_RANKING = [("puntuacion_total", DESCENDING), ("usuario_id", ASCENDING)]
+"""Orden del ranking de usuarios."""
+
+OPCIONES_TEXTO = {
+    "default_language": "spanish",
+    "weights": {"titulo": 3, "descripcion": 1},
+    "name": "busqueda_texto",
+}
+"""Opciones de los índices de búsqueda: raíces en español y más peso al título."""
+
+INDICES = [
+    Indice("usuarios", [("email", ASCENDING)], unico=True, consulta={"email": ""}),
+    Indice("publicacion", [("usuario_id", ASCENDING)], consulta={"usuario_id": ""}),
+    Indice("publicacion", [("video", ASCENDING)], consulta={"video": ""}),
+    Indice(
+        "publicacion",
+        [("reto_id", ASCENDING), ("puntuacion_promedio", DESCENDING), ("_id", ASCENDING)],
+        consulta={"reto_id": ""},
+        orden=[("puntuacion_promedio", DESCENDING), ("_id", ASCENDING)],
+    ),
+    Indice(
+        "retos",
+        [("creador_id", ASCENDING), ("_id", ASCENDING)],
+        consulta={"creador_id": "", "_id": {"$gte": ObjectId("0" * 24)}},
+    ),
+    Indice(
+        "retos",
+        [("fecha_expiracion", ASCENDING)],
+        consulta={"fecha_expiracion": {"$lt": datetime(2000, 1, 1)}},
+    ),
+    Indice(
+        "publicacion",
+        [("titulo", TEXT), ("descripcion", TEXT)],
+        consulta={"$text": {"$search": "reto"}},
+        opciones=OPCIONES_TEXTO,
+    ),
+    Indice(
+        "retos",
+        [("titulo", TEXT), ("descripcion", TEXT)],
+        consulta={"$text": {"$search": "reto"}},
+        opciones=OPCIONES_TEXTO,
+    ),
+    Indice(
+        "publicacion",
+        [("updated_at", ASCENDING), ("_id", ASCENDING)],
+        consulta={"updated_at": {"$gt": datetime(2000, 1, 1)}},
+        orden=[("updated_at", ASCENDING), ("_id", ASCENDING)],
+    ),
+    Indice(
+        "publicacion_eliminada",
+        [("updated_at", ASCENDING), ("_id", ASCENDING)],
+        consulta={"updated_at": {"$gt": datetime(2000, 1, 1)}},
+        orden=[("updated_at", ASCENDING), ("_id", ASCENDING)],
+    ),
+    Indice("publicacion_eliminada", [("expira", ASCENDING)], opciones={"expireAfterSeconds": 0}),
+    Indice("recovery_tokens", [("token", ASCENDING)], unico=True, consulta={"token": ""}),
+    Indice(
+        "fs.chunks",
+        [("files_id", ASCENDING), ("n", ASCENDING)],
+        unico=True,
+        consulta={"files_id": ObjectId("0" * 24), "n": 0},
+    ),
+    Indice("subidas", [("expira", ASCENDING)], consulta={"expira": {"$lt": datetime(2000, 1, 1)}}),
+    Indice(
+        "subidas",
+        [("usuario_id", ASCENDING), ("expira", ASCENDING)],
+        consulta={"usuario_id": "", "expira": {"$gt": datetime(2000, 1, 1)}},
+    ),
+    Indice("ranking", [("email", ASCENDING)], unico=True, consulta={"email": ""}),
+    Indice("ranking", [("usuario_id", ASCENDING)], unico=True, consulta={"usuario_id": ""}),
+    Indice("ranking", ORDEN_RANKING, consulta={}, orden=ORDEN_RANKING),
+    Indice(
+        "ranking",
+        [("ciudad_clave", ASCENDING), *ORDEN_RANKING],
+        consulta={"ciudad_clave": ""},
+        orden=ORDEN_RANKING,
+    ),
+    Indice(
+        "puntuacion_diaria",
+        [("usuario_id", ASCENDING), ("dia", ASCENDING)],
+        unico=True,
+        consulta={"usuario_id": "", "dia": datetime(2000, 1, 1)},
+    ),
+    Indice(
+        "puntuacion_diaria",
+        [("dia", ASCENDING)],
+        consulta={"dia": {"$gte": datetime(2000, 1, 1)}},
+    ),
+]
+"""Registro de los índices de los que dependen las consultas de los routers y servicios."""
+
+
+def crear_indices(collection, nombre: Optional[str] = None) -> List[str]:
+    """Crea en una colección los índices registrados para ella.
+
+    Args:
+        collection: Colección donde se crean los índices
+        nombre: Nombre de la colección en el registro, si difiere del real
+
+    Returns:
+        Lista de errores de los índices que no se pudieron crear
+    """
+    nombre = nombre or collection.name
+    errores = []
+    for indice in INDICES:
+        if indice.coleccion != nombre:
+            continue
+        try:
+            collection.create_index(indice.claves, unique=indice.unico, **(indice.opciones or {}))
+        except OperationFailure as e:
+            errores.append(f"{collection.name} {indice.claves}: {e}")
+    return errores
+
+
+def asegurar_indices() -> List[str]:
+    """Crea o verifica todos los índices del registro.
+
+    Crear un índice que ya existe no tiene efecto. Un índice único falla si la colección
+    ya tiene valores duplicados; en ese caso se informa el error y se continúa con los
+    demás para no impedir el arranque.
+
+    Returns:
+        Lista de errores de los índices que no se pudieron crear
+    """
+    db = MongoDBClientSingleton().client[BASE_DE_DATOS]
+    errores = []
+    for nombre in dict.fromkeys(indice.coleccion for indice in INDICES):
+        errores.extend(crear_indices(db[nombre]))
+
+    for error in errores:
+        print(f"⚠️ No se pudo crear el índice {error}")
+    return errores
+
+
+def _etapas(plan: Any) -> List[str]:
+    """Obtiene recursivamente las etapas de un plan de ejecución."""
+    if isinstance(plan, list):
+        return [etapa for elemento in plan for etapa in _etapas(elemento)]
+    if not isinstance(plan, dict):
+        return []
+
+    etapas = [plan["stage"]] if isinstance(plan.get("stage"), str) else []
+    for valor in plan.values():
+        etapas.extend(_etapas(valor))
+    return etapas
+
+
+def verificar_consultas() -> List[str]:
+    """Verifica con explain() que ninguna consulta registrada recorra la colección.
+
+    Returns:
+        Lista de las consultas cuyo plan ganador incluye un COLLSCAN
+    """
+    db = MongoDBClientSingleton().client[BASE_DE_DATOS]
+    fallos = []
+    for indice in INDICES:
+        if indice.consulta is None:
+            continue
+
+        cursor = db[indice.coleccion].find(indice.consulta)
+        if indice.orden:
+            cursor = cursor.sort(indice.orden)
+
+        plan = cursor.explain().get("queryPlanner", {}).get("winningPlan", {})
+        if "COLLSCAN" in _etapas(plan):
+            fallos.append(f"{indice.coleccion} {indice.consulta} orden={indice.orden}")
+
+    return fallos
+
+
+if __name__ == "__main__":
+    asegurar_indices()
+    consultas_sin_indice = verificar_consultas()
+    for consulta in consultas_sin_indice:
+        print(f"❌ COLLSCAN en {consulta}")
+    if consultas_sin_indice:
+        sys.exit(1)
+    print(f"✅ {len(INDICES)} índices verificados, ninguna consulta recorre la colección")
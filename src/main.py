@@ -1,7 +1,10 @@
 """Punto de inicio del API para la aplicación UCOfit."""
 
+import asyncio
 import importlib
 import pkgutil
+from contextlib import asynccontextmanager, suppress
+
 import uvicorn
 
 from fastapi import FastAPI
@@ -10,6 +13,8 @@ from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from dotenv import load_dotenv
 
+from data.mongo import MongoDBAsyncClientSingleton, asegurar_indices
+from services.cleanup_service import cleanup_service, run_cleanup_service
 from util.path import Path
 from exceptions.custom_exceptions import UCOfitException
 from exceptions.exception_handlers import (
@@ -22,10 +27,30 @@ from exceptions.exception_handlers import (
 
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    """Prepara los índices y las tareas programadas al iniciar y las detiene al apagar.
+
+    Los índices se crean o verifican antes de atender peticiones. El programador de
+    limpieza corre como tarea del event loop y se cancela al apagar el servidor, que
+    también cierra el cliente asíncrono de MongoDB.
+    """
+    asegurar_indices()
+    tarea_limpieza = asyncio.create_task(run_cleanup_service())
+    yield
+    cleanup_service.stop_scheduler()
+    tarea_limpieza.cancel()
+    with suppress(asyncio.CancelledError):
+        await tarea_limpieza
+    await MongoDBAsyncClientSingleton.cerrar()
+
+
 app = FastAPI(
     version="1.0.0",
     title="UCOfit API",
     description="Aplicación de entrenamiento y motivación para el deporte",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -0,0 +1,52 @@
+"""Modelos de las subidas reanudables de videos."""
+
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class SubidaCrearRequest(BaseModel):
+    """Modelo para iniciar una subida reanudable de una publicación."""
+
+    titulo: str
+    """Título de la publicación"""
+
+    descripcion: str
+    """Descripción de la publicación"""
+
+    reto_id: Optional[str] = None
+    """ID del reto al que pertenece la publicación (opcional)"""
+
+    tamano: int = Field(..., gt=0)
+    """Tamaño total del video en bytes"""
+
+    nombre_archivo: Optional[str] = None
+    """Nombre original del archivo de video"""
+
+    content_type: str = "video/mp4"
+    """Tipo de contenido del video"""
+
+
+class SubidaEstadoResponse(BaseModel):
+    """Modelo de respuesta con el avance de una subida."""
+
+    subida_id: str
+    """ID de la subida, que será también el ID del video en GridFS"""
+
+    tamano: int
+    """Tamaño total del video en bytes"""
+
+    tamano_chunk: int
+    """Bytes de cada chunk; solo el último puede ser menor"""
+
+    total_chunks: int
+    """Número de chunks del video"""
+
+    siguiente_chunk: int
+    """Número del siguiente chunk que se debe enviar"""
+
+    offset: int
+    """Bytes recibidos de forma contigua desde el inicio del video"""
+
+    completa: bool
+    """Si ya se recibieron todos los chunks"""
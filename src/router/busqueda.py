@@ -0,0 +1,144 @@
+"""Router para la búsqueda de publicaciones y retos por texto"""
+
+import heapq
+from typing import Optional
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from pymongo import DESCENDING
+
+from router.usuario import datos_usuario
+from router.publicacion import formatear_publicacion
+from router.reto import agregar_creadores, formatear_reto_listado
+from util.load_data import get_mongo_data
+from util.json_utils import limpiar_datos_para_json
+from services.autor_service import autor_service
+from exceptions.custom_exceptions import DatabaseError, ValidationError
+
+
+router = APIRouter(prefix="/buscar", tags=["busqueda"])
+
+
+MAX_BUSQUEDA = 50
+"""Número máximo de resultados por página."""
+
+MAX_PROFUNDIDAD = 500
+"""Posición máxima (offset + limit) alcanzable al paginar los resultados."""
+
+TIPOS = ("publicacion", "reto")
+"""Tipos de resultado que se pueden buscar."""
+
+PUNTAJE = {"$meta": "textScore"}
+"""Relevancia calculada por el índice de texto."""
+
+ORDEN_RELEVANCIA = [("puntaje", PUNTAJE), ("_id", DESCENDING)]
+"""Orden de los resultados: más relevantes primero y, en empate, los más recientes."""
+
+
+def buscar_en(coleccion: str, texto: str, proyeccion: dict, cantidad: int) -> list:
+    """Obtiene los resultados más relevantes de una colección usando su índice de texto.
+
+    Args:
+        coleccion: Nombre de la colección
+        texto: Texto buscado
+        proyeccion: Campos a excluir de los documentos
+        cantidad: Número de resultados a obtener
+
+    Returns:
+        list: Documentos ordenados por relevancia con su puntaje en ``puntaje``
+    """
+    collection = get_mongo_data(coleccion)
+    return list(
+        collection.find({"$text": {"$search": texto}}, {**proyeccion, "puntaje": PUNTAJE})
+        .sort(ORDEN_RELEVANCIA)
+        .limit(cantidad)
+    )
+
+
+@router.get("")
+def buscar(
+    q: str,
+    tipo: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0,
+    _: dict = Depends(datos_usuario),
+) -> JSONResponse:
+    """Busca publicaciones y retos por las palabras de su título o descripción.
+
+    La búsqueda usa los índices de texto en español de ambas colecciones, por lo que
+    reconoce variantes de una palabra ("entrenar", "entrenamiento") e ignora palabras
+    vacías. Los resultados de ambas colecciones se mezclan por relevancia; cada uno
+    indica su ``tipo`` y su ``puntaje``.
+
+    Args:
+        q: Texto a buscar
+        tipo: Restringe la búsqueda a "publicacion" o "reto"
+        limit: Número de resultados por página (máximo MAX_BUSQUEDA)
+        offset: Desplazamiento dentro de los resultados
+        usuario: Datos del usuario autenticado
+
+    Returns:
+        JSONResponse: Página de resultados ordenados por relevancia e indicador ``hay_mas``
+
+    Raises:
+        ValidationError: Si los parámetros no son válidos
+        DatabaseError: Si hay error accediendo a la base de datos
+    """
+    try:
+        texto = q.strip()
+        if not texto:
+            raise ValidationError("Debe indicar un texto para buscar.")
+        if tipo is not None and tipo not in TIPOS:
+            raise ValidationError(f"El tipo debe ser uno de: {', '.join(TIPOS)}.")
+        if not 1 <= limit <= MAX_BUSQUEDA:
+            raise ValidationError(f"El límite debe estar entre 1 y {MAX_BUSQUEDA}.")
+        if offset < 0 or offset + limit > MAX_PROFUNDIDAD:
+            raise ValidationError(
+                f"El desplazamiento más el límite no puede superar {MAX_PROFUNDIDAD}."
+            )
+
+        cantidad = offset + limit
+        fuentes = []
+        if tipo in (None, "publicacion"):
+            proyeccion = {"puntuaciones": 0, "comentarios": 0}
+            publicaciones = buscar_en("publicacion", texto, proyeccion, cantidad + 1)
+            fuentes.append([("publicacion", pub) for pub in publicaciones])
+        if tipo in (None, "reto"):
+            retos = buscar_en("retos", texto, {"publicaciones": 0}, cantidad + 1)
+            fuentes.append([("reto", reto) for reto in retos])
+
+        resultados = list(
+            heapq.merge(*fuentes, key=lambda resultado: resultado[1]["puntaje"], reverse=True)
+        )
+
+        pagina = []
+        for tipo_resultado, documento in resultados[offset:cantidad]:
+            if tipo_resultado == "publicacion":
+                resultado = formatear_publicacion(documento)
+            else:
+                resultado = formatear_reto_listado(documento)
+                resultado["puntaje"] = documento["puntaje"]
+            resultado["tipo"] = tipo_resultado
+            pagina.append(resultado)
+
+        autor_service.agregar_autores(
+            [resultado for resultado in pagina if resultado["tipo"] == "publicacion"]
+        )
+        agregar_creadores([resultado for resultado in pagina if resultado["tipo"] == "reto"])
+
+        return JSONResponse(
+            status_code=200,
+            content=limpiar_datos_para_json(
+                {
+                    "resultados": pagina,
+                    "limit": limit,
+                    "offset": offset,
+                    "hay_mas": len(resultados) > cantidad,
+                }
+            ),
+        )
+
+    except ValidationError:
+        raise
+    except Exception as e:
+        raise DatabaseError(f"Error al buscar: {str(e)}") from e
@@ -9,6 +9,7 @@ from fastapi.responses import JSONResponse
 from model.comentario import ComentarioCrearRequest
 from router.usuario import datos_usuario
 from util.load_data import get_mongo_data
+from services.cache_service import cache_service
 from exceptions.custom_exceptions import DatabaseError, NotFoundError
 
 
@@ -45,12 +46,14 @@ def crear_comentario(
 
         result = collection.update_one(
             {"_id": ObjectId(publicacion_id)},
-            {"$push": {"comentarios": nuevo_comentario}},
+            {"$push": {"comentarios": nuevo_comentario}, "$set": {"updated_at": datetime.now()}},
         )
 
         if result.matched_count == 0:
             raise NotFoundError("Publicación")
 
+        cache_service.invalidar_publicacion(publicacion_id)
+
         return JSONResponse(status_code=201, content={"msg": "Comentario enviado."})
 
     except Exception as e:
@@ -3,6 +3,9 @@
 from fastapi import APIRouter
 from fastapi.responses import JSONResponse
 
+from services.cache_service import cache_service
+from services.video_cache_service import video_cache_service
+
 router = APIRouter(prefix="/healthz")
 
 
@@ -15,3 +18,15 @@ def healthz() -> JSONResponse:
 
     """
     return JSONResponse(status_code=200, content={"msg": "OK"})
+
+
+@router.get(path="/cache")
+def estadisticas_cache() -> JSONResponse:
+    """Endpoint para consultar el uso de los cachés en memoria y de videos en disco.
+    Return:
+    - Un JSONResponse con entradas, aciertos y fallos de cada caché,
+    útil para dimensionarlos.
+
+    """
+    estadisticas = {**cache_service.estadisticas(), "videos": video_cache_service.estadisticas()}
+    return JSONResponse(status_code=200, content=estadisticas)
@@ -1,16 +1,40 @@
 """Módulo para la gestión de los endpoints relacionados con publicaciones."""
 
+import os
 from datetime import datetime
-
-from fastapi import APIRouter, Depends, File, Form, UploadFile
-from fastapi.responses import JSONResponse, StreamingResponse
-from gridfs import GridFS
+from email.utils import format_datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import anyio
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.types import Receive, Scope, Send
+from gridfs import AsyncGridFSBucket, GridFS
+from gridfs.asynchronous.grid_file import AsyncGridOut
 from bson.objectid import ObjectId
+from pymongo import DESCENDING
 
 from router.usuario import datos_usuario
-from util.load_data import get_mongo_data
+from util.load_data import get_async_mongo_db, get_mongo_data
 from util.path import Path
 from util.json_utils import convertir_fechas_a_string
+from util.ndjson import acepta_ndjson, respuesta_ndjson
+from util.http_cache import (
+    etag_coincide,
+    etag_version,
+    fecha_http,
+    respuesta_condicional,
+    respuesta_no_modificada,
+)
+from util.rangos import TAMANO_BLOQUE, RangoNoSatisfacible, parsear_rango, rango_vigente
+from util.subida import FormularioVideo, formulario_openapi, recibir_video
+from services.ranking_service import ranking_service
+from services.autor_service import autor_service
+from services.cache_service import cache_service
+from services.sincronizacion_service import sincronizacion_service
+from services.video_cache_service import MAX_BYTES_VIDEO, EscrituraVideo, video_cache_service
 from model.publicacion import (
     PublicacionCrearResponse,
     PublicacionEditarRequest,
@@ -27,124 +51,405 @@ from exceptions.custom_exceptions import (
 router = APIRouter(prefix="/publicacion", tags=["Publicacion"])
 
 
-@router.post("/crear")
-def crear_publicacion(
-    titulo: str = Form(...),
-    descripcion: str = Form(...),
-    reto_id: str = Form(None),
-    video: UploadFile = File(...),
+LIMITE_FEED = 20
+"""Número de publicaciones por página del feed si no se indica un límite."""
+
+MAX_FEED = 50
+"""Número máximo de publicaciones por página del feed."""
+
+MAX_BATCH = 50
+"""Número máximo de publicaciones que se pueden pedir en un lote."""
+
+MAX_SUBRECURSO = 100
+"""Número máximo de comentarios o puntuaciones por página."""
+
+CACHE_CONTROL_PUBLICACION = "public, no-cache"
+"""Política de caché de una publicación: sus totales cambian a menudo, siempre se revalida."""
+
+CACHE_CONTROL_VIDEO = "public, max-age=31536000, immutable"
+"""Política de caché de los videos: el contenido de un ID de GridFS nunca cambia."""
+
+RESUMEN_PUBLICACION = [
+    {
+        "$addFields": {
+            "total_comentarios": {"$size": {"$ifNull": ["$comentarios", []]}},
+            "total_puntuaciones": {"$size": {"$ifNull": ["$puntuaciones", []]}},
+            "puntuacion_promedio": {"$ifNull": ["$puntuacion_promedio", 0]},
+        }
+    },
+    {"$project": {"puntuaciones": 0, "comentarios": 0}},
+]
+"""Etapas que reemplazan los arreglos embebidos por sus totales."""
+
+
+def formatear_publicacion(pub: dict) -> dict:
+    """Prepara una publicación para serializarla como JSON.
+
+    Args:
+        pub: Documento de la publicación
+
+    Returns:
+        dict: Publicación con IDs en texto, URL del video y fechas en texto
+    """
+    if "_id" in pub:
+        pub["_id"] = str(pub["_id"])
+    if "video" in pub and isinstance(pub["video"], str):
+        video_id = str(pub["video"])
+        pub["video_url"] = f"{Path.VIDEO}/{video_id}"
+        pub["video"] = video_id
+
+    convertir_fechas_a_string(pub)
+    return pub
+
+
+def publicaciones_con_autor(publicaciones: Iterable[dict]) -> Iterator[dict]:
+    """Formatea y agrega el autor a las publicaciones de un cursor por lotes.
+
+    Los autores se resuelven con una consulta por cada MAX_FEED publicaciones, de modo
+    que el streaming no acumula el cursor completo en memoria.
+
+    Args:
+        publicaciones: Cursor de publicaciones
+
+    Returns:
+        Iterator[dict]: Publicaciones listas para serializar
+    """
+    publicaciones = iter(publicaciones)
+    while True:
+        lote = [formatear_publicacion(pub) for pub in islice(publicaciones, MAX_FEED)]
+        if not lote:
+            return
+        yield from autor_service.agregar_autores(lote)
+
+
+def validar_formulario_publicacion(campos: Dict[str, str]) -> None:
+    """Valida los campos de texto del formulario de creación de una publicación.
+
+    Args:
+        campos: Campos del formulario (titulo, descripcion y opcionalmente reto_id)
+
+    Raises:
+        ValidationError: Si el título o la descripción no son válidos
+        NotFoundError: Si el reto no existe
+        BusinessLogicError: Si el reto ha expirado
+    """
+    if not 5 <= len(campos["titulo"]) <= 30:
+        raise ValidationError("El título debe tener entre 5 y 30 caracteres.")
+
+    if not 10 <= len(campos["descripcion"]) <= 100:
+        raise ValidationError("La descripción debe tener entre 10 y 100 caracteres.")
+
+    reto_id = campos.get("reto_id")
+    if reto_id:
+        if not ObjectId.is_valid(reto_id):
+            raise NotFoundError("Reto")
+
+        retos_collection = get_mongo_data("retos")
+        reto = retos_collection.find_one({"_id": ObjectId(reto_id)}, {"fecha_expiracion": 1})
+
+        if not reto:
+            raise NotFoundError("Reto")
+
+        if datetime.now() > reto["fecha_expiracion"]:
+            raise BusinessLogicError("El reto ha expirado")
+
+
+def guardar_publicacion(formulario: FormularioVideo, usuario: dict) -> PublicacionCrearResponse:
+    """Guarda la publicación de un formulario cuyo video ya está en GridFS.
+
+    Args:
+        formulario: Campos validados e ID del video
+        usuario: Datos del usuario autenticado
+
+    Returns:
+        PublicacionCrearResponse: Respuesta con el ID de la publicación creada
+    """
+    collection = get_mongo_data("publicacion")
+    reto_id = formulario.campos.get("reto_id")
+
+    publicacion_doc = {
+        "titulo": formulario.campos["titulo"],
+        "descripcion": formulario.campos["descripcion"],
+        "video": str(formulario.video_id),
+        "usuario_id": usuario["email"],
+        "puntuaciones": [],
+        "puntuacion_promedio": 0,
+        "updated_at": datetime.now(),
+    }
+
+    if reto_id:
+        publicacion_doc["reto_id"] = reto_id
+
+    result = collection.insert_one(publicacion_doc)
+    publicacion_id = str(result.inserted_id)
+    ranking_service.registrar_publicacion(usuario["email"])
+    ranking_service.actualizar_publicacion_reto({**publicacion_doc, "_id": result.inserted_id})
+
+    return PublicacionCrearResponse(
+        msg="Publicación creada con éxito",
+        publicacion_id=publicacion_id,
+        video_id=str(formulario.video_id),
+        reto_id=reto_id or "",
+    )
+
+
+def buscar_publicacion_de_video(video_id: ObjectId) -> Optional[PublicacionCrearResponse]:
+    """Busca la publicación ya creada con un video, para completar una creación interrumpida.
+
+    Args:
+        video_id: ID del video en GridFS
+
+    Returns:
+        PublicacionCrearResponse: Misma respuesta que ``guardar_publicacion``, o None si
+        ninguna publicación usa el video
+    """
+    publicacion = get_mongo_data("publicacion").find_one({"video": str(video_id)}, {"reto_id": 1})
+    if not publicacion:
+        return None
+
+    return PublicacionCrearResponse(
+        msg="Publicación creada con éxito",
+        publicacion_id=str(publicacion["_id"]),
+        video_id=str(video_id),
+        reto_id=publicacion.get("reto_id") or "",
+    )
+
+
+@router.post(
+    "/crear", openapi_extra=formulario_openapi("video", ["titulo", "descripcion"], ["reto_id"])
+)
+async def crear_publicacion(
+    request: Request,
     usuario: dict = Depends(datos_usuario),
 ) -> PublicacionCrearResponse:
     """Crea una nueva publicación en la base de datos.
 
-    Args:
+    El formulario multipart/form-data se lee a medida que llega y el video se escribe
+    directamente en GridFS, sin guardarlo antes en un archivo temporal. Conviene enviar
+    los campos de texto antes del video para que se validen sin subirlo.
+
+    Campos del formulario:
         titulo: Título de la publicación
         descripcion: Descripción de la publicación
-        reto_id: ID del reto
-        video: Archivo de video enviado como multipart/form-data
+        reto_id: ID del reto (opcional)
+        video: Archivo de video
+
+    Args:
+        request: Petición HTTP con el formulario
         usuario: Datos del usuario autenticado
 
     Returns:
         PublicacionCrearResponse: Respuesta con el ID de la publicación creada
 
     Raises:
+        ValidationError: Si los campos no son válidos
         NotFoundError: Si el reto no existe
         BusinessLogicError: Si el reto ha expirado
-        FileError: Si hay error procesando el archivo
+        FileError: Si el video no es válido o supera el tamaño máximo
         DatabaseError: Si hay error en la base de datos
     """
     try:
+        formulario = await recibir_video(
+            request, "video", ("titulo", "descripcion"), validar_formulario_publicacion
+        )
+        return await run_in_threadpool(guardar_publicacion, formulario, usuario)
+
+    except (ValidationError, NotFoundError, BusinessLogicError, FileError):
+        raise
+    except Exception as e:
+        raise DatabaseError(f"Error al crear la publicación: {str(e)}") from e
 
-        if not 5 <= len(titulo) <= 30:
-            raise ValidationError("El título debe tener entre 5 y 30 caracteres.")
 
-        if not 10 <= len(descripcion) <= 100:
-            raise ValidationError("La descripción debe tener entre 10 y 100 caracteres.")
+@router.get("/general")
+def listar_publicaciones(
+    request: Request,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    _: dict = Depends(datos_usuario),
+) -> JSONResponse:
+    """Lista las publicaciones de la más reciente a la más antigua, paginadas por cursor.
+
+    La paginación es por keyset sobre ``_id``: cada respuesta incluye
+    ``siguiente_cursor``, que se envía en la siguiente petición para continuar justo
+    después de la última publicación recibida. Los listados incluyen los totales de
+    comentarios y puntuaciones en lugar de los arreglos completos, y los datos visibles
+    del autor en ``autor``.
 
-        if reto_id:
-            retos_collection = get_mongo_data("retos")
-            reto = retos_collection.find_one({"_id": ObjectId(reto_id)})
+    Con ``Accept: application/x-ndjson`` las publicaciones se envían en streaming, una
+    por línea, desde el cursor; en ese modo el límite es opcional y no tiene máximo.
+
+    Args:
+        request: Petición HTTP
+        limit: Número de publicaciones por página (LIMITE_FEED por defecto, máximo MAX_FEED)
+        cursor: Cursor de la página anterior
+        usuario: Datos del usuario autenticado
 
-            if not reto:
-                raise NotFoundError("Reto")
+    Returns:
+        JSONResponse: Página de publicaciones con URLs de video y el cursor siguiente
 
-            if datetime.now() > reto["fecha_expiracion"]:
-                raise BusinessLogicError("El reto ha expirado")
+    Raises:
+        ValidationError: Si el límite o el cursor no son válidos
+        DatabaseError: Si hay error accediendo a la base de datos
+    """
+    try:
+        filtro = {}
+        if cursor is not None:
+            if not ObjectId.is_valid(cursor):
+                raise ValidationError("Cursor inválido.")
+            filtro["_id"] = {"$lt": ObjectId(cursor)}
 
         collection = get_mongo_data("publicacion")
-        db = collection.database
-        fs = GridFS(db)
 
-        file_id = fs.put(
-            video.file,
-            filename=video.filename,
-            content_type=video.content_type or "video/mp4",
-        )
+        if acepta_ndjson(request):
+            if limit is not None and limit < 1:
+                raise ValidationError("El límite debe ser mayor que cero.")
 
-        publicacion_doc = {
-            "titulo": titulo,
-            "descripcion": descripcion,
-            "video": str(file_id),
-            "usuario_id": usuario["email"],
-            "puntuaciones": [],
-            "puntuacion_promedio": 0,
-        }
+            etapas = [{"$match": filtro}, {"$sort": {"_id": DESCENDING}}]
+            if limit is not None:
+                etapas.append({"$limit": limit})
+            cursor_publicaciones = collection.aggregate(
+                [*etapas, *RESUMEN_PUBLICACION], batchSize=MAX_FEED
+            )
+            return respuesta_ndjson(publicaciones_con_autor(cursor_publicaciones))
+
+        if limit is None:
+            limit = LIMITE_FEED
+        if not 1 <= limit <= MAX_FEED:
+            raise ValidationError(f"El límite debe estar entre 1 y {MAX_FEED}.")
+
+        publicaciones = list(
+            collection.aggregate(
+                [
+                    {"$match": filtro},
+                    {"$sort": {"_id": DESCENDING}},
+                    {"$limit": limit + 1},
+                    *RESUMEN_PUBLICACION,
+                ]
+            )
+        )
 
-        if reto_id:
-            publicacion_doc["reto_id"] = reto_id
+        siguiente_cursor = None
+        if len(publicaciones) > limit:
+            publicaciones = publicaciones[:limit]
+            siguiente_cursor = str(publicaciones[-1]["_id"])
 
-        result = collection.insert_one(publicacion_doc)
-        publicacion_id = str(result.inserted_id)
+        publicaciones = [formatear_publicacion(pub) for pub in publicaciones]
+        autor_service.agregar_autores(publicaciones)
 
-        return PublicacionCrearResponse(
-            msg="Publicación creada con éxito",
-            publicacion_id=publicacion_id,
-            video_id=str(file_id),
-            reto_id=reto_id or "",
+        return JSONResponse(
+            content={"publicaciones": publicaciones, "siguiente_cursor": siguiente_cursor},
+            status_code=200,
         )
 
-    except (ValidationError, NotFoundError, BusinessLogicError, FileError):
+    except ValidationError:
         raise
     except Exception as e:
-        raise DatabaseError(f"Error al crear la publicación: {str(e)}") from e
+        raise DatabaseError(f"Error al listar publicaciones: {str(e)}") from e
 
 
-@router.get("/general")
-def listar_publicaciones(_: dict = Depends(datos_usuario)) -> JSONResponse:
-    """Lista todas las publicaciones disponibles con URLs de video integradas.
+@router.get("/cambios")
+def obtener_cambios_publicaciones(
+    desde: Optional[str] = None, limit: int = MAX_FEED, _: dict = Depends(datos_usuario)
+) -> JSONResponse:
+    """Lista las publicaciones creadas, modificadas o eliminadas desde la última sincronización.
+
+    La primera sincronización se hace sin ``desde`` y entrega todas las publicaciones.
+    Cada respuesta incluye ``siguiente_cursor``, que se guarda y se envía como ``desde``
+    en la siguiente sincronización para recibir solo lo que cambió; si ``hay_mas`` es
+    verdadero se pide de inmediato la página siguiente. Cuando ``completa`` es verdadero
+    el cliente debe descartar su copia local, porque el cursor era demasiado antiguo.
 
     Args:
+        desde: Cursor de la última sincronización
+        limit: Número máximo de cambios por respuesta (máximo MAX_FEED)
         usuario: Datos del usuario autenticado
 
     Returns:
-        JSONResponse: Lista de publicaciones con URLs de video
+        JSONResponse: Publicaciones actualizadas, IDs eliminados y el cursor siguiente
 
     Raises:
+        ValidationError: Si el límite o el cursor no son válidos
         DatabaseError: Si hay error accediendo a la base de datos
     """
     try:
-        collection = get_mongo_data("publicacion")
-        publicaciones = list(collection.find())
+        if not 1 <= limit <= MAX_FEED:
+            raise ValidationError(f"El límite debe estar entre 1 y {MAX_FEED}.")
+
+        cambios = sincronizacion_service.obtener_cambios(desde, limit, RESUMEN_PUBLICACION)
+        cambios["actualizadas"] = [formatear_publicacion(pub) for pub in cambios["actualizadas"]]
+        autor_service.agregar_autores(cambios["actualizadas"])
+
+        return JSONResponse(content=cambios, status_code=200)
+
+    except ValidationError:
+        raise
+    except Exception as e:
+        raise DatabaseError(f"Error al obtener los cambios de publicaciones: {str(e)}") from e
 
-        for pub in publicaciones:
-            if "_id" in pub:
-                pub["_id"] = str(pub["_id"])
-            if "video" in pub and isinstance(pub["video"], str):
-                video_id = str(pub["video"])
-                pub["video_url"] = f"{Path.VIDEO}/{video_id}"
-                pub["video"] = video_id
 
-            convertir_fechas_a_string(pub)
+@router.get("/batch")
+def obtener_publicaciones_batch(ids: List[str] = Query(...)) -> JSONResponse:
+    """Devuelve varias publicaciones por ID con una sola consulta.
+
+    Los IDs se reciben separados por comas (``?ids=a,b,c``) o repitiendo el parámetro.
+    Las publicaciones se devuelven en el orden pedido; las que no existen o tienen un
+    ID inválido se marcan con ``encontrada: false``.
+
+    Args:
+        ids: IDs de las publicaciones (máximo MAX_BATCH)
+
+    Returns:
+        JSONResponse: Publicaciones en el orden pedido, con sus autores
+
+    Raises:
+        ValidationError: Si no se envían IDs o se supera el máximo
+        DatabaseError: Si hay error accediendo a la base de datos
+    """
+    try:
+        solicitados = [
+            publicacion_id.strip()
+            for valor in ids
+            for publicacion_id in valor.split(",")
+            if publicacion_id.strip()
+        ]
+        if not solicitados:
+            raise ValidationError("Debe indicar al menos un ID de publicación.")
+        if len(solicitados) > MAX_BATCH:
+            raise ValidationError(f"Se pueden pedir como máximo {MAX_BATCH} publicaciones.")
+
+        validos = {str(ObjectId(pid)) for pid in solicitados if ObjectId.is_valid(pid)}
+        collection = get_mongo_data("publicacion")
+        encontradas = {
+            pub["_id"]: pub
+            for pub in publicaciones_con_autor(
+                collection.aggregate(
+                    [
+                        {"$match": {"_id": {"$in": [ObjectId(pid) for pid in validos]}}},
+                        *RESUMEN_PUBLICACION,
+                    ]
+                )
+            )
+        }
+
+        publicaciones = []
+        for pid in solicitados:
+            publicacion = encontradas.get(str(ObjectId(pid))) if ObjectId.is_valid(pid) else None
+            if publicacion is None:
+                publicaciones.append({"_id": pid, "encontrada": False})
+            else:
+                publicaciones.append({**publicacion, "encontrada": True})
 
         return JSONResponse(content={"publicaciones": publicaciones}, status_code=200)
 
+    except ValidationError:
+        raise
     except Exception as e:
-        raise DatabaseError(f"Error al listar publicaciones: {str(e)}") from e
+        raise DatabaseError(f"Error al obtener las publicaciones: {str(e)}") from e
 
 
 @router.get("/reto/{reto_id}")
 def listar_publicaciones_reto(reto_id: str, _: dict = Depends(datos_usuario)) -> JSONResponse:
-    """Lista todas las publicaciones de un reto específico.
+    """Lista todas las publicaciones de un reto específico con los datos de sus autores.
 
     Args:
         reto_id: ID del reto
@@ -158,17 +463,13 @@ def listar_publicaciones_reto(reto_id: str, _: dict = Depends(datos_usuario)) ->
     """
     try:
         collection = get_mongo_data("publicacion")
-        publicaciones = list(collection.find({"reto_id": reto_id}))
-
-        for pub in publicaciones:
-            if "_id" in pub:
-                pub["_id"] = str(pub["_id"])
-            if "video" in pub and isinstance(pub["video"], str):
-                video_id = str(pub["video"])
-                pub["video_url"] = f"{Path.VIDEO}/{video_id}"
-                pub["video"] = video_id
-
-            convertir_fechas_a_string(pub)
+        publicaciones = [
+            formatear_publicacion(pub)
+            for pub in collection.aggregate(
+                [{"$match": {"reto_id": reto_id}}, *RESUMEN_PUBLICACION]
+            )
+        ]
+        autor_service.agregar_autores(publicaciones)
 
         return JSONResponse(content={"publicaciones": publicaciones}, status_code=200)
 
@@ -176,41 +477,200 @@ def listar_publicaciones_reto(reto_id: str, _: dict = Depends(datos_usuario)) ->
         raise DatabaseError(f"Error al listar publicaciones del reto: {str(e)}") from e
 
 
+class RespuestaGridFS(StreamingResponse):
+    """Respuesta en streaming que cierra el archivo de GridFS al terminar.
+
+    El generador del cuerpo no llega a ejecutarse si el cliente se desconecta antes de
+    empezar a recibirlo, así que el archivo, y la escritura en la caché de videos si la
+    hay, se cierran aquí y no en el generador.
+    """
+
+    def __init__(
+        self,
+        grid_out: AsyncGridOut,
+        *args: Any,
+        escritura: Optional[EscrituraVideo] = None,
+        **kwargs: Any,
+    ):
+        super().__init__(*args, **kwargs)
+        self.grid_out = grid_out
+        self.escritura = escritura
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            with anyio.CancelScope(shield=True):
+                if self.escritura is not None:
+                    await run_in_threadpool(self.escritura.cerrar)
+                await self.grid_out.close()
+
+
+async def respuesta_video_en_cache(video_id: str) -> Optional[FileResponse]:
+    """Construye la respuesta de un video guardado en la caché en disco.
+
+    La respuesta de archivo resuelve por sí misma las cabeceras ``Range`` e ``If-Range``
+    con el ETag y la fecha de subida del video, igual que el stream desde GridFS.
+
+    Args:
+        video_id: ID del video en GridFS
+
+    Returns:
+        FileResponse con el video, o None si no está en caché
+    """
+    video = video_cache_service.obtener(video_id)
+    if video is None:
+        return None
+
+    try:
+        stat_result = await run_in_threadpool(os.stat, video["ruta"])
+    except OSError:
+        await run_in_threadpool(video_cache_service.descartar, video_id)
+        return None
+
+    cabeceras = {
+        "Accept-Ranges": "bytes",
+        "ETag": f'"{video_id}"',
+        "Cache-Control": CACHE_CONTROL_VIDEO,
+    }
+    if video.get("upload_date"):
+        fecha = format_datetime(fecha_http(video["upload_date"]), usegmt=True)
+        cabeceras["Last-Modified"] = fecha
+
+    return FileResponse(
+        video["ruta"],
+        media_type=video.get("content_type") or "application/octet-stream",
+        headers=cabeceras,
+        stat_result=stat_result,
+    )
+
+
 @router.get("/video/{video_id}")
-def obtener_video_endpoint(video_id: str) -> StreamingResponse:
+async def obtener_video_endpoint(video_id: str, request: Request) -> StreamingResponse:
     """Devuelve el stream del video almacenado en GridFS por su ID.
 
+    Admite peticiones de rangos de bytes (``Range`` e ``If-Range``) para que los
+    reproductores puedan adelantar y reanudar el video: el archivo se posiciona en el
+    chunk que contiene el primer byte pedido y solo se envían los bytes del rango.
+
+    La lectura usa el cliente asíncrono de GridFS, así que mientras el cliente descarga
+    el video la ruta no ocupa ningún hilo del threadpool que atiende al resto del API.
+
+    Los videos se guardan en una caché en disco a medida que se envían completos;
+    mientras un video siga en ella se envía directamente desde el archivo local, sin
+    consultar MongoDB.
+
     Args:
         video_id: ID del video en GridFS
+        request: Petición HTTP
 
     Returns:
-        StreamingResponse: Stream del video
+        StreamingResponse: Stream del video completo (200) o del rango pedido (206)
 
     Raises:
         NotFoundError: Si el video no existe
         FileError: Si hay error accediendo al archivo
     """
     try:
-        collection = get_mongo_data("publicacion")
-        db = collection.database
-        fs = GridFS(db)
+        try:
+            video_id = str(ObjectId(video_id))
+        except Exception as e:
+            raise NotFoundError("Video") from e
+
+        respuesta = await respuesta_video_en_cache(video_id)
+        if respuesta is not None:
+            return respuesta
+
+        escritura = video_cache_service.reservar(video_id)
+        bucket = AsyncGridFSBucket(get_async_mongo_db())
 
         try:
-            grid_out = fs.get(ObjectId(video_id))
+            grid_out = await bucket.open_download_stream(ObjectId(video_id))
         except Exception as e:
+            if escritura is not None:
+                await run_in_threadpool(escritura.cerrar)
             raise NotFoundError("Video") from e
 
-        def iterfile():
-            chunk = grid_out.read(1024 * 1024)
-            while chunk:
-                yield chunk
-                chunk = grid_out.read(1024 * 1024)
+        try:
+            tamano = grid_out.length
+            etag = f'"{video_id}"'
+            upload_date = getattr(grid_out, "upload_date", None)
+            ultima_modificacion = None
+            if upload_date:
+                ultima_modificacion = format_datetime(fecha_http(upload_date), usegmt=True)
+
+            cabeceras = {
+                "Accept-Ranges": "bytes",
+                "ETag": etag,
+                "Cache-Control": CACHE_CONTROL_VIDEO,
+            }
+            if ultima_modificacion:
+                cabeceras["Last-Modified"] = ultima_modificacion
+
+            rango = None
+            if rango_vigente(request, etag, ultima_modificacion):
+                try:
+                    rango = parsear_rango(request.headers.get("range"), tamano)
+                except RangoNoSatisfacible:
+                    await grid_out.close()
+                    if escritura is not None:
+                        await run_in_threadpool(escritura.cerrar)
+                    return Response(
+                        status_code=416, headers={**cabeceras, "Content-Range": f"bytes */{tamano}"}
+                    )
+
+            inicio, fin = rango if rango else (0, tamano - 1)
+            if inicio:
+                await grid_out.seek(inicio)
+
+            media_type = (
+                getattr(grid_out, "content_type", "application/octet-stream")
+                or "application/octet-stream"
+            )
 
-        media_type = (
-            getattr(grid_out, "content_type", "application/octet-stream")
-            or "application/octet-stream"
-        )
-        return StreamingResponse(iterfile(), media_type=media_type)
+            if escritura is not None and (
+                inicio > 0 or fin < tamano - 1 or tamano > MAX_BYTES_VIDEO
+            ):
+                await run_in_threadpool(escritura.cerrar)
+                escritura = None
+            metadatos = {
+                "tamano": tamano,
+                "content_type": getattr(grid_out, "content_type", None),
+                "upload_date": (
+                    upload_date.isoformat() if isinstance(upload_date, datetime) else None
+                ),
+            }
+
+            async def iterfile():
+                restantes = fin - inicio + 1
+                while restantes > 0:
+                    chunk = await grid_out.read(min(TAMANO_BLOQUE, restantes))
+                    if not chunk:
+                        break
+                    restantes -= len(chunk)
+                    if escritura is not None:
+                        await run_in_threadpool(escritura.escribir, chunk)
+                    yield chunk
+                if escritura is not None and restantes == 0:
+                    await run_in_threadpool(escritura.confirmar, metadatos)
+
+            cabeceras["Content-Length"] = str(max(fin - inicio + 1, 0))
+            if rango:
+                cabeceras["Content-Range"] = f"bytes {inicio}-{fin}/{tamano}"
+
+            return RespuestaGridFS(
+                grid_out,
+                iterfile(),
+                escritura=escritura,
+                status_code=206 if rango else 200,
+                media_type=media_type,
+                headers=cabeceras,
+            )
+        except BaseException:
+            await grid_out.close()
+            if escritura is not None:
+                await run_in_threadpool(escritura.cerrar)
+            raise
 
     except NotFoundError:
         raise
@@ -233,17 +693,13 @@ def listar_publicaciones_usuario(usuario: dict = Depends(datos_usuario)) -> JSON
     """
     try:
         collection = get_mongo_data("publicacion")
-        publicaciones = list(collection.find({"usuario_id": usuario["email"]}))
-
-        for pub in publicaciones:
-            if "_id" in pub:
-                pub["_id"] = str(pub["_id"])
-            if "video" in pub and isinstance(pub["video"], str):
-                video_id = str(pub["video"])
-                pub["video_url"] = f"{Path.VIDEO}/{video_id}"
-                pub["video"] = video_id
-
-            convertir_fechas_a_string(pub)
+        publicaciones = [
+            formatear_publicacion(pub)
+            for pub in collection.aggregate(
+                [{"$match": {"usuario_id": usuario["email"]}}, *RESUMEN_PUBLICACION]
+            )
+        ]
+        autor_service.agregar_autores(publicaciones)
 
         return JSONResponse(content={"publicaciones": publicaciones}, status_code=200)
 
@@ -251,15 +707,128 @@ def listar_publicaciones_usuario(usuario: dict = Depends(datos_usuario)) -> JSON
         raise DatabaseError(f"Error al listar publicaciones del usuario: {str(e)}") from e
 
 
+def paginar_subrecurso(publicacion_id: str, campo: str, limit: int, offset: int) -> dict:
+    """Obtiene una página de un arreglo embebido de la publicación sin leer el resto.
+
+    Args:
+        publicacion_id: ID de la publicación
+        campo: Arreglo a paginar ("comentarios" o "puntuaciones")
+        limit: Número de elementos por página (máximo MAX_SUBRECURSO)
+        offset: Desplazamiento dentro del arreglo
+
+    Returns:
+        dict: Elementos de la página, total del arreglo, límite y desplazamiento
+
+    Raises:
+        ValidationError: Si el ID, el límite o el desplazamiento no son válidos
+        NotFoundError: Si la publicación no existe
+    """
+    if not ObjectId.is_valid(publicacion_id):
+        raise ValidationError("ID de publicación inválido.")
+    if not 1 <= limit <= MAX_SUBRECURSO:
+        raise ValidationError(f"El límite debe estar entre 1 y {MAX_SUBRECURSO}.")
+    if offset < 0:
+        raise ValidationError("El desplazamiento no puede ser negativo.")
+
+    collection = get_mongo_data("publicacion")
+    arreglo = {"$ifNull": [f"${campo}", []]}
+    resultado = next(
+        collection.aggregate(
+            [
+                {"$match": {"_id": ObjectId(publicacion_id)}},
+                {
+                    "$project": {
+                        "_id": 0,
+                        "elementos": {"$slice": [arreglo, offset, limit]},
+                        "total": {"$size": arreglo},
+                    }
+                },
+            ]
+        ),
+        None,
+    )
+
+    if resultado is None:
+        raise NotFoundError("Publicación")
+
+    elementos = [convertir_fechas_a_string(elemento) for elemento in resultado["elementos"]]
+    return {campo: elementos, "total": resultado["total"], "limit": limit, "offset": offset}
+
+
+@router.get("/{publicacion_id}/comentarios")
+def listar_comentarios_publicacion(
+    publicacion_id: str, limit: int = 20, offset: int = 0
+) -> JSONResponse:
+    """Lista los comentarios de una publicación en el orden en que se crearon.
+
+    Args:
+        publicacion_id: ID de la publicación
+        limit: Número de comentarios por página (máximo MAX_SUBRECURSO)
+        offset: Desplazamiento dentro de los comentarios
+
+    Returns:
+        JSONResponse: Página de comentarios y el total de comentarios
+
+    Raises:
+        ValidationError: Si los parámetros no son válidos
+        NotFoundError: Si la publicación no existe
+        DatabaseError: Si hay error accediendo a la base de datos
+    """
+    try:
+        pagina = paginar_subrecurso(publicacion_id, "comentarios", limit, offset)
+        return JSONResponse(content=pagina, status_code=200)
+
+    except (ValidationError, NotFoundError):
+        raise
+    except Exception as e:
+        raise DatabaseError(f"Error al listar los comentarios: {str(e)}") from e
+
+
+@router.get("/{publicacion_id}/puntuaciones")
+def listar_puntuaciones_publicacion(
+    publicacion_id: str, limit: int = 20, offset: int = 0
+) -> JSONResponse:
+    """Lista las puntuaciones de una publicación en el orden en que se registraron.
+
+    Args:
+        publicacion_id: ID de la publicación
+        limit: Número de puntuaciones por página (máximo MAX_SUBRECURSO)
+        offset: Desplazamiento dentro de las puntuaciones
+
+    Returns:
+        JSONResponse: Página de puntuaciones y el total de puntuaciones
+
+    Raises:
+        ValidationError: Si los parámetros no son válidos
+        NotFoundError: Si la publicación no existe
+        DatabaseError: Si hay error accediendo a la base de datos
+    """
+    try:
+        pagina = paginar_subrecurso(publicacion_id, "puntuaciones", limit, offset)
+        return JSONResponse(content=pagina, status_code=200)
+
+    except (ValidationError, NotFoundError):
+        raise
+    except Exception as e:
+        raise DatabaseError(f"Error al listar las puntuaciones: {str(e)}") from e
+
+
 @router.get("/{publicacion_id}")
-def obtener_publicacion(publicacion_id: str) -> JSONResponse:
+def obtener_publicacion(publicacion_id: str, request: Request) -> Response:
     """Devuelve una publicación filtrada por ID.
 
+    Los comentarios y puntuaciones se resumen en sus totales; las listas completas se
+    consultan en ``/publicacion/{publicacion_id}/comentarios`` y ``/puntuaciones``.
+    La publicación se sirve desde el caché de lectura mientras no se modifique, con un
+    ETag derivado de ``updated_at``: al revalidar, el 304 se decide con esa fecha sin
+    cargar ni serializar la publicación.
+
     Args:
         publicacion_id: ID de la publicación a buscar
+        request: Petición HTTP
 
     Returns:
-        JSONResponse: Datos de la publicación encontrada
+        Response: Datos de la publicación encontrada, o 304 si no cambió
 
     Raises:
         NotFoundError: Si la publicación no existe
@@ -267,15 +836,42 @@ def obtener_publicacion(publicacion_id: str) -> JSONResponse:
     """
     try:
         collection = get_mongo_data("publicacion")
-        publicacion = collection.find_one({"_id": ObjectId(publicacion_id)})
+
+        def cargar() -> Optional[dict]:
+            publicacion = next(
+                collection.aggregate(
+                    [{"$match": {"_id": ObjectId(publicacion_id)}}, *RESUMEN_PUBLICACION]
+                ),
+                None,
+            )
+            if publicacion:
+                publicacion["_id"] = str(publicacion["_id"])
+                convertir_fechas_a_string(publicacion)
+            return publicacion
+
+        def leer_version() -> Optional[datetime]:
+            publicacion = collection.find_one({"_id": ObjectId(publicacion_id)}, {"updated_at": 1})
+            return publicacion.get("updated_at") if publicacion else None
+
+        if "if-none-match" in request.headers:
+            etag = etag_version(
+                ObjectId(publicacion_id),
+                cache_service.version_publicacion(publicacion_id, leer_version),
+            )
+            if etag is not None and etag_coincide(request, etag):
+                return respuesta_no_modificada(etag, CACHE_CONTROL_PUBLICACION)
+
+        publicacion = cache_service.obtener_publicacion(publicacion_id, cargar)
 
         if not publicacion:
             raise NotFoundError("Publicación")
 
-        publicacion["_id"] = str(publicacion["_id"])
-        convertir_fechas_a_string(publicacion)
-
-        return JSONResponse(content=publicacion, status_code=200)
+        return respuesta_condicional(
+            request,
+            publicacion,
+            CACHE_CONTROL_PUBLICACION,
+            etag_version(publicacion["_id"], publicacion.get("updated_at")),
+        )
 
     except NotFoundError:
         raise
@@ -324,7 +920,15 @@ def editar_publicacion(
         if not update_data:
             raise ValidationError("No se proporcionaron datos para actualizar")
 
-        result = collection.update_one({"_id": ObjectId(publicacion_id)}, {"$set": update_data})
+        result = collection.update_one(
+            {
+                "_id": ObjectId(publicacion_id),
+                "$or": [{campo: {"$ne": valor}} for campo, valor in update_data.items()],
+            },
+            {"$set": {**update_data, "updated_at": datetime.now()}},
+        )
+        cache_service.invalidar_publicacion(publicacion_id)
+        ranking_service.actualizar_publicacion_reto({**publicacion, **update_data})
 
         if result.modified_count == 0:
             return JSONResponse(
@@ -373,14 +977,19 @@ def eliminar_publicacion(
                 db = collection.database
                 fs = GridFS(db)
                 fs.delete(ObjectId(publicacion["video"]))
+                video_cache_service.descartar(str(publicacion["video"]))
             except Exception as e:
                 raise FileError(f"Error al eliminar video de GridFS: {str(e)}") from e
 
         result = collection.delete_one({"_id": ObjectId(publicacion_id)})
+        cache_service.invalidar_publicacion(publicacion_id)
 
         if result.deleted_count == 0:
             raise DatabaseError("No se pudo eliminar la publicación")
 
+        ranking_service.eliminar_publicacion(publicacion)
+        sincronizacion_service.registrar_eliminacion(publicacion["_id"])
+
         return JSONResponse(content={"msg": "Publicación eliminada con éxito"}, status_code=200)
 
     except (NotFoundError, AuthorizationError, DatabaseError):
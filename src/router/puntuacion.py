@@ -3,17 +3,28 @@
 from datetime import datetime
 from bson import ObjectId
 from fastapi.params import Depends
-from fastapi.responses import JSONResponse
-from fastapi import APIRouter
+from fastapi.responses import JSONResponse, Response
+from fastapi import APIRouter, Request
 
 from model.puntuacion import Puntuacion
 from router.usuario import datos_usuario
 from util.load_data import get_mongo_data
+from util.http_cache import (
+    etag_coincide,
+    etag_version,
+    respuesta_condicional,
+    respuesta_no_modificada,
+)
+from services.ranking_service import ranking_service
+from services.cache_service import cache_service
 from exceptions.custom_exceptions import NotFoundError, BusinessLogicError, DatabaseError
 
 
 router = APIRouter(prefix="/puntuacion", tags=["puntuacion"])
 
+CACHE_CONTROL_PROMEDIO = "public, max-age=10"
+"""Política de caché del promedio: cambia con cada puntuación, se revalida a menudo."""
+
 
 @router.post("/puntuar/{publicacion_id}")
 def puntuar_publicacion(
@@ -43,13 +54,16 @@ def puntuar_publicacion(
 
         # Verificar si el usuario ya puntuó
         ya_puntuado = False
+        puntuacion_anterior = None
+        fecha = datetime.now()
         for i, p in enumerate(puntuaciones_existentes):
             if p.get("usuario_id") == usuario_id:
                 # Si ya puntuó, reemplazar su puntuación anterior
+                puntuacion_anterior = p
                 puntuaciones_existentes[i] = {
                     "usuario_id": usuario_id,
                     "puntuacion": puntuacion.puntuacion,
-                    "fecha": datetime.now(),
+                    "fecha": fecha,
                 }
                 ya_puntuado = True
                 break
@@ -59,21 +73,40 @@ def puntuar_publicacion(
             nueva_puntuacion = {
                 "usuario_id": usuario_id,
                 "puntuacion": puntuacion.puntuacion,
-                "fecha": datetime.now(),
+                "fecha": fecha,
             }
             puntuaciones_existentes.append(nueva_puntuacion)
 
-        collection.update_one(
-            {"_id": ObjectId(publicacion_id)},
-            {"$set": {"puntuaciones": puntuaciones_existentes}},
-        )
-
         promedio = sum(p["puntuacion"] for p in puntuaciones_existentes) / len(
             puntuaciones_existentes
         )
         collection.update_one(
             {"_id": ObjectId(publicacion_id)},
-            {"$set": {"puntuacion_promedio": round(promedio, 2)}},
+            {
+                "$set": {
+                    "puntuaciones": puntuaciones_existentes,
+                    "puntuacion_promedio": round(promedio, 2),
+                    "updated_at": fecha,
+                }
+            },
+        )
+        cache_service.invalidar_publicacion(publicacion_id)
+
+        ranking_service.registrar_puntuacion(
+            publicacion.get("usuario_id", ""),
+            publicacion.get("puntuacion_promedio", 0),
+            round(promedio, 2),
+            not ya_puntuado,
+        )
+        ranking_service.registrar_puntuacion_periodo(
+            publicacion.get("usuario_id", ""), puntuacion.puntuacion, fecha, puntuacion_anterior
+        )
+        ranking_service.actualizar_publicacion_reto(
+            {
+                **publicacion,
+                "puntuaciones": puntuaciones_existentes,
+                "puntuacion_promedio": round(promedio, 2),
+            }
         )
 
         mensaje = "Puntuación actualizada correctamente" if ya_puntuado else "Puntuación registrada correctamente"
@@ -100,27 +133,44 @@ def puntuar_publicacion(
 
 
 @router.get("/promedio/{publicacion_id}")
-def obtener_promedio_puntuacion(publicacion_id: str) -> JSONResponse:
+def obtener_promedio_puntuacion(publicacion_id: str, request: Request) -> Response:
     """Obtiene el promedio de puntuaciones de una publicación
 
+    La respuesta lleva un ETag derivado de ``updated_at``; si no cambió desde la versión
+    que tiene el cliente se responde 304 sin leer las puntuaciones.
+
     Args:
     - publicacion_id: ID de la publicación
+    - request: Petición HTTP
 
     Returns:
-    - JSONResponse con el promedio y detalles de puntuaciones
+    - Response con el promedio y detalles de puntuaciones, o 304
     """
     try:
         collection = get_mongo_data("publicacion")
-        publicacion = collection.find_one({"_id": ObjectId(publicacion_id)})
+        if "if-none-match" in request.headers:
+            version = collection.find_one({"_id": ObjectId(publicacion_id)}, {"updated_at": 1})
+            etag = etag_version(
+                ObjectId(publicacion_id), version.get("updated_at") if version else None
+            )
+            if etag is not None and etag_coincide(request, etag):
+                return respuesta_no_modificada(etag, CACHE_CONTROL_PROMEDIO)
+
+        publicacion = collection.find_one(
+            {"_id": ObjectId(publicacion_id)}, {"puntuaciones": 1, "updated_at": 1}
+        )
         if not publicacion:
             raise NotFoundError("Publicación")
 
         puntuaciones = publicacion.get("puntuaciones", [])
+        etag = etag_version(ObjectId(publicacion_id), publicacion.get("updated_at"))
 
         if not puntuaciones:
-            return JSONResponse(
-                status_code=200,
-                content={"promedio": 0, "total_puntuaciones": 0, "puntuaciones": []},
+            return respuesta_condicional(
+                request,
+                {"promedio": 0, "total_puntuaciones": 0, "puntuaciones": []},
+                CACHE_CONTROL_PROMEDIO,
+                etag,
             )
 
         promedio = sum(p["puntuacion"] for p in puntuaciones) / len(puntuaciones)
@@ -131,13 +181,15 @@ def obtener_promedio_puntuacion(publicacion_id: str) -> JSONResponse:
                 p_formateada["fecha"] = p_formateada["fecha"].isoformat()
             puntuaciones_formateadas.append(p_formateada)
 
-        return JSONResponse(
-            status_code=200,
-            content={
+        return respuesta_condicional(
+            request,
+            {
                 "promedio": round(promedio, 2),
                 "total_puntuaciones": len(puntuaciones),
                 "puntuaciones": puntuaciones_formateadas,
             },
+            CACHE_CONTROL_PROMEDIO,
+            etag,
         )
 
     except Exception as e:
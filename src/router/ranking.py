@@ -1,21 +1,34 @@
 """Router para el sistema de puntuación y ranking"""
 
-from fastapi import APIRouter, Depends
-from fastapi.responses import JSONResponse
-from bson.objectid import ObjectId
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse, Response
 
 from router.usuario import datos_usuario
-from util.load_data import get_mongo_data
 from util.json_utils import limpiar_datos_para_json
-from exceptions.custom_exceptions import DatabaseError
+from util.http_cache import etag_coincide
+from util.path import Path
+from services.ranking_service import ranking_service, TOP_RETO
+from exceptions.custom_exceptions import DatabaseError, NotFoundError, ValidationError
 
 
 router = APIRouter(prefix="/ranking", tags=["ranking"])
 
 
-USUARIOS_COLLECTION = get_mongo_data("usuarios")
-PUBLICACIONES_COLLECTION = get_mongo_data("publicacion")
-PUNTUACIONES_COLLECTION = get_mongo_data("puntuacion")
+MAX_ALREDEDOR = 25
+"""Número máximo de usuarios a cada lado en el ranking alrededor del usuario."""
+
+PERIODOS = ("semanal", "mensual")
+"""Periodos disponibles para el ranking por tiempo."""
+
+CAMPOS_PUNTUACION = (
+    "puntuacion_total",
+    "total_publicaciones",
+    "promedio_puntuacion",
+    "publicaciones_con_puntuacion",
+)
 
 
 def calcular_puntuacion_usuario(usuario_id: str) -> dict:
@@ -28,8 +41,8 @@ def calcular_puntuacion_usuario(usuario_id: str) -> dict:
         dict: Datos de puntuación del usuario
     """
     try:
-        usuario = USUARIOS_COLLECTION.find_one({"_id": ObjectId(usuario_id)})
-        if not usuario:
+        puntuacion = ranking_service.calcular_puntuacion(usuario_id)
+        if not puntuacion:
 
             return {
                 "puntuacion_total": 0.0,
@@ -38,88 +51,145 @@ def calcular_puntuacion_usuario(usuario_id: str) -> dict:
                 "publicaciones_con_puntuacion": 0,
             }
 
-        publicaciones = PUBLICACIONES_COLLECTION.find({"usuario_id": usuario["email"]})
-        publicaciones_list = list(publicaciones)
-
-        puntuacion_total = 0.0
-        publicaciones_con_puntuacion = 0
-        promedio_puntuacion = 0.0
-        total_publicaciones = 0
-
-        for publicacion in publicaciones_list:
-            total_publicaciones += 1
-            puntuacion_total += publicacion.get("puntuacion_promedio", 0)
-            for _ in publicacion.get("puntuaciones"):
-                publicaciones_con_puntuacion += 1
-        if publicaciones_con_puntuacion > 0:
-            promedio_puntuacion = puntuacion_total / publicaciones_con_puntuacion
-        resultado = {
-            "puntuacion_total": round(puntuacion_total, 2),
-            "total_publicaciones": total_publicaciones,
-            "promedio_puntuacion": round(promedio_puntuacion, 2),
-            "publicaciones_con_puntuacion": publicaciones_con_puntuacion,
+        return {
+            campo: valor
+            for campo, valor in ranking_service.formatear_entrada(puntuacion).items()
+            if campo in CAMPOS_PUNTUACION
         }
-        return resultado
 
     except Exception as e:
         raise DatabaseError(f"Error calculando puntuación para {usuario_id}: {str(e)}") from e
 
 
-@router.get("/general")
-def obtener_ranking_general(limit: int = 50, offset: int = 0) -> JSONResponse:
-    """Obtiene el ranking general de usuarios
+def respuesta_ranking(
+    request: Request,
+    limit: int,
+    offset: int,
+    cursor: Optional[str],
+    ciudad: Optional[str] = None,
+) -> Response:
+    """Construye la respuesta paginada del ranking general o de una ciudad
+
+    La respuesta lleva un ETag derivado de la versión del ranking. Si el cliente envía
+    ese ETag en If-None-Match se responde 304 sin consultar la base de datos, y mientras
+    la versión no cambie la página se sirve desde el snapshot ya serializado.
 
     Args:
+        request: Petición HTTP
         limit: Límite de resultados
-        offset: Desplazamiento
+        offset: Desplazamiento (se ignora si se envía cursor)
+        cursor: Cursor de la página anterior
+        ciudad: Ciudad a la que se restringe el ranking
 
     Returns:
-        JSONResponse: Ranking de usuarios
-    """
-    try:
-
-        usuarios = USUARIOS_COLLECTION.find({}, {"password": 0})
-        usuarios_list = list(usuarios)
-        ranking_data = []
-
-        for usuario in usuarios_list:
-            usuario_id = str(usuario["_id"])
-            puntuacion_data = calcular_puntuacion_usuario(usuario_id)
-
-            ranking_data.append(
-                {
-                    "usuario_id": usuario_id,
-                    "nombre": usuario["nombre"],
-                    "apellido": usuario["apellido"],
-                    "email": usuario["email"],
-                    "foto_perfil": usuario.get("foto_perfil"),
-                    "ciudad": usuario.get("ciudad"),
-                    **puntuacion_data,
-                }
-            )
+        Response: Página del ranking o 304 si el cliente ya tiene la versión actual
 
-        ranking_data.sort(key=lambda x: x["puntuacion_total"], reverse=True)
+    Raises:
+        ValidationError: Si el límite o el cursor no son válidos
+    """
+    if limit < 1:
+        raise ValidationError("El límite debe ser mayor que cero.")
 
-        for i, usuario in enumerate(ranking_data):
-            usuario["posicion"] = i + 1
+    etag = ranking_service.etag()
+    if etag_coincide(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
 
-        ranking_paginado = ranking_data[offset : offset + limit]
+    def construir() -> bytes:
+        ranking_paginado, siguiente_cursor = ranking_service.obtener_pagina(
+            limit, offset, cursor, ciudad
+        )
+        total = ranking_service.contar(ciudad)
+        inicio = ranking_paginado[0]["posicion"] - 1 if ranking_paginado else offset
 
         return JSONResponse(
-            status_code=200,
             content=limpiar_datos_para_json(
                 {
                     "ranking": ranking_paginado,
-                    "total": len(ranking_data),
-                    "pagina_actual": (offset // limit) + 1,
-                    "total_paginas": (len(ranking_data) + limit - 1) // limit,
+                    "total": total,
+                    "pagina_actual": (inicio // limit) + 1,
+                    "total_paginas": (total + limit - 1) // limit,
+                    "siguiente_cursor": siguiente_cursor,
                 }
             ),
-        )
+        ).body
+
+    version, contenido = ranking_service.obtener_snapshot(
+        ("ranking", ciudad, limit, offset, cursor), construir
+    )
+
+    return Response(
+        status_code=200,
+        content=contenido,
+        media_type="application/json",
+        headers={"ETag": ranking_service.etag(version), "Cache-Control": "no-cache"},
+    )
+
+
+@router.get("/general")
+def obtener_ranking_general(
+    request: Request, limit: int = 50, offset: int = 0, cursor: Optional[str] = None
+) -> Response:
+    """Obtiene el ranking general de usuarios
+
+    La paginación recomendada es por cursor: cada respuesta incluye
+    ``siguiente_cursor``, que se envía en la siguiente petición para continuar justo
+    después del último usuario recibido. ``offset`` se mantiene por compatibilidad.
+
+    Args:
+        request: Petición HTTP
+        limit: Límite de resultados
+        offset: Desplazamiento (se ignora si se envía cursor)
+        cursor: Cursor de la página anterior
+
+    Returns:
+        Response: Ranking de usuarios o 304 si el cliente ya tiene la versión actual
+    """
+    try:
+        return respuesta_ranking(request, limit, offset, cursor)
+    except ValidationError:
+        raise
     except Exception as e:
         raise DatabaseError(f"Error al obtener el ranking general: {str(e)}") from e
 
 
+@router.get("/ciudad/{ciudad}")
+def obtener_ranking_ciudad(
+    ciudad: str,
+    request: Request,
+    limit: int = 50,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+) -> Response:
+    """Obtiene el ranking de los usuarios de una ciudad
+
+    La ciudad se compara sin distinguir mayúsculas ni tildes, y las posiciones son
+    relativas a la ciudad. La paginación funciona igual que en ``/ranking/general``.
+
+    Args:
+        ciudad: Nombre de la ciudad
+        request: Petición HTTP
+        limit: Límite de resultados
+        offset: Desplazamiento (se ignora si se envía cursor)
+        cursor: Cursor de la página anterior
+
+    Returns:
+        Response: Ranking de la ciudad o 304 si el cliente ya tiene la versión actual
+
+    Raises:
+        ValidationError: Si la ciudad, el límite o el cursor no son válidos
+        DatabaseError: Si hay error accediendo a la base de datos
+    """
+    try:
+        if not ciudad.strip():
+            raise ValidationError("La ciudad no puede estar vacía.")
+
+        return respuesta_ranking(request, limit, offset, cursor, ciudad)
+    except ValidationError:
+        raise
+    except Exception as e:
+        raise DatabaseError(f"Error al obtener el ranking de la ciudad: {str(e)}") from e
+
+
 @router.get("/mi-puntuacion")
 def obtener_mi_puntuacion(usuario: dict = Depends(datos_usuario)) -> JSONResponse:
     """Obtiene la puntuación del usuario autenticado
@@ -132,24 +202,16 @@ def obtener_mi_puntuacion(usuario: dict = Depends(datos_usuario)) -> JSONRespons
     """
     try:
         usuario_id = str(usuario["_id"])
-        puntuacion_data = calcular_puntuacion_usuario(usuario_id)
-
-        usuarios = USUARIOS_COLLECTION.find({}, {"password": 0})
-        ranking_data = []
-
-        for user in usuarios:
-            user_id = str(user["_id"])
-            user_puntuacion = calcular_puntuacion_usuario(user_id)
+        posicion_data = ranking_service.obtener_posicion(usuario_id)
 
-            ranking_data.append({"usuario_id": user_id, **user_puntuacion})
-
-        ranking_data.sort(key=lambda x: x["puntuacion_total"], reverse=True)
-
-        posicion = 0
-        for i, user in enumerate(ranking_data):
-            if user["usuario_id"] == usuario_id:
-                posicion = i + 1
-                break
+        if posicion_data:
+            puntuacion_data = {campo: posicion_data[campo] for campo in CAMPOS_PUNTUACION}
+            posicion = posicion_data["posicion"]
+            por_delante = posicion_data["usuarios_por_delante"]
+        else:
+            puntuacion_data = calcular_puntuacion_usuario(usuario_id)
+            posicion = 0
+            por_delante = 0
 
         return JSONResponse(
             status_code=200,
@@ -164,6 +226,7 @@ def obtener_mi_puntuacion(usuario: dict = Depends(datos_usuario)) -> JSONRespons
                         "ciudad": usuario.get("ciudad"),
                         **puntuacion_data,
                         "posicion": posicion,
+                        "usuarios_por_delante": por_delante,
                     }
                 }
             ),
@@ -171,3 +234,128 @@ def obtener_mi_puntuacion(usuario: dict = Depends(datos_usuario)) -> JSONRespons
 
     except Exception as e:
         raise DatabaseError(f"Error al obtener la puntuación del usuario: {str(e)}") from e
+
+
+@router.get("/reto/{reto_id}")
+def obtener_ranking_reto(reto_id: str, limit: int = 10) -> JSONResponse:
+    """Obtiene las publicaciones mejor puntuadas de un reto
+
+    Args:
+        reto_id: ID del reto
+        limit: Número de publicaciones (entre 1 y 50)
+
+    Returns:
+        JSONResponse: Ranking de publicaciones del reto
+
+    Raises:
+        ValidationError: Si el límite está fuera de rango
+        DatabaseError: Si hay error accediendo a la base de datos
+    """
+    try:
+        if not 1 <= limit <= TOP_RETO:
+            raise ValidationError(f"El límite debe estar entre 1 y {TOP_RETO}.")
+
+        ranking = ranking_service.obtener_top_reto(reto_id, limit)
+        for publicacion in ranking:
+            if publicacion.get("video"):
+                publicacion["video_url"] = f"{Path.VIDEO}/{publicacion['video']}"
+
+        return JSONResponse(
+            status_code=200,
+            content=limpiar_datos_para_json({"reto_id": reto_id, "ranking": ranking}),
+        )
+
+    except ValidationError:
+        raise
+    except Exception as e:
+        raise DatabaseError(f"Error al obtener el ranking del reto: {str(e)}") from e
+
+
+@router.get("/alrededor")
+def obtener_ranking_alrededor(k: int = 5, usuario: dict = Depends(datos_usuario)) -> JSONResponse:
+    """Obtiene los usuarios inmediatamente por encima y por debajo del usuario autenticado
+
+    Args:
+        k: Número de usuarios a cada lado (entre 1 y 25)
+        usuario: Usuario autenticado
+
+    Returns:
+        JSONResponse: Datos del usuario y la ventana del ranking a su alrededor
+
+    Raises:
+        ValidationError: Si k está fuera de rango
+        NotFoundError: Si el usuario no está en el ranking
+        DatabaseError: Si hay error accediendo a la base de datos
+    """
+    try:
+        if not 1 <= k <= MAX_ALREDEDOR:
+            raise ValidationError(f"k debe estar entre 1 y {MAX_ALREDEDOR}.")
+
+        alrededor = ranking_service.obtener_alrededor(str(usuario["_id"]), k)
+        if not alrededor:
+            raise NotFoundError("Usuario en el ranking")
+
+        return JSONResponse(status_code=200, content=limpiar_datos_para_json(alrededor))
+
+    except (ValidationError, NotFoundError):
+        raise
+    except Exception as e:
+        raise DatabaseError(f"Error al obtener el ranking alrededor del usuario: {str(e)}") from e
+
+
+def inicio_periodo(periodo: str) -> datetime:
+    """Calcula la fecha de inicio del periodo actual
+
+    Args:
+        periodo: "semanal" (desde el lunes) o "mensual" (desde el día 1)
+
+    Returns:
+        datetime: Inicio del periodo a medianoche
+    """
+    hoy = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    if periodo == "semanal":
+        return hoy - timedelta(days=hoy.weekday())
+    return hoy.replace(day=1)
+
+
+@router.get("/periodo/{periodo}")
+def obtener_ranking_periodo(periodo: str, limit: int = 50, offset: int = 0) -> JSONResponse:
+    """Obtiene el ranking de usuarios según las puntuaciones recibidas en la semana o el mes
+
+    Args:
+        periodo: "semanal" o "mensual"
+        limit: Límite de resultados
+        offset: Desplazamiento
+
+    Returns:
+        JSONResponse: Ranking de usuarios del periodo
+
+    Raises:
+        ValidationError: Si el periodo no es válido
+        DatabaseError: Si hay error accediendo a la base de datos
+    """
+    try:
+        if periodo not in PERIODOS:
+            raise ValidationError(f"El periodo debe ser uno de: {', '.join(PERIODOS)}.")
+
+        inicio = inicio_periodo(periodo)
+        ranking, total = ranking_service.obtener_pagina_periodo(inicio, limit, offset)
+
+        return JSONResponse(
+            status_code=200,
+            content=limpiar_datos_para_json(
+                {
+                    "periodo": periodo,
+                    "desde": inicio,
+                    "ranking": ranking,
+                    "total": total,
+                    "pagina_actual": (offset // limit) + 1,
+                    "total_paginas": (total + limit - 1) // limit,
+                }
+            ),
+        )
+
+    except ValidationError:
+        raise
+    except Exception as e:
+        raise DatabaseError(f"Error al obtener el ranking del periodo: {str(e)}") from e
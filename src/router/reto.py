@@ -1,10 +1,14 @@
 """Router para la gestión de retos"""
 
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, UploadFile, File, Form
-from fastapi.responses import JSONResponse
+from functools import partial
+from itertools import islice
+from typing import Dict, Iterable, Iterator, Optional
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse, Response
 from bson.objectid import ObjectId
-from gridfs import GridFS
+from starlette.concurrency import run_in_threadpool
 
 from model.reto import (
     Reto,
@@ -18,11 +22,18 @@ from model.publicacion import Publicacion
 from router.usuario import datos_usuario
 from util.load_data import get_mongo_data
 from util.json_utils import limpiar_datos_para_json
+from util.ndjson import acepta_ndjson, respuesta_ndjson
+from util.http_cache import respuesta_condicional
+from util.subida import FormularioVideo, formulario_openapi, recibir_video
+from services.ranking_service import ranking_service
+from services.cache_service import cache_service
 from exceptions.custom_exceptions import (
     DatabaseError,
     BusinessLogicError,
     NotFoundError,
     AuthorizationError,
+    FileError,
+    ValidationError,
 )
 
 
@@ -32,6 +43,23 @@ RETOS_COLLECTION = get_mongo_data("retos")
 USUARIOS_COLLECTION = get_mongo_data("usuarios")
 PUBLICACIONES_COLLECTION = get_mongo_data("publicaciones")
 
+CACHE_CONTROL_RETO = "public, max-age=60"
+"""Política de caché de un reto: cambia poco, se puede reutilizar un minuto."""
+
+CACHE_CONTROL_LISTADO = "public, max-age=30"
+"""Política de caché del listado de retos."""
+
+MAX_LOTE_RETOS = 50
+"""Número de retos cuyos creadores se resuelven en cada consulta."""
+
+CAMPOS_RETO_CON_PUBLICACION = (
+    "titulo_reto",
+    "descripcion_reto",
+    "titulo_publicacion",
+    "descripcion_publicacion",
+)
+"""Campos de texto del formulario de creación de reto con publicación."""
+
 
 def check_user_challenge_limit(user_id: str) -> bool:
     """Verifica si el usuario puede crear más retos este mes
@@ -81,17 +109,85 @@ def crear_reto(reto_data: RetoCrear, usuario: dict = Depends(datos_usuario)) ->
         raise DatabaseError(f"Error al crear el reto: {str(e)}") from e
 
 
+def formatear_reto_listado(reto: dict) -> dict:
+    """Convierte un reto del listado a su respuesta.
+
+    El ``creador_id`` sigue siendo el ID del usuario; ``agregar_creadores`` lo reemplaza
+    por su email para toda una página con una sola consulta.
+
+    Args:
+        reto: Documento del reto
+
+    Returns:
+        dict: Datos del reto para la respuesta
+    """
+    return RetoResponse.from_reto(reto).model_dump()
+
+
+def agregar_creadores(retos: list) -> list:
+    """Reemplaza el ``creador_id`` de cada reto por el email de su creador.
+
+    Args:
+        retos: Retos ya formateados con ``formatear_reto_listado``
+
+    Returns:
+        list: Los mismos retos; si el creador no existe se conserva su ID
+    """
+    ids = {
+        ObjectId(reto["creador_id"])
+        for reto in retos
+        if reto.get("creador_id") and ObjectId.is_valid(reto["creador_id"])
+    }
+    if not ids:
+        return retos
+
+    emails = {
+        str(usuario["_id"]): usuario["email"]
+        for usuario in USUARIOS_COLLECTION.find({"_id": {"$in": list(ids)}}, {"email": 1})
+        if "email" in usuario
+    }
+    for reto in retos:
+        reto["creador_id"] = emails.get(reto.get("creador_id"), reto.get("creador_id"))
+    return retos
+
+
+def retos_con_creador(retos: Iterable[dict]) -> Iterator[dict]:
+    """Formatea retos con el email de su creador, por lotes.
+
+    Los creadores se resuelven con una consulta por cada MAX_LOTE_RETOS retos, de modo
+    que el streaming NDJSON de un listado largo no hace una consulta por reto.
+
+    Args:
+        retos: Cursor de retos
+
+    Returns:
+        Iterator[dict]: Retos listos para serializar
+    """
+    retos = iter(retos)
+    while True:
+        lote = [formatear_reto_listado(reto) for reto in islice(retos, MAX_LOTE_RETOS)]
+        if not lote:
+            return
+        yield from agregar_creadores(lote)
+
+
 @router.get("/listar")
-def listar_retos(activos: bool = True, limit: int = 20, offset: int = 0) -> JSONResponse:
+def listar_retos(
+    request: Request, activos: bool = True, limit: Optional[int] = None, offset: int = 0
+) -> Response:
     """Lista los retos disponibles
 
+    Con ``Accept: application/x-ndjson`` los retos se envían en streaming, uno por
+    línea, a medida que se leen del cursor; en ese modo el límite es opcional.
+
     Args:
+        request: Petición HTTP
         activos: Si solo mostrar retos activos
-        limit: Límite de resultados
+        limit: Límite de resultados (20 por defecto)
         offset: Desplazamiento
 
     Returns:
-        JSONResponse: Lista de retos
+        Response: Lista de retos en JSON o NDJSON, o 304 si el cliente ya tiene el listado
     """
     try:
 
@@ -99,22 +195,20 @@ def listar_retos(activos: bool = True, limit: int = 20, offset: int = 0) -> JSON
         if activos:
             filtro["fecha_expiracion"] = {"$gt": datetime.now()}
 
-        retos = RETOS_COLLECTION.find(filtro).sort("_id", -1).skip(offset).limit(limit)
+        retos = RETOS_COLLECTION.find(filtro).sort("_id", -1).skip(offset)
 
-        retos_list = []
-        for reto in retos:
-            reto_dict = RetoResponse.from_reto(reto).model_dump()
-            creador_id = reto.get("creador_id", "")
-            if creador_id:
-                usuario = USUARIOS_COLLECTION.find_one({"_id": ObjectId(creador_id)})
-                if usuario and "email" in usuario:
-                    reto_dict["creador_id"] = usuario["email"]
+        if acepta_ndjson(request):
+            if limit is not None:
+                retos = retos.limit(limit)
+            return respuesta_ndjson(retos_con_creador(retos))
 
-            retos_list.append(reto_dict)
+        retos = retos.limit(20 if limit is None else limit)
+        retos_list = list(retos_con_creador(retos))
 
-        return JSONResponse(
-            status_code=200,
-            content=limpiar_datos_para_json({"retos": retos_list, "total": len(retos_list)}),
+        return respuesta_condicional(
+            request,
+            limpiar_datos_para_json({"retos": retos_list, "total": len(retos_list)}),
+            CACHE_CONTROL_LISTADO,
         )
 
     except Exception as e:
@@ -122,14 +216,15 @@ def listar_retos(activos: bool = True, limit: int = 20, offset: int = 0) -> JSON
 
 
 @router.get("/{reto_id}")
-def obtener_reto(reto_id: str) -> JSONResponse:
+def obtener_reto(reto_id: str, request: Request) -> Response:
     """Obtiene un reto específico
 
     Args:
         reto_id: ID del reto
+        request: Petición HTTP
 
     Returns:
-        JSONResponse: Datos del reto
+        Response: Datos del reto con su ETag, o 304 si el cliente ya tiene esa versión
     """
     try:
         reto = RETOS_COLLECTION.find_one({"_id": ObjectId(reto_id)})
@@ -139,8 +234,10 @@ def obtener_reto(reto_id: str) -> JSONResponse:
 
         reto_response = RetoResponse.from_reto(reto)
 
-        return JSONResponse(
-            status_code=200, content=limpiar_datos_para_json({"reto": reto_response.model_dump()})
+        return respuesta_condicional(
+            request,
+            limpiar_datos_para_json({"reto": reto_response.model_dump()}),
+            CACHE_CONTROL_RETO,
         )
 
     except Exception as e:
@@ -252,6 +349,7 @@ def eliminar_reto(reto_id: str, usuario: dict = Depends(datos_usuario)) -> JSONR
         PUBLICACIONES_COLLECTION.delete_many({"reto_id": reto_id})
 
         RETOS_COLLECTION.delete_one({"_id": ObjectId(reto_id)})
+        ranking_service.descartar_reto(reto_id)
 
         return JSONResponse(status_code=200, content={"msg": "Reto eliminado exitosamente"})
 
@@ -287,8 +385,13 @@ def agregar_publicacion_a_reto(
             raise NotFoundError("Publicación")
 
         PUBLICACIONES_COLLECTION.update_one(
-            {"_id": ObjectId(publicacion_id)}, {"$set": {"reto_id": reto_id}}
+            {"_id": ObjectId(publicacion_id)},
+            {"$set": {"reto_id": reto_id, "updated_at": datetime.now()}},
         )
+        cache_service.invalidar_publicacion(publicacion_id)
+        ranking_service.descartar_reto(reto_id)
+        if publicacion.get("reto_id"):
+            ranking_service.descartar_reto(publicacion["reto_id"])
 
         return JSONResponse(
             status_code=200, content={"msg": "Publicación agregada al reto exitosamente"}
@@ -319,6 +422,7 @@ def limpiar_retos_expirados() -> JSONResponse:
             publicaciones_eliminadas += result.deleted_count
 
             RETOS_COLLECTION.delete_one({"_id": reto["_id"]})
+            ranking_service.descartar_reto(reto_id)
             retos_eliminados += 1
 
         return JSONResponse(
@@ -336,82 +440,129 @@ def limpiar_retos_expirados() -> JSONResponse:
         raise DatabaseError(f"Error al limpiar los retos expirados: {str(e)}") from e
 
 
-@router.post("/crear-con-publicacion")
-def crear_reto_con_publicacion(
-    titulo_reto: str = Form(...),
-    descripcion_reto: str = Form(...),
-    titulo_publicacion: str = Form(...),
-    descripcion_publicacion: str = Form(...),
-    video: UploadFile = File(...),
+def reto_desde_formulario(campos: Dict[str, str], user_id: str) -> Reto:
+    """Construye el reto de un formulario de creación de reto con publicación.
+
+    Args:
+        campos: Campos del formulario
+        user_id: ID del usuario creador
+
+    Returns:
+        Reto: Reto que expira en 30 días
+    """
+    return Reto(
+        titulo=campos["titulo_reto"],
+        descripcion=campos["descripcion_reto"],
+        creador_id=user_id,
+        fecha_expiracion=datetime.now() + timedelta(days=30),
+    )
+
+
+def validar_formulario_reto(campos: Dict[str, str], user_id: str) -> None:
+    """Valida el formulario de creación de reto con publicación antes de guardar el video.
+
+    Args:
+        campos: Campos del formulario
+        user_id: ID del usuario creador
+
+    Raises:
+        BusinessLogicError: Si el usuario alcanzó el límite de retos o el reto no es válido
+    """
+    if not check_user_challenge_limit(user_id):
+        raise BusinessLogicError("Has alcanzado el límite de 3 retos por mes")
+
+    try:
+        reto_desde_formulario(campos, user_id).validar_reto()
+    except ValueError as e:
+        raise BusinessLogicError(str(e)) from e
+
+
+def guardar_reto_con_publicacion(
+    formulario: FormularioVideo, usuario: dict
+) -> RetoConPublicacionResponse:
+    """Guarda el reto y su publicación inicial cuyo video ya está en GridFS.
+
+    Args:
+        formulario: Campos validados e ID del video
+        usuario: Usuario autenticado
+
+    Returns:
+        RetoConPublicacionResponse: Respuesta con los IDs creados
+    """
+    reto = reto_desde_formulario(formulario.campos, str(usuario["_id"]))
+    reto_dict = reto.model_dump()
+    reto_dict["fecha_expiracion"] = reto.fecha_expiracion
+    reto_result = RETOS_COLLECTION.insert_one(reto_dict)
+    reto_id = str(reto_result.inserted_id)
+
+    collection = get_mongo_data("publicacion")
+    publicacion = Publicacion(
+        titulo=formulario.campos["titulo_publicacion"],
+        descripcion=formulario.campos["descripcion_publicacion"],
+        video=str(formulario.video_id),
+        usuario_id=usuario["email"],
+        reto_id=reto_id,
+        puntuaciones=[],
+        puntuacion_promedio=0,
+    )
+
+    publicacion_result = collection.insert_one(
+        {**publicacion.model_dump(), "updated_at": datetime.now()}
+    )
+    publicacion_id = str(publicacion_result.inserted_id)
+    ranking_service.registrar_publicacion(usuario["email"])
+
+    return RetoConPublicacionResponse(
+        msg="Reto y publicación inicial creados exitosamente",
+        reto_id=reto_id,
+        publicacion_id=publicacion_id,
+        video_id=str(formulario.video_id),
+    )
+
+
+@router.post(
+    "/crear-con-publicacion", openapi_extra=formulario_openapi("video", CAMPOS_RETO_CON_PUBLICACION)
+)
+async def crear_reto_con_publicacion(
+    request: Request,
     usuario: dict = Depends(datos_usuario),
 ) -> RetoConPublicacionResponse:
     """Crea un reto junto con su primera publicación.
 
-    Args:
+    El formulario multipart/form-data se lee a medida que llega y el video se escribe
+    directamente en GridFS. El reto se valida antes de guardar el video si sus campos
+    llegan primero, y solo se inserta una vez que el video se guardó completo.
+
+    Campos del formulario:
         titulo_reto: Título del reto
         descripcion_reto: Descripción del reto
         titulo_publicacion: Título de la publicación inicial
         descripcion_publicacion: Descripción de la publicación inicial
         video: Video de la publicación inicial
+
+    Args:
+        request: Petición HTTP con el formulario
         usuario: Usuario autenticado
 
     Returns:
         RetoConPublicacionResponse: Respuesta con los IDs creados
 
     Raises:
-        BusinessLogicError: Si el usuario alcanzó el límite de retos
-        ValidationError: Si los datos no son válidos
+        BusinessLogicError: Si el usuario alcanzó el límite de retos o el reto no es válido
+        ValidationError: Si el formulario no es válido
+        FileError: Si el video no es válido o supera el tamaño máximo
         DatabaseError: Si hay error en la base de datos
     """
     try:
-        user_id = str(usuario["_id"])
-        if not check_user_challenge_limit(user_id):
-            raise BusinessLogicError("Has alcanzado el límite de 3 retos por mes")
-
-        reto = Reto(
-            titulo=titulo_reto,
-            descripcion=descripcion_reto,
-            creador_id=user_id,
-            fecha_expiracion=datetime.now() + timedelta(days=30),
-        )
-
-        reto.validar_reto()
-
-        reto_dict = reto.model_dump()
-        reto_dict["fecha_expiracion"] = reto.fecha_expiracion
-        reto_result = RETOS_COLLECTION.insert_one(reto_dict)
-        reto_id = str(reto_result.inserted_id)
-
-        collection = get_mongo_data("publicacion")
-        db = collection.database
-        fs = GridFS(db)
-        file_id = fs.put(
-            video.file,
-            filename=video.filename,
-            content_type=video.content_type or "video/mp4",
-        )
-
-        publicacion = Publicacion(
-            titulo=titulo_publicacion,
-            descripcion=descripcion_publicacion,
-            video=str(file_id),
-            usuario_id=usuario["email"],
-            reto_id=reto_id,
-            puntuaciones=[],
-            puntuacion_promedio=0,
+        formulario = await recibir_video(
+            request,
+            "video",
+            CAMPOS_RETO_CON_PUBLICACION,
+            partial(validar_formulario_reto, user_id=str(usuario["_id"])),
         )
+        return await run_in_threadpool(guardar_reto_con_publicacion, formulario, usuario)
 
-        publicacion_result = collection.insert_one(publicacion.model_dump())
-        publicacion_id = str(publicacion_result.inserted_id)
-
-        return RetoConPublicacionResponse(
-            msg="Reto y publicación inicial creados exitosamente",
-            reto_id=reto_id,
-            publicacion_id=publicacion_id,
-            video_id=str(file_id),
-        )
-
-    except ValueError as e:
-        raise BusinessLogicError(str(e)) from e
+    except (BusinessLogicError, ValidationError, FileError):
+        raise
     except Exception as e:
         raise DatabaseError(f"Error al crear el reto con publicación: {str(e)}") from e
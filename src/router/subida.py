@@ -0,0 +1,218 @@
+"""Router para las subidas reanudables de videos de publicaciones"""
+
+from typing import Optional
+
+from bson.objectid import ObjectId
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+
+from model.subida import SubidaCrearRequest, SubidaEstadoResponse
+from router.usuario import datos_usuario
+from router.publicacion import (
+    buscar_publicacion_de_video,
+    guardar_publicacion,
+    validar_formulario_publicacion,
+)
+from services.subida_service import TAMANO_CHUNK_SUBIDA, subida_service
+from exceptions.custom_exceptions import (
+    AuthorizationError,
+    BusinessLogicError,
+    DatabaseError,
+    FileError,
+    NotFoundError,
+    ValidationError,
+)
+
+
+router = APIRouter(prefix="/subida", tags=["subida"])
+
+
+@router.post("")
+def crear_subida(
+    subida: SubidaCrearRequest, usuario: dict = Depends(datos_usuario)
+) -> SubidaEstadoResponse:
+    """Inicia la subida reanudable del video de una nueva publicación.
+
+    Los datos de la publicación se validan al iniciar, antes de enviar el video. Después
+    el video se envía en chunks de ``tamano_chunk`` bytes con
+    ``PUT /subida/{subida_id}/{numero}``; si la conexión se corta, ``GET /subida/{id}``
+    indica desde qué chunk continuar. Con todos los chunks recibidos,
+    ``POST /subida/{subida_id}/finalizar`` crea la publicación.
+
+    Args:
+        subida: Datos de la publicación y del video
+        usuario: Datos del usuario autenticado
+
+    Returns:
+        JSONResponse: Estado inicial de la subida
+
+    Raises:
+        ValidationError: Si los datos de la publicación no son válidos
+        NotFoundError: Si el reto no existe
+        BusinessLogicError: Si el reto ha expirado o el usuario tiene demasiadas subidas
+            sin finalizar
+        FileError: Si el video supera el tamaño máximo o no es un video
+        DatabaseError: Si hay error en la base de datos
+    """
+    try:
+        campos = {"titulo": subida.titulo, "descripcion": subida.descripcion}
+        if subida.reto_id:
+            campos["reto_id"] = subida.reto_id
+        validar_formulario_publicacion(campos)
+
+        estado = subida_service.crear(
+            campos, subida.tamano, subida.content_type, subida.nombre_archivo, usuario["email"]
+        )
+        return JSONResponse(status_code=201, content=estado)
+
+    except (ValidationError, NotFoundError, BusinessLogicError, FileError):
+        raise
+    except Exception as e:
+        raise DatabaseError(f"Error al iniciar la subida: {str(e)}") from e
+
+
+@router.get("/{subida_id}")
+def obtener_subida(subida_id: str, usuario: dict = Depends(datos_usuario)) -> SubidaEstadoResponse:
+    """Consulta cuántos bytes de una subida se recibieron.
+
+    Args:
+        subida_id: ID de la subida
+        usuario: Datos del usuario autenticado
+
+    Returns:
+        JSONResponse: Estado de la subida con ``offset`` y ``siguiente_chunk``
+
+    Raises:
+        NotFoundError: Si la subida no existe o expiró
+        AuthorizationError: Si la subida es de otro usuario
+        DatabaseError: Si hay error en la base de datos
+    """
+    try:
+        subida = subida_service.obtener(subida_id, usuario["email"])
+        return JSONResponse(status_code=200, content=subida_service.estado(subida))
+
+    except (NotFoundError, AuthorizationError):
+        raise
+    except Exception as e:
+        raise DatabaseError(f"Error al obtener la subida: {str(e)}") from e
+
+
+@router.put("/{subida_id}/{numero}")
+async def enviar_chunk(
+    subida_id: str, numero: int, request: Request, usuario: dict = Depends(datos_usuario)
+) -> SubidaEstadoResponse:
+    """Recibe un chunk del video y lo guarda directamente en GridFS.
+
+    El chunk ``numero`` contiene los bytes desde ``numero * tamano_chunk``; todos los
+    chunks miden ``tamano_chunk`` salvo el último. Reenviar un chunk ya recibido es
+    seguro y lo sobrescribe.
+
+    Args:
+        subida_id: ID de la subida
+        numero: Número del chunk, desde 0
+        request: Petición HTTP con los bytes del chunk como cuerpo
+        usuario: Datos del usuario autenticado
+
+    Returns:
+        JSONResponse: Estado de la subida tras guardar el chunk
+
+    Raises:
+        ValidationError: Si el número o el tamaño del chunk no son válidos
+        NotFoundError: Si la subida no existe o expiró
+        AuthorizationError: Si la subida es de otro usuario
+        BusinessLogicError: Si la subida ya fue finalizada o falta un chunk anterior
+        DatabaseError: Si hay error en la base de datos
+    """
+    try:
+        datos = bytearray()
+        async for parte in request.stream():
+            datos.extend(parte)
+            if len(datos) > TAMANO_CHUNK_SUBIDA:
+                raise ValidationError(f"Un chunk no puede superar {TAMANO_CHUNK_SUBIDA} bytes.")
+
+        estado = await run_in_threadpool(
+            subida_service.guardar_chunk, subida_id, numero, bytes(datos), usuario["email"]
+        )
+        return JSONResponse(status_code=200, content=estado)
+
+    except (ValidationError, NotFoundError, AuthorizationError, BusinessLogicError):
+        raise
+    except Exception as e:
+        raise DatabaseError(f"Error al guardar el chunk: {str(e)}") from e
+
+
+def recuperar_publicacion(video_id: ObjectId) -> Optional[dict]:
+    """Obtiene como dict la respuesta de la publicación ya creada con un video.
+
+    Args:
+        video_id: ID del video en GridFS
+
+    Returns:
+        Dict con la respuesta de la creación, o None si no hay publicación con el video
+    """
+    publicacion = buscar_publicacion_de_video(video_id)
+    return publicacion.model_dump() if publicacion else None
+
+
+@router.post("/{subida_id}/finalizar")
+def finalizar_subida(subida_id: str, usuario: dict = Depends(datos_usuario)) -> JSONResponse:
+    """Crea la publicación con el video de una subida completa.
+
+    Se puede reintentar: si la subida ya se finalizó, devuelve la misma respuesta.
+
+    Args:
+        subida_id: ID de la subida
+        usuario: Datos del usuario autenticado
+
+    Returns:
+        JSONResponse: Respuesta de la creación de la publicación
+
+    Raises:
+        NotFoundError: Si la subida o el reto no existen
+        AuthorizationError: Si la subida es de otro usuario
+        BusinessLogicError: Si faltan chunks o el reto ha expirado
+        ValidationError: Si los datos de la publicación no son válidos
+        DatabaseError: Si hay error en la base de datos
+    """
+    try:
+        respuesta = subida_service.finalizar(
+            subida_id,
+            usuario["email"],
+            validar_formulario_publicacion,
+            lambda formulario: guardar_publicacion(formulario, usuario).model_dump(),
+            recuperar_publicacion,
+        )
+        return JSONResponse(status_code=200, content=respuesta)
+
+    except (ValidationError, NotFoundError, AuthorizationError, BusinessLogicError):
+        raise
+    except Exception as e:
+        raise DatabaseError(f"Error al finalizar la subida: {str(e)}") from e
+
+
+@router.delete("/{subida_id}")
+def cancelar_subida(subida_id: str, usuario: dict = Depends(datos_usuario)) -> JSONResponse:
+    """Cancela una subida y descarta los chunks recibidos.
+
+    Args:
+        subida_id: ID de la subida
+        usuario: Datos del usuario autenticado
+
+    Returns:
+        JSONResponse: Mensaje de confirmación
+
+    Raises:
+        NotFoundError: Si la subida no existe o expiró
+        AuthorizationError: Si la subida es de otro usuario
+        BusinessLogicError: Si la subida ya fue finalizada
+        DatabaseError: Si hay error en la base de datos
+    """
+    try:
+        subida_service.cancelar(subida_id, usuario["email"])
+        return JSONResponse(status_code=200, content={"msg": "Subida cancelada"})
+
+    except (NotFoundError, AuthorizationError, BusinessLogicError):
+        raise
+    except Exception as e:
+        raise DatabaseError(f"Error al cancelar la subida: {str(e)}") from e
@@ -8,6 +8,8 @@ from fastapi.responses import JSONResponse
 
 from model.usuario import Usuario, UsuarioActualizar
 from util.load_data import get_auth, get_mongo_data, get_secrets
+from services.ranking_service import ranking_service
+from services.autor_service import autor_service
 from exceptions.custom_exceptions import ValidationError, NotFoundError, DatabaseError, TokenError
 
 router = APIRouter(prefix="/usuario", tags=["usuario"])
@@ -42,6 +44,7 @@ def registrar(usuario: Usuario) -> JSONResponse:
         )
 
         DATA.insert_one(usuario_dict)
+        ranking_service.registrar_usuario(usuario_dict)
         return JSONResponse(status_code=201, content={"msg": "Usuario registrado correctamente"})
 
     except ValidationError:
@@ -132,6 +135,8 @@ def actualizar(usuario: UsuarioActualizar, token: str = Depends(OA2)) -> JSONRes
             )
 
         DATA.update_one({"email": db_usuario["email"]}, {"$set": datos_dict})
+        ranking_service.actualizar_usuario(db_usuario["email"], datos_dict)
+        autor_service.invalidar(db_usuario["email"])
         return JSONResponse(content={"msg": "Usuario actualizado correctamente"}, status_code=200)
 
     except (NotFoundError, TokenError):
@@ -157,6 +162,8 @@ def eliminar(token: str = Depends(OA2)) -> JSONResponse:
     try:
         usuario = datos_usuario(token)
         DATA.delete_one({"email": usuario["email"]})
+        ranking_service.eliminar_usuario(usuario["email"])
+        autor_service.invalidar(usuario["email"])
         return JSONResponse(status_code=200, content={"msg": "Usuario eliminado correctamente"})
 
     except (NotFoundError, TokenError):
@@ -0,0 +1,86 @@
+"""Servicio para resolver los datos visibles de los autores de las publicaciones"""
+
+from typing import Dict, Iterable
+
+from util.cache import CacheTTL
+from util.load_data import get_mongo_data
+
+
+CAMPOS_AUTOR = {"_id": 0, "email": 1, "nombre": 1, "apellido": 1, "foto_perfil": 1}
+"""Proyección de los datos del autor que se muestran junto a sus publicaciones."""
+
+MAX_AUTORES_EN_CACHE = 2048
+"""Número máximo de autores guardados en memoria."""
+
+TTL_AUTORES = 60
+"""Segundos que se reutilizan los datos de un autor antes de volver a consultarlos."""
+
+
+class AutorService:
+    """Resuelve nombre, apellido y foto de perfil de autores a partir de su email.
+
+    Las publicaciones solo guardan el email del autor, por lo que cada página del feed
+    resuelve a todos sus autores con una única consulta ``$in`` apoyada en un caché de
+    vida corta.
+    """
+
+    def __init__(self):
+        self.usuarios_collection = get_mongo_data("usuarios")
+        self.cache = CacheTTL(MAX_AUTORES_EN_CACHE, TTL_AUTORES)
+
+    def obtener_autores(self, emails: Iterable[str]) -> Dict[str, dict]:
+        """Obtiene los datos visibles de varios autores.
+
+        Args:
+            emails: Emails de los autores
+
+        Returns:
+            Dict de email a datos del autor; los autores inexistentes no se incluyen
+        """
+        autores = {}
+        faltantes = []
+        for email in set(emails):
+            autor = self.cache.obtener(email)
+            if autor is None:
+                faltantes.append(email)
+            else:
+                autores[email] = autor
+
+        if faltantes:
+            for usuario in self.usuarios_collection.find(
+                {"email": {"$in": faltantes}}, CAMPOS_AUTOR
+            ):
+                autor = {
+                    "nombre": usuario.get("nombre"),
+                    "apellido": usuario.get("apellido"),
+                    "foto_perfil": usuario.get("foto_perfil"),
+                }
+                self.cache.guardar(usuario["email"], autor)
+                autores[usuario["email"]] = autor
+
+        return autores
+
+    def agregar_autores(self, publicaciones: list) -> list:
+        """Agrega el campo ``autor`` a cada publicación de una página.
+
+        Args:
+            publicaciones: Publicaciones con el email del autor en ``usuario_id``
+
+        Returns:
+            list: Las mismas publicaciones con su autor, o None si el autor ya no existe
+        """
+        autores = self.obtener_autores(pub.get("usuario_id") for pub in publicaciones)
+        for pub in publicaciones:
+            pub["autor"] = autores.get(pub.get("usuario_id"))
+        return publicaciones
+
+    def invalidar(self, email: str) -> None:
+        """Descarta los datos en caché de un autor tras modificarlo o eliminarlo.
+
+        Args:
+            email: Email del autor
+        """
+        self.cache.invalidar(email)
+
+
+autor_service = AutorService()
@@ -0,0 +1,98 @@
+"""Servicio de caché para las lecturas frecuentes de publicaciones"""
+
+from typing import Any, Callable, Dict, Optional
+
+from bson.objectid import ObjectId
+
+from util.cache import CacheTTL
+from services.autor_service import autor_service
+
+
+MAX_PUBLICACIONES_EN_CACHE = 1024
+"""Número máximo de publicaciones guardadas en memoria."""
+
+TTL_PUBLICACIONES = 300
+"""Segundos que una publicación permanece en caché si no se modifica antes."""
+
+
+class CacheService:
+    """Caché de lectura de publicaciones individuales.
+
+    Las publicaciones se leen mucho más de lo que cambian, así que ``obtener_publicacion``
+    las sirve desde memoria. Cada ruta que modifica una publicación (edición,
+    eliminación, comentarios y puntuaciones) invalida su entrada.
+    """
+
+    def __init__(self):
+        self.publicaciones = CacheTTL(MAX_PUBLICACIONES_EN_CACHE, TTL_PUBLICACIONES)
+
+    @staticmethod
+    def _clave(publicacion_id: Any) -> str:
+        """Normaliza el ID para que variantes como mayúsculas compartan la misma entrada."""
+        publicacion_id = str(publicacion_id)
+        if ObjectId.is_valid(publicacion_id):
+            return str(ObjectId(publicacion_id))
+        return publicacion_id
+
+    def obtener_publicacion(
+        self, publicacion_id: str, cargar: Callable[[], Optional[Dict[str, Any]]]
+    ) -> Optional[Dict[str, Any]]:
+        """Obtiene una publicación del caché o la carga y la guarda.
+
+        Args:
+            publicacion_id: ID de la publicación
+            cargar: Función que lee la publicación de la base de datos
+
+        Returns:
+            Dict con la publicación, o None si no existe
+        """
+        clave = self._clave(publicacion_id)
+        publicacion = self.publicaciones.obtener(clave)
+        if publicacion is not None:
+            return publicacion
+
+        generacion = self.publicaciones.generacion()
+        publicacion = cargar()
+        if publicacion is not None:
+            self.publicaciones.guardar(clave, publicacion, generacion)
+        return publicacion
+
+    def version_publicacion(self, publicacion_id: str, leer_version: Callable[[], Any]) -> Any:
+        """Obtiene la fecha de la última modificación de una publicación.
+
+        Si la publicación está en caché se usa su ``updated_at``; si no, se lee solo esa
+        fecha de la base de datos, sin cargar ni guardar la publicación completa.
+
+        Args:
+            publicacion_id: ID de la publicación
+            leer_version: Función que lee ``updated_at`` de la base de datos
+
+        Returns:
+            Fecha de la última modificación, o None si no se conoce
+        """
+        publicacion = self.publicaciones.consultar(self._clave(publicacion_id))
+        if publicacion is not None:
+            return publicacion.get("updated_at")
+        return leer_version()
+
+    def invalidar_publicacion(self, publicacion_id: Any) -> None:
+        """Descarta la publicación en caché tras modificarla o eliminarla.
+
+        Args:
+            publicacion_id: ID de la publicación
+        """
+        self.publicaciones.invalidar(self._clave(publicacion_id))
+
+    def estadisticas(self) -> Dict[str, Dict[str, Any]]:
+        """Obtiene las métricas de los cachés en memoria.
+
+        Returns:
+            Dict con las métricas de cada caché
+        """
+        return {
+            "publicaciones": self.publicaciones.estadisticas(),
+            "autores": autor_service.cache.estadisticas(),
+        }
+
+
+cache_service = CacheService()
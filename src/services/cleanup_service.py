@@ -8,6 +8,10 @@ import schedule
 
 from bson.objectid import ObjectId
 from util.load_data import get_mongo_data
+from services.ranking_service import ranking_service
+from services.cache_service import cache_service
+from services.sincronizacion_service import sincronizacion_service
+from services.subida_service import subida_service
 from exceptions.custom_exceptions import DatabaseError
 
 
@@ -20,7 +24,18 @@ class RetoCleanupService:
         self.is_running = False
 
     async def cleanup_expired_challenges(self) -> Dict[str, Any]:
-        """Limpia los retos expirados y sus publicaciones
+        """Limpia los retos expirados y sus publicaciones en un hilo aparte
+
+        Las consultas usan el cliente síncrono, así que se ejecutan fuera del event loop
+        para no bloquear las peticiones mientras dura la limpieza.
+
+        Returns:
+            Dict con estadísticas de la limpieza
+        """
+        return await asyncio.to_thread(self._limpiar_retos_expirados)
+
+    def _limpiar_retos_expirados(self) -> Dict[str, Any]:
+        """Marca inactivos los retos expirados y elimina sus publicaciones
 
         Returns:
             Dict con estadísticas de la limpieza
@@ -43,6 +58,9 @@ class RetoCleanupService:
                         {"_id": {"$in": [ObjectId(pid) for pid in publicaciones_ids]}}
                     )
                     publicaciones_eliminadas += result.deleted_count
+                    for pid in publicaciones_ids:
+                        cache_service.invalidar_publicacion(pid)
+                        sincronizacion_service.registrar_eliminacion(pid)
 
                 self.retos_collection.update_one({"_id": reto["_id"]}, {"$set": {"activo": False}})
                 retos_marcados_inactivos += 1
@@ -57,8 +75,24 @@ class RetoCleanupService:
         except Exception as e:
             raise DatabaseError(f"Error al limpiar los retos expirados: {str(e)}") from e
 
+    async def rebuild_ranking(self) -> Dict[str, Any]:
+        """Reconstruye el ranking en un hilo aparte para no bloquear el programador
+
+        Returns:
+            Dict con estadísticas de la reconstrucción
+        """
+        return await asyncio.to_thread(ranking_service.reconstruir_ranking)
+
+    async def cleanup_expired_uploads(self) -> Dict[str, Any]:
+        """Elimina las subidas reanudables vencidas en un hilo aparte
+
+        Returns:
+            Dict con estadísticas de la limpieza
+        """
+        return await asyncio.to_thread(subida_service.limpiar_expiradas)
+
     def schedule_cleanup(self):
-        """Programa la limpieza automática"""
+        """Programa la limpieza automática, la reconstrucción del ranking y las subidas"""
 
         schedule.every().day.at("02:00").do(
             lambda: asyncio.create_task(self.cleanup_expired_challenges())
@@ -66,6 +100,10 @@ class RetoCleanupService:
 
         schedule.every(6).hours.do(lambda: asyncio.create_task(self.cleanup_expired_challenges()))
 
+        schedule.every().day.at("03:00").do(lambda: asyncio.create_task(self.rebuild_ranking()))
+
+        schedule.every().hour.do(lambda: asyncio.create_task(self.cleanup_expired_uploads()))
+
     async def start_scheduler(self):
         """Inicia el programador de tareas"""
         if self.is_running:
@@ -76,6 +114,8 @@ class RetoCleanupService:
 
         print("🔄 Servicio de limpieza de retos iniciado")
         print("📅 Limpieza programada: diaria a las 2:00 AM y cada 6 horas")
+        print("🏆 Reconstrucción del ranking programada: diaria a las 3:00 AM")
+        print("📤 Limpieza de subidas vencidas programada: cada hora")
 
         while self.is_running:
             schedule.run_pending()
@@ -0,0 +1,1370 @@
+"""Servicio para el mantenimiento incremental del ranking de usuarios"""
+
+import base64
+import json
+import secrets
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from threading import Lock, RLock, Thread
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from bson.objectid import ObjectId
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+
+from data.mongo import ORDEN_RANKING, crear_indices
+from util.load_data import get_mongo_data
+from util.indice_ranking import IndiceRanking
+from util.top_k import TopK
+from exceptions.custom_exceptions import DatabaseError, ValidationError
+
+
+CAMPOS_USUARIO = ("nombre", "apellido", "email", "foto_perfil", "ciudad")
+"""Campos del usuario que se guardan junto a su puntuación en el ranking."""
+
+MAX_SNAPSHOTS = 64
+"""Número máximo de respuestas del ranking guardadas para la versión actual."""
+
+TOP_RETO = 50
+"""Número de publicaciones que se mantienen en el top de cada reto."""
+
+MAX_RETOS_EN_MEMORIA = 256
+"""Número máximo de retos cuyo top se mantiene en memoria."""
+
+TAMANO_LOTE_RECONSTRUCCION = 500
+"""Número de usuarios cuya puntuación se recalcula en cada lote de la reconstrucción."""
+
+PAUSA_ENTRE_LOTES = 0.2
+"""Segundos de espera entre lotes para no saturar la base de datos."""
+
+COLECCION_SOMBRA = "ranking_reconstruccion"
+"""Colección donde se construye el nuevo ranking antes de reemplazar al actual."""
+
+MARGEN_RECONSTRUCCION = timedelta(seconds=2)
+"""Margen antes del inicio de una reconstrucción para buscar los cambios concurrentes.
+
+Las escrituras toman su fecha antes de confirmarse, así que un cambio confirmado durante
+la reconstrucción puede tener una fecha ligeramente anterior a su inicio.
+"""
+
+PROYECCION_INDICE = {"_id": 0, "usuario_id": 1, "puntuacion_total": 1, "ciudad_clave": 1}
+"""Campos del ranking necesarios para mantener el índice de posiciones."""
+
+
+class IndicesRanking(NamedTuple):
+    """Índices de posiciones del ranking, que se reemplazan juntos."""
+
+    general: IndiceRanking
+    """Índice de todos los usuarios"""
+
+    claves: Dict[str, Tuple[float, str]]
+    """Clave actual de cada usuario"""
+
+    por_ciudad: Dict[str, IndiceRanking]
+    """Índice de cada ciudad"""
+
+    ciudades: Dict[str, str]
+    """Ciudad normalizada de cada usuario"""
+
+
+def normalizar_ciudad(ciudad: Optional[str]) -> Optional[str]:
+    """Normaliza el nombre de una ciudad para usarlo como partición del ranking.
+
+    Ignora mayúsculas, tildes y espacios repetidos, de modo que "Medellín" y
+    " medellin" pertenecen a la misma partición.
+
+    Args:
+        ciudad: Nombre de la ciudad tal como lo ingresó el usuario
+
+    Returns:
+        str: Clave de la ciudad, o None si el usuario no tiene ciudad
+    """
+    if not ciudad or not ciudad.strip():
+        return None
+    descompuesta = unicodedata.normalize("NFKD", " ".join(ciudad.split()))
+    return "".join(c for c in descompuesta if not unicodedata.combining(c)).casefold()
+
+
+def contadores_vacios() -> Dict[str, Any]:
+    """Retorna los contadores de puntuación de un usuario sin publicaciones.
+
+    Returns:
+        Dict con los contadores en cero
+    """
+    return {"puntuacion_total": 0.0, "total_publicaciones": 0, "publicaciones_con_puntuacion": 0}
+
+
+def pipeline_puntuaciones(filtro: dict) -> List[Dict[str, Any]]:
+    """Construye el pipeline que calcula en MongoDB la puntuación de los usuarios.
+
+    El pipeline parte de la colección ``usuarios`` y agrupa sus publicaciones con
+    ``$lookup``, de modo que solo viajan por la red los contadores y los datos públicos
+    de cada usuario, nunca los arreglos de puntuaciones y comentarios.
+
+    Args:
+        filtro: Filtro sobre la colección de usuarios
+
+    Returns:
+        Lista de etapas del pipeline de agregación
+    """
+    return [
+        {"$match": filtro},
+        {"$project": {campo: 1 for campo in CAMPOS_USUARIO}},
+        {
+            "$lookup": {
+                "from": "publicacion",
+                "localField": "email",
+                "foreignField": "usuario_id",
+                "pipeline": [
+                    {
+                        "$group": {
+                            "_id": None,
+                            "puntuacion_total": {"$sum": "$puntuacion_promedio"},
+                            "total_publicaciones": {"$sum": 1},
+                            "publicaciones_con_puntuacion": {
+                                "$sum": {"$size": {"$ifNull": ["$puntuaciones", []]}}
+                            },
+                        }
+                    }
+                ],
+                "as": "puntuacion",
+            }
+        },
+        {"$unwind": {"path": "$puntuacion", "preserveNullAndEmptyArrays": True}},
+        {
+            "$project": {
+                "_id": 0,
+                "usuario_id": {"$toString": "$_id"},
+                **{campo: 1 for campo in CAMPOS_USUARIO},
+                **{
+                    contador: {"$ifNull": [f"$puntuacion.{contador}", valor]}
+                    for contador, valor in contadores_vacios().items()
+                },
+            }
+        },
+    ]
+
+
+def pipeline_top_reto(reto_id: str, limite: int) -> List[Dict[str, Any]]:
+    """Construye el pipeline que obtiene las publicaciones mejor puntuadas de un reto.
+
+    El ``$match`` y el ``$sort`` usan el índice ``(reto_id, puntuacion_promedio, _id)``,
+    por lo que solo se leen las primeras ``limite`` publicaciones del reto.
+
+    Args:
+        reto_id: ID del reto
+        limite: Número máximo de publicaciones
+
+    Returns:
+        Lista de etapas del pipeline de agregación
+    """
+    return [
+        {"$match": {"reto_id": reto_id}},
+        {"$sort": {"puntuacion_promedio": -1, "_id": 1}},
+        {"$limit": limite},
+        {
+            "$project": {
+                "_id": 0,
+                "publicacion_id": {"$toString": "$_id"},
+                "titulo": 1,
+                "usuario_id": 1,
+                "video": 1,
+                "puntuacion_promedio": 1,
+                "total_puntuaciones": {"$size": {"$ifNull": ["$puntuaciones", []]}},
+            }
+        },
+    ]
+
+
+def inicio_del_dia(fecha: datetime) -> datetime:
+    """Trunca una fecha al inicio de su día, que identifica el bucket diario.
+
+    Args:
+        fecha: Fecha a truncar
+
+    Returns:
+        datetime: Fecha a medianoche
+    """
+    return fecha.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def pipeline_ranking_periodo(inicio: datetime, limit: int, offset: int) -> List[Dict[str, Any]]:
+    """Construye el pipeline que arma el ranking de un periodo desde los buckets diarios.
+
+    Solo se leen los buckets de los días del periodo (a lo sumo uno por usuario y día) y
+    los datos públicos de cada usuario se toman del ranking general. El cruce con el
+    ranking se hace antes de contar, así que los usuarios eliminados (con buckets pero
+    sin entrada en el ranking) no cuentan en el total ni ocupan lugar en las páginas.
+
+    Args:
+        inicio: Fecha de inicio del periodo
+        limit: Límite de resultados
+        offset: Desplazamiento
+
+    Returns:
+        Lista de etapas del pipeline de agregación
+    """
+    return [
+        {"$match": {"dia": {"$gte": inicio_del_dia(inicio)}}},
+        {
+            "$group": {
+                "_id": "$usuario_id",
+                "puntos": {"$sum": "$puntos"},
+                "total_puntuaciones": {"$sum": "$total_puntuaciones"},
+            }
+        },
+        {"$match": {"total_puntuaciones": {"$gt": 0}}},
+        {"$sort": {"puntos": -1, "_id": 1}},
+        {
+            "$lookup": {
+                "from": "ranking",
+                "localField": "_id",
+                "foreignField": "email",
+                "as": "usuario",
+            }
+        },
+        {"$unwind": "$usuario"},
+        {
+            "$facet": {
+                "total": [{"$count": "total"}],
+                "ranking": [
+                    {"$skip": offset},
+                    {"$limit": limit},
+                    {
+                        "$project": {
+                            "_id": 0,
+                            "usuario_id": "$usuario.usuario_id",
+                            **{campo: f"$usuario.{campo}" for campo in CAMPOS_USUARIO},
+                            "puntos": 1,
+                            "total_puntuaciones": 1,
+                        }
+                    },
+                ],
+            }
+        },
+    ]
+
+
+class RankingService:
+    """Servicio que mantiene materializada la colección del ranking de usuarios.
+
+    Cada documento de la colección ``ranking`` guarda los datos públicos del usuario
+    junto con ``puntuacion_total``, ``total_publicaciones`` y
+    ``publicaciones_con_puntuacion``. Los endpoints que modifican puntuaciones o
+    publicaciones actualizan estos contadores con ``$inc``, de modo que una página del
+    ranking se obtiene con una única consulta indexada, ordenada y limitada.
+
+    Además mantiene en memoria un ``IndiceRanking`` con las claves
+    ``(-puntuacion_total, usuario_id)`` de todos los usuarios, que responde en tiempo
+    logarítmico la posición de un usuario. La colección es la forma persistente del
+    índice: se carga desde ella al iniciar y cada cambio de puntuación se aplica a ambos.
+    El índice es propio de cada proceso, por lo que la API debe ejecutarse con un único
+    worker o recargarlo con ``cargar_indice``.
+
+    Cada cambio en el ranking incrementa ``version``. Las respuestas ya serializadas se
+    guardan como snapshots asociados a esa versión y se descartan cuando cambia, lo que
+    permite responder con ETag sin consultar la base de datos.
+
+    Para los rankings semanal y mensual cada puntuación se acumula en un bucket diario
+    de ``puntuacion_diaria`` por autor, así que un periodo solo suma unos pocos buckets
+    por usuario.
+    """
+
+    def __init__(self):
+        self.ranking_collection = get_mongo_data("ranking")
+        self.periodos_collection = get_mongo_data("puntuacion_diaria")
+        self.usuarios_collection = get_mongo_data("usuarios")
+        self.publicaciones_collection = get_mongo_data("publicacion")
+        self._lock = RLock()
+        self._lock_reconstruccion = Lock()
+        self._inicializado = False
+        self._indice = IndiceRanking()
+        self._claves: Dict[str, Tuple[float, str]] = {}
+        self._indices_ciudad: Dict[str, IndiceRanking] = {}
+        self._ciudades: Dict[str, str] = {}
+        self._arranque = secrets.token_hex(4)
+        self.version = 0
+        self._snapshots: Dict[Hashable, bytes] = {}
+        self._top_retos: "OrderedDict[str, TopK]" = OrderedDict()
+        self._pendientes: Optional[Set[str]] = None
+
+    def _nueva_version(self) -> None:
+        """Incrementa la versión del ranking y descarta los snapshots anteriores."""
+        with self._lock:
+            self.version += 1
+            self._snapshots = {}
+
+    def etag(self, version: Optional[int] = None) -> str:
+        """Calcula el ETag del ranking para una versión.
+
+        Incluye un identificador del arranque del proceso para que un reinicio, que
+        vuelve a contar desde cero, no valide ETags emitidos antes.
+
+        Args:
+            version: Versión del ranking (por defecto la actual)
+
+        Returns:
+            str: ETag entre comillas
+        """
+        return f'"{self._arranque}-{self.version if version is None else version}"'
+
+    def obtener_snapshot(
+        self, clave: Hashable, construir: Callable[[], bytes]
+    ) -> Tuple[int, bytes]:
+        """Obtiene una respuesta serializada del ranking para la versión actual.
+
+        Si no existe se construye y se guarda, salvo que el ranking haya cambiado mientras
+        se construía.
+
+        Args:
+            clave: Identificador de la respuesta (por ejemplo los parámetros de la página)
+            construir: Función que consulta y serializa la respuesta
+
+        Returns:
+            Tupla con la versión del ranking y el contenido serializado
+        """
+        with self._lock:
+            version = self.version
+            contenido = self._snapshots.get(clave)
+        if contenido is not None:
+            return version, contenido
+
+        contenido = construir()
+
+        with self._lock:
+            if self.version == version:
+                if len(self._snapshots) >= MAX_SNAPSHOTS:
+                    self._snapshots.pop(next(iter(self._snapshots)))
+                self._snapshots[clave] = contenido
+
+        return version, contenido
+
+    def _asegurar_inicializado(self) -> None:
+        """Crea los índices, carga el ranking y lo reconstruye si está incompleto.
+
+        La reconstrucción se lanza en un hilo aparte y sin el lock: mientras tanto el
+        ranking se sirve con los datos que ya había.
+        """
+        if self._inicializado:
+            return
+
+        with self._lock:
+            if self._inicializado:
+                return
+
+            for collection in (
+                self.ranking_collection,
+                self.periodos_collection,
+                self.publicaciones_collection,
+            ):
+                crear_indices(collection)
+
+            if self.periodos_collection.estimated_document_count() == 0:
+                self._reconstruir_periodos()
+
+            sin_ciudad = self.ranking_collection.find(
+                {"ciudad_clave": {"$exists": False}}, {"_id": 0, "usuario_id": 1, "ciudad": 1}
+            )
+            for entrada in sin_ciudad:
+                self.ranking_collection.update_one(
+                    {"usuario_id": entrada["usuario_id"]},
+                    {"$set": {"ciudad_clave": normalizar_ciudad(entrada.get("ciudad"))}},
+                )
+
+            total_ranking = self.ranking_collection.estimated_document_count()
+            total_usuarios = self.usuarios_collection.estimated_document_count()
+            incompleto = total_ranking < total_usuarios
+            self.cargar_indice()
+            self._inicializado = True
+
+        if incompleto:
+            Thread(target=self._reconstruir_inicial, daemon=True).start()
+
+    def _reconstruir_inicial(self) -> None:
+        """Completa en segundo plano un ranking que estaba incompleto al iniciar."""
+        try:
+            self._reconstruir()
+        except Exception as e:
+            print(f"⚠️ No se pudo reconstruir el ranking: {e}")
+
+    def _marcar_pendiente(self, *emails: Optional[str]) -> None:
+        """Registra usuarios modificados mientras se reconstruye el ranking.
+
+        Args:
+            emails: Correos de los usuarios modificados
+        """
+        with self._lock:
+            if self._pendientes is not None:
+                self._pendientes.update(email for email in emails if email)
+
+    @staticmethod
+    def clave(entrada: dict) -> Tuple[float, str]:
+        """Calcula la clave de orden de un usuario en el ranking.
+
+        Args:
+            entrada: Documento del ranking con puntuacion_total y usuario_id
+
+        Returns:
+            Tupla que ordena de mayor a menor puntuación y luego por usuario_id
+        """
+        return (-entrada.get("puntuacion_total", 0.0), entrada["usuario_id"])
+
+    def cargar_indice(self) -> None:
+        """Reconstruye los índices de posiciones desde la colección del ranking."""
+        with self._lock:
+            self._usar_indices(self._leer_indices(self.ranking_collection))
+
+    def _leer_indices(self, collection) -> IndicesRanking:
+        """Construye índices de posiciones nuevos desde una colección del ranking.
+
+        No toma el lock: los índices construidos no se usan hasta ``_usar_indices``.
+
+        Args:
+            collection: Colección del ranking o su sombra
+
+        Returns:
+            IndicesRanking: Índices con todos los usuarios de la colección
+        """
+        indices = IndicesRanking(IndiceRanking(), {}, {}, {})
+        for entrada in collection.find({}, PROYECCION_INDICE):
+            clave = self.clave(entrada)
+            indices.general.insertar(clave)
+            indices.claves[entrada["usuario_id"]] = clave
+
+            ciudad = entrada.get("ciudad_clave")
+            if ciudad:
+                indices.por_ciudad.setdefault(ciudad, IndiceRanking()).insertar(clave)
+                indices.ciudades[entrada["usuario_id"]] = ciudad
+        return indices
+
+    def _usar_indices(self, indices: IndicesRanking) -> None:
+        """Reemplaza los índices de posiciones en uso.
+
+        Args:
+            indices: Índices construidos con ``_leer_indices``
+        """
+        with self._lock:
+            self._indice, self._claves, self._indices_ciudad, self._ciudades = indices
+            self._nueva_version()
+
+    def _indexar(self, entrada: dict) -> None:
+        """Reemplaza en los índices la clave anterior de un usuario por la actual.
+
+        Además del índice general, el usuario se indexa en la partición de su ciudad, de
+        modo que un cambio de ciudad lo mueve de una partición a otra.
+
+        Args:
+            entrada: Documento del ranking con puntuacion_total, usuario_id y ciudad_clave
+        """
+        with self._lock:
+            usuario_id = entrada["usuario_id"]
+            self._desindexar(usuario_id)
+            clave = self.clave(entrada)
+            self._indice.insertar(clave)
+            self._claves[usuario_id] = clave
+
+            ciudad = entrada.get("ciudad_clave")
+            if ciudad:
+                self._indices_ciudad.setdefault(ciudad, IndiceRanking()).insertar(clave)
+                self._ciudades[usuario_id] = ciudad
+
+    def _desindexar(self, usuario_id: str) -> None:
+        """Quita de los índices la clave de un usuario.
+
+        Args:
+            usuario_id: ID del usuario
+        """
+        with self._lock:
+            anterior = self._claves.pop(usuario_id, None)
+            if anterior is None:
+                return
+
+            self._indice.eliminar(anterior)
+            ciudad = self._ciudades.pop(usuario_id, None)
+            if ciudad:
+                indice_ciudad = self._indices_ciudad[ciudad]
+                indice_ciudad.eliminar(anterior)
+                if not len(indice_ciudad):
+                    del self._indices_ciudad[ciudad]
+
+    @staticmethod
+    def _datos_usuario(usuario: dict) -> Dict[str, Any]:
+        """Extrae los campos públicos del usuario que se guardan en el ranking.
+
+        Args:
+            usuario: Documento del usuario
+
+        Returns:
+            Dict con el ID y los datos públicos del usuario
+        """
+        datos = {campo: usuario.get(campo) for campo in CAMPOS_USUARIO}
+        datos["usuario_id"] = str(usuario["_id"])
+        datos["ciudad_clave"] = normalizar_ciudad(usuario.get("ciudad"))
+        return datos
+
+    def _reconstruir(self) -> None:
+        """Recalcula desde cero la puntuación de todos los usuarios.
+
+        El nuevo ranking se construye por lotes en una colección sombra, junto con sus
+        índices de posiciones, sin tomar el lock: el resto de operaciones del ranking se
+        siguen atendiendo con el ranking anterior. Después la sombra reemplaza al ranking
+        con ``renameCollection``, que es atómico, y bajo el lock solo se cambian las
+        referencias a los índices, así que los lectores nunca ven un ranking a medias.
+
+        Un incremento que llega al ranking anterior durante la reconstrucción se perdería
+        con el reemplazo, así que se recalculan desde sus publicaciones los usuarios
+        modificados mientras tanto: los que marcaron los endpoints de este proceso y los
+        autores de publicaciones con ``updated_at`` posterior al inicio, que cubren las
+        puntuaciones y comentarios hechos desde otros procesos. Se recalculan en la sombra
+        antes del reemplazo y, los que cambiaron después, uno a uno en el ranking nuevo.
+        Los cambios de otros procesos que no tocan ``updated_at`` (eliminar una
+        publicación o editar el perfil) quedan desviados hasta la siguiente
+        reconstrucción.
+
+        Solo se ejecuta una reconstrucción a la vez; si ya hay otra en curso no hace nada.
+        """
+        if not self._lock_reconstruccion.acquire(blocking=False):
+            return
+
+        try:
+            inicio = datetime.now() - MARGEN_RECONSTRUCCION
+            database = self.ranking_collection.database
+            sombra = database[COLECCION_SOMBRA]
+            sombra.drop()
+            crear_indices(sombra, "ranking")
+
+            with self._lock:
+                self._pendientes = set()
+
+            ultimo_id = None
+            while True:
+                filtro = {"_id": {"$gt": ultimo_id}} if ultimo_id else {}
+                lote = self.usuarios_collection.find(filtro, {"_id": 1}).sort("_id", ASCENDING)
+                ids = [usuario["_id"] for usuario in lote.limit(TAMANO_LOTE_RECONSTRUCCION)]
+                if not ids:
+                    break
+
+                entradas = list(self.calcular_puntuaciones({"_id": {"$in": ids}}))
+                for entrada in entradas:
+                    entrada["ciudad_clave"] = normalizar_ciudad(entrada.get("ciudad"))
+                if entradas:
+                    sombra.insert_many(entradas)
+
+                ultimo_id = ids[-1]
+                time.sleep(PAUSA_ENTRE_LOTES)
+
+            with self._lock:
+                pendientes, self._pendientes = self._pendientes, set()
+            reemplazo = datetime.now() - MARGEN_RECONSTRUCCION
+            pendientes.update(
+                self.publicaciones_collection.distinct(
+                    "usuario_id", {"updated_at": {"$gte": inicio}}
+                )
+            )
+            self._recalcular_en_sombra(sombra, pendientes)
+            indices = self._leer_indices(sombra)
+
+            sombra.rename(self.ranking_collection.name, dropTarget=True)
+            with self._lock:
+                pendientes, self._pendientes = self._pendientes, None
+                self._usar_indices(indices)
+                self._top_retos.clear()
+
+            pendientes.update(
+                self.publicaciones_collection.distinct(
+                    "usuario_id", {"updated_at": {"$gte": reemplazo}}
+                )
+            )
+            self._recalcular(pendientes)
+        finally:
+            with self._lock:
+                self._pendientes = None
+            self._lock_reconstruccion.release()
+
+    def _recalcular_en_sombra(self, sombra, emails: Set[str]) -> None:
+        """Recalcula en la colección sombra la puntuación de algunos usuarios.
+
+        Args:
+            sombra: Colección donde se construye el nuevo ranking
+            emails: Correos de los usuarios a recalcular
+        """
+        if not emails:
+            return
+
+        encontrados = set()
+        for entrada in self.calcular_puntuaciones({"email": {"$in": list(emails)}}):
+            entrada["ciudad_clave"] = normalizar_ciudad(entrada.get("ciudad"))
+            sombra.replace_one({"email": entrada["email"]}, entrada, upsert=True)
+            encontrados.add(entrada["email"])
+
+        eliminados = emails - encontrados
+        if eliminados:
+            sombra.delete_many({"email": {"$in": list(eliminados)}})
+
+    def _recalcular(self, emails: Set[str]) -> None:
+        """Recalcula en el ranking la puntuación de algunos usuarios.
+
+        Cada usuario se recalcula y se reindexa bajo el lock, como una actualización
+        incremental, para no pisar un incremento que llegue a la vez.
+
+        Args:
+            emails: Correos de los usuarios a recalcular
+        """
+        for email in emails:
+            with self._lock:
+                entrada = next(self.calcular_puntuaciones({"email": email}), None)
+                if entrada is None:
+                    eliminada = self.ranking_collection.find_one_and_delete(
+                        {"email": email}, projection=PROYECCION_INDICE
+                    )
+                    if eliminada:
+                        self._desindexar(eliminada["usuario_id"])
+                    continue
+
+                entrada["ciudad_clave"] = normalizar_ciudad(entrada.get("ciudad"))
+                self.ranking_collection.replace_one({"email": email}, entrada, upsert=True)
+                self._indexar(entrada)
+
+        if emails:
+            self._nueva_version()
+
+    def reconstruir_ranking(self) -> Dict[str, Any]:
+        """Reconstruye el ranking desde las publicaciones para corregir desviaciones.
+
+        Pensado para ejecutarse periódicamente: corrige las diferencias que dejan las
+        publicaciones modificadas o eliminadas fuera de los endpoints normales.
+
+        Returns:
+            Dict con estadísticas de la reconstrucción
+        """
+        inicio = time.monotonic()
+        try:
+            self._asegurar_inicializado()
+            self._reconstruir()
+        except Exception as e:
+            raise DatabaseError(f"Error al reconstruir el ranking: {str(e)}") from e
+
+        return {
+            "success": True,
+            "usuarios": self.contar(),
+            "duracion_segundos": round(time.monotonic() - inicio, 2),
+            "timestamp": datetime.now().isoformat(),
+        }
+
+    def _reconstruir_periodos(self) -> None:
+        """Agrupa en buckets diarios las puntuaciones ya registradas en las publicaciones."""
+        self.publicaciones_collection.aggregate(
+            [
+                {"$match": {"puntuaciones.0": {"$exists": True}}},
+                {
+                    "$project": {
+                        "usuario_id": 1,
+                        "puntuaciones.puntuacion": 1,
+                        "puntuaciones.fecha": 1,
+                    }
+                },
+                {"$unwind": "$puntuaciones"},
+                {
+                    "$group": {
+                        "_id": {
+                            "usuario_id": "$usuario_id",
+                            "dia": {"$dateTrunc": {"date": "$puntuaciones.fecha", "unit": "day"}},
+                        },
+                        "puntos": {"$sum": "$puntuaciones.puntuacion"},
+                        "total_puntuaciones": {"$sum": 1},
+                    }
+                },
+                {
+                    "$project": {
+                        "_id": 0,
+                        "usuario_id": "$_id.usuario_id",
+                        "dia": "$_id.dia",
+                        "puntos": 1,
+                        "total_puntuaciones": 1,
+                    }
+                },
+                {
+                    "$merge": {
+                        "into": "puntuacion_diaria",
+                        "on": ["usuario_id", "dia"],
+                        "whenMatched": "replace",
+                    }
+                },
+            ]
+        )
+
+    @staticmethod
+    def _incremento_periodo(email: str, puntuacion: dict, signo: int) -> UpdateOne:
+        """Construye la actualización del bucket diario de una puntuación.
+
+        Args:
+            email: Correo del autor de la publicación puntuada
+            puntuacion: Puntuación con los campos puntuacion y fecha
+            signo: 1 para sumar la puntuación y -1 para descontarla
+
+        Returns:
+            UpdateOne: Operación sobre el bucket del día de la puntuación
+        """
+        return UpdateOne(
+            {"usuario_id": email, "dia": inicio_del_dia(puntuacion["fecha"])},
+            {
+                "$inc": {
+                    "puntos": signo * puntuacion["puntuacion"],
+                    "total_puntuaciones": signo,
+                }
+            },
+            upsert=True,
+        )
+
+    def _incrementar(self, email: str, incrementos: Dict[str, float]) -> None:
+        """Aplica incrementos a los contadores de un usuario del ranking.
+
+        Si el usuario aún no tiene entrada en el ranking se crea con sus datos actuales.
+        La actualización y el cambio en el índice se hacen bajo el mismo lock para que el
+        índice refleje siempre el último valor escrito.
+
+        Args:
+            email: Correo del usuario
+            incrementos: Valores a sumar en cada contador
+        """
+        self._asegurar_inicializado()
+
+        with self._lock:
+            self._marcar_pendiente(email)
+            entrada = self.ranking_collection.find_one_and_update(
+                {"email": email},
+                {"$inc": incrementos},
+                projection=PROYECCION_INDICE,
+                return_document=ReturnDocument.AFTER,
+            )
+            if entrada is None:
+                usuario = self.usuarios_collection.find_one({"email": email}, {"password": 0})
+                if not usuario:
+                    return
+
+                self.registrar_usuario(usuario)
+                entrada = self.ranking_collection.find_one_and_update(
+                    {"email": email},
+                    {"$inc": incrementos},
+                    projection=PROYECCION_INDICE,
+                    return_document=ReturnDocument.AFTER,
+                )
+
+            self._indexar(entrada)
+            self._nueva_version()
+
+    def calcular_puntuaciones(self, filtro: Optional[dict] = None) -> Iterator[Dict[str, Any]]:
+        """Calcula en un único pipeline la puntuación de varios usuarios.
+
+        Args:
+            filtro: Filtro sobre la colección de usuarios (por defecto todos)
+
+        Returns:
+            Iterador con los datos públicos y los contadores de cada usuario
+        """
+        try:
+            return self.usuarios_collection.aggregate(pipeline_puntuaciones(filtro or {}))
+        except Exception as e:
+            raise DatabaseError(f"Error al calcular las puntuaciones: {str(e)}") from e
+
+    def calcular_puntuacion(self, usuario_id: str) -> Optional[Dict[str, Any]]:
+        """Calcula en MongoDB la puntuación de un usuario.
+
+        Args:
+            usuario_id: ID del usuario
+
+        Returns:
+            Dict con los datos públicos y los contadores del usuario, o None si no existe
+        """
+        return next(self.calcular_puntuaciones({"_id": ObjectId(usuario_id)}), None)
+
+    def registrar_usuario(self, usuario: dict) -> None:
+        """Agrega un usuario al ranking con sus contadores en cero.
+
+        Args:
+            usuario: Documento del usuario registrado
+        """
+        try:
+            with self._lock:
+                self._marcar_pendiente(usuario["email"])
+                entrada = self.ranking_collection.find_one_and_update(
+                    {"email": usuario["email"]},
+                    {
+                        "$set": self._datos_usuario(usuario),
+                        "$setOnInsert": contadores_vacios(),
+                    },
+                    projection=PROYECCION_INDICE,
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER,
+                )
+                self._indexar(entrada)
+            self._nueva_version()
+        except Exception as e:
+            raise DatabaseError(f"Error al registrar el usuario en el ranking: {str(e)}") from e
+
+    def actualizar_usuario(self, email: str, datos: dict) -> None:
+        """Actualiza los datos públicos de un usuario en el ranking.
+
+        Si cambia la ciudad, el usuario pasa a la partición de la nueva ciudad sin tocar
+        el resto del ranking.
+
+        Args:
+            email: Correo actual del usuario
+            datos: Campos modificados del usuario
+        """
+        cambios = {campo: datos[campo] for campo in CAMPOS_USUARIO if campo in datos}
+        if not cambios:
+            return
+        if "ciudad" in cambios:
+            cambios["ciudad_clave"] = normalizar_ciudad(cambios["ciudad"])
+
+        self._asegurar_inicializado()
+
+        try:
+            with self._lock:
+                self._marcar_pendiente(email, cambios.get("email"))
+                entrada = self.ranking_collection.find_one_and_update(
+                    {"email": email},
+                    {"$set": cambios},
+                    projection=PROYECCION_INDICE,
+                    return_document=ReturnDocument.AFTER,
+                )
+                if entrada:
+                    self._indexar(entrada)
+            self._nueva_version()
+        except Exception as e:
+            raise DatabaseError(f"Error al actualizar el usuario en el ranking: {str(e)}") from e
+
+    def eliminar_usuario(self, email: str) -> None:
+        """Elimina a un usuario del ranking.
+
+        Args:
+            email: Correo del usuario eliminado
+        """
+        try:
+            with self._lock:
+                self._marcar_pendiente(email)
+                entrada = self.ranking_collection.find_one_and_delete(
+                    {"email": email}, projection=PROYECCION_INDICE
+                )
+                if entrada:
+                    self._desindexar(entrada["usuario_id"])
+            self._nueva_version()
+        except Exception as e:
+            raise DatabaseError(f"Error al eliminar el usuario del ranking: {str(e)}") from e
+
+    def registrar_publicacion(self, email: str) -> None:
+        """Suma una publicación nueva al autor.
+
+        Args:
+            email: Correo del autor de la publicación
+        """
+        try:
+            self._incrementar(email, {"total_publicaciones": 1})
+        except Exception as e:
+            raise DatabaseError(f"Error al actualizar el ranking: {str(e)}") from e
+
+    def registrar_puntuacion(
+        self, email: str, promedio_anterior: float, promedio_nuevo: float, nueva: bool
+    ) -> None:
+        """Refleja en el ranking el cambio de promedio de una publicación puntuada.
+
+        Args:
+            email: Correo del autor de la publicación
+            promedio_anterior: Promedio de la publicación antes de la puntuación
+            promedio_nuevo: Promedio de la publicación después de la puntuación
+            nueva: True si la puntuación es nueva y no reemplaza una anterior
+        """
+        incrementos = {"puntuacion_total": promedio_nuevo - promedio_anterior}
+        if nueva:
+            incrementos["publicaciones_con_puntuacion"] = 1
+
+        try:
+            self._incrementar(email, incrementos)
+        except Exception as e:
+            raise DatabaseError(f"Error al actualizar el ranking: {str(e)}") from e
+
+    def registrar_puntuacion_periodo(
+        self, email: str, puntuacion: int, fecha: datetime, anterior: Optional[dict] = None
+    ) -> None:
+        """Suma una puntuación al bucket diario de su autor.
+
+        Si la puntuación reemplaza a otra anterior del mismo usuario, la anterior se
+        descuenta del bucket del día en que se registró.
+
+        Args:
+            email: Correo del autor de la publicación puntuada
+            puntuacion: Estrellas otorgadas
+            fecha: Fecha de la puntuación
+            anterior: Puntuación reemplazada, con los campos puntuacion y fecha
+        """
+        self._asegurar_inicializado()
+
+        operaciones = [
+            self._incremento_periodo(email, {"puntuacion": puntuacion, "fecha": fecha}, 1)
+        ]
+        if anterior and isinstance(anterior.get("fecha"), datetime):
+            operaciones.append(self._incremento_periodo(email, anterior, -1))
+
+        try:
+            self.periodos_collection.bulk_write(operaciones, ordered=False)
+        except Exception as e:
+            raise DatabaseError(f"Error al actualizar el ranking por periodo: {str(e)}") from e
+
+    def eliminar_publicacion(self, publicacion: dict) -> None:
+        """Descuenta del autor una publicación eliminada y sus puntuaciones.
+
+        Args:
+            publicacion: Documento de la publicación eliminada
+        """
+        try:
+            self._incrementar(
+                publicacion["usuario_id"],
+                {
+                    "total_publicaciones": -1,
+                    "puntuacion_total": -publicacion.get("puntuacion_promedio", 0),
+                    "publicaciones_con_puntuacion": -len(publicacion.get("puntuaciones") or []),
+                },
+            )
+        except Exception as e:
+            raise DatabaseError(f"Error al actualizar el ranking: {str(e)}") from e
+
+        try:
+            operaciones = [
+                self._incremento_periodo(publicacion["usuario_id"], p, -1)
+                for p in publicacion.get("puntuaciones") or []
+                if isinstance(p.get("fecha"), datetime)
+            ]
+            if operaciones:
+                self.periodos_collection.bulk_write(operaciones, ordered=False)
+        except Exception as e:
+            raise DatabaseError(f"Error al actualizar el ranking por periodo: {str(e)}") from e
+
+        reto_id = publicacion.get("reto_id")
+        if reto_id:
+            with self._lock:
+                top = self._top_retos.get(reto_id)
+                if top and not top.eliminar(str(publicacion["_id"])):
+                    del self._top_retos[reto_id]
+
+    @staticmethod
+    def _entrada_reto(publicacion: dict) -> Dict[str, Any]:
+        """Extrae de una publicación los datos que se muestran en el top de su reto.
+
+        Args:
+            publicacion: Documento de la publicación
+
+        Returns:
+            Dict con los datos de la publicación en el top
+        """
+        return {
+            "publicacion_id": str(publicacion["_id"]),
+            "titulo": publicacion.get("titulo"),
+            "usuario_id": publicacion.get("usuario_id"),
+            "video": publicacion.get("video"),
+            "puntuacion_promedio": publicacion.get("puntuacion_promedio", 0),
+            "total_puntuaciones": len(publicacion.get("puntuaciones") or []),
+        }
+
+    def _obtener_top_reto(self, reto_id: str) -> TopK:
+        """Obtiene el top de un reto, cargándolo desde la base de datos si no está en memoria.
+
+        La carga se hace bajo el lock para que ninguna actualización se pierda entre la
+        consulta y el registro del top.
+
+        Args:
+            reto_id: ID del reto
+
+        Returns:
+            TopK: Top de publicaciones del reto
+        """
+        with self._lock:
+            top = self._top_retos.get(reto_id)
+            if top is not None:
+                self._top_retos.move_to_end(reto_id)
+                return top
+
+            entradas = list(
+                self.publicaciones_collection.aggregate(pipeline_top_reto(reto_id, TOP_RETO + 1))
+            )
+            top = TopK(
+                TOP_RETO,
+                [(e["publicacion_id"], e["puntuacion_promedio"], e) for e in entradas[:TOP_RETO]],
+                len(entradas) > TOP_RETO,
+            )
+
+            self._top_retos[reto_id] = top
+            if len(self._top_retos) > MAX_RETOS_EN_MEMORIA:
+                self._top_retos.popitem(last=False)
+            return top
+
+    def actualizar_publicacion_reto(self, publicacion: dict) -> None:
+        """Refleja en el top de su reto una publicación creada, editada o puntuada.
+
+        Solo se actualizan los retos cuyo top está en memoria; los demás se cargarán
+        con los datos actuales cuando se consulten.
+
+        Args:
+            publicacion: Documento actualizado de la publicación
+        """
+        reto_id = publicacion.get("reto_id")
+        if not reto_id:
+            return
+
+        entrada = self._entrada_reto(publicacion)
+        with self._lock:
+            top = self._top_retos.get(reto_id)
+            if top and not top.actualizar(
+                entrada["publicacion_id"], entrada["puntuacion_promedio"], entrada
+            ):
+                del self._top_retos[reto_id]
+
+    def descartar_reto(self, reto_id: str) -> None:
+        """Descarta el top en memoria de un reto para que se recargue en la próxima consulta.
+
+        Args:
+            reto_id: ID del reto
+        """
+        with self._lock:
+            self._top_retos.pop(reto_id, None)
+
+    def obtener_top_reto(self, reto_id: str, n: int) -> List[Dict[str, Any]]:
+        """Obtiene las publicaciones mejor puntuadas de un reto.
+
+        Args:
+            reto_id: ID del reto
+            n: Número de publicaciones (como máximo TOP_RETO)
+
+        Returns:
+            Lista de publicaciones con su posición en el reto
+        """
+        self._asegurar_inicializado()
+
+        try:
+            top = self._obtener_top_reto(reto_id)
+            with self._lock:
+                mejores = top.ordenados(n)
+        except Exception as e:
+            raise DatabaseError(f"Error al obtener el ranking del reto: {str(e)}") from e
+
+        return [{**datos, "posicion": i + 1} for i, (_, _, datos) in enumerate(mejores)]
+
+    @staticmethod
+    def formatear_entrada(entrada: dict) -> Dict[str, Any]:
+        """Da formato de respuesta a un documento del ranking.
+
+        Args:
+            entrada: Documento de la colección del ranking
+
+        Returns:
+            Dict con los datos del usuario y su puntuación
+        """
+        puntuacion_total = entrada.get("puntuacion_total", 0.0)
+        con_puntuacion = entrada.get("publicaciones_con_puntuacion", 0)
+        promedio = puntuacion_total / con_puntuacion if con_puntuacion > 0 else 0.0
+
+        return {
+            "usuario_id": entrada["usuario_id"],
+            **{campo: entrada.get(campo) for campo in CAMPOS_USUARIO},
+            "puntuacion_total": round(puntuacion_total, 2),
+            "total_publicaciones": entrada.get("total_publicaciones", 0),
+            "promedio_puntuacion": round(promedio, 2),
+            "publicaciones_con_puntuacion": con_puntuacion,
+        }
+
+    @staticmethod
+    def codificar_cursor(clave: Tuple[float, str]) -> str:
+        """Codifica la clave de orden de un usuario como cursor opaco.
+
+        Args:
+            clave: Clave (-puntuacion_total, usuario_id) del último usuario de la página
+
+        Returns:
+            str: Cursor en base64 apto para URLs
+        """
+        contenido = json.dumps([-clave[0], clave[1]], separators=(",", ":"))
+        return base64.urlsafe_b64encode(contenido.encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def decodificar_cursor(cursor: str) -> Tuple[float, str]:
+        """Obtiene la clave de orden codificada en un cursor.
+
+        Args:
+            cursor: Cursor recibido del cliente
+
+        Returns:
+            Tupla (-puntuacion_total, usuario_id)
+
+        Raises:
+            ValidationError: Si el cursor no es válido
+        """
+        try:
+            puntuacion_total, usuario_id = json.loads(base64.urlsafe_b64decode(cursor))
+            return (-float(puntuacion_total), str(usuario_id))
+        except Exception as e:
+            raise ValidationError("El cursor no es válido") from e
+
+    @staticmethod
+    def filtro_desde(clave: Tuple[float, str], incluir: bool) -> Dict[str, Any]:
+        """Construye el filtro de rango que sigue a una clave en el orden del ranking.
+
+        Args:
+            clave: Clave (-puntuacion_total, usuario_id) de referencia
+            incluir: True si el usuario de la clave también debe cumplir el filtro
+
+        Returns:
+            Dict con el filtro para la colección del ranking
+        """
+        puntuacion_total, usuario_id = -clave[0], clave[1]
+        return {
+            "$or": [
+                {"puntuacion_total": {"$lt": puntuacion_total}},
+                {
+                    "puntuacion_total": puntuacion_total,
+                    "usuario_id": {"$gte" if incluir else "$gt": usuario_id},
+                },
+            ]
+        }
+
+    @staticmethod
+    def filtro_antes(clave: Tuple[float, str]) -> Dict[str, Any]:
+        """Construye el filtro de rango que precede a una clave en el orden del ranking.
+
+        Args:
+            clave: Clave (-puntuacion_total, usuario_id) de referencia
+
+        Returns:
+            Dict con el filtro para la colección del ranking
+        """
+        puntuacion_total, usuario_id = -clave[0], clave[1]
+        return {
+            "$or": [
+                {"puntuacion_total": {"$gt": puntuacion_total}},
+                {"puntuacion_total": puntuacion_total, "usuario_id": {"$lt": usuario_id}},
+            ]
+        }
+
+    def _indice_de(self, ciudad: Optional[str]) -> IndiceRanking:
+        """Obtiene el índice de posiciones general o el de la partición de una ciudad.
+
+        Args:
+            ciudad: Clave normalizada de la ciudad, o None para el ranking general
+
+        Returns:
+            IndiceRanking: Índice correspondiente (vacío si la ciudad no tiene usuarios)
+        """
+        if ciudad is None:
+            return self._indice
+        return self._indices_ciudad.get(ciudad) or IndiceRanking()
+
+    def obtener_pagina(
+        self,
+        limit: int,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        ciudad: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Obtiene una página del ranking ordenada por puntuación.
+
+        La página se lee con una consulta de rango sobre el índice
+        ``(puntuacion_total, usuario_id)`` que empieza justo después del cursor, por lo
+        que su costo no depende de qué tan profunda sea. Si no hay cursor, la clave que
+        ocupa la posición ``offset`` se obtiene del índice en memoria.
+
+        Con ``ciudad`` la consulta se restringe a la partición de esa ciudad, que usa el
+        índice ``(ciudad_clave, puntuacion_total, usuario_id)``, y las posiciones son
+        relativas a la ciudad.
+
+        Args:
+            limit: Límite de resultados
+            offset: Desplazamiento (se ignora si se envía un cursor)
+            cursor: Cursor devuelto con la página anterior
+            ciudad: Ciudad a la que se restringe el ranking
+
+        Returns:
+            Tupla con los usuarios de la página y el cursor de la siguiente, o None si
+            no hay más usuarios
+        """
+        self._asegurar_inicializado()
+
+        ciudad = normalizar_ciudad(ciudad) if ciudad is not None else None
+        if cursor:
+            filtro = self.filtro_desde(self.decodificar_cursor(cursor), incluir=False)
+        else:
+            with self._lock:
+                indice = self._indice_de(ciudad)
+                if offset >= len(indice):
+                    return [], None
+                filtro = self.filtro_desde(indice.clave_en(offset), incluir=True)
+
+        if ciudad is not None:
+            filtro["ciudad_clave"] = ciudad
+
+        entradas = list(
+            self.ranking_collection.find(filtro, {"_id": 0}).sort(ORDEN_RANKING).limit(limit)
+        )
+        if not entradas:
+            return [], None
+
+        with self._lock:
+            inicio = self._indice_de(ciudad).contar_menores(self.clave(entradas[0]))
+
+        siguiente = None
+        if len(entradas) == limit:
+            siguiente = self.codificar_cursor(self.clave(entradas[-1]))
+
+        pagina = [
+            {**self.formatear_entrada(entrada), "posicion": inicio + i + 1}
+            for i, entrada in enumerate(entradas)
+        ]
+        return pagina, siguiente
+
+    def obtener_posicion(self, usuario_id: str) -> Optional[Dict[str, Any]]:
+        """Obtiene la entrada de un usuario en el ranking junto con su posición.
+
+        La posición y el número de usuarios con mayor puntuación se resuelven en el
+        índice en memoria, sin recorrer el resto del ranking.
+
+        Args:
+            usuario_id: ID del usuario
+
+        Returns:
+            Dict con la puntuación, la posición y los usuarios por delante, o None si el
+            usuario no está en el ranking
+        """
+        self._asegurar_inicializado()
+
+        entrada = self.ranking_collection.find_one({"usuario_id": usuario_id}, {"_id": 0})
+        if not entrada:
+            return None
+
+        with self._lock:
+            clave = self.clave(entrada)
+            if self._claves.get(usuario_id) != clave:
+                self._indexar(entrada)
+            posicion = self._indice.posicion(clave)
+            por_delante = self._indice.contar_menores((clave[0], ""))
+
+        return {
+            **self.formatear_entrada(entrada),
+            "posicion": posicion + 1,
+            "usuarios_por_delante": por_delante,
+        }
+
+    def obtener_alrededor(self, usuario_id: str, k: int) -> Optional[Dict[str, Any]]:
+        """Obtiene los k usuarios anteriores y posteriores a un usuario en el ranking.
+
+        Ambos lados se leen con consultas de rango sobre el índice del ranking que parten
+        de la clave del usuario, una en orden inverso, por lo que el costo depende de k y
+        no del total de usuarios.
+
+        Args:
+            usuario_id: ID del usuario
+            k: Número de usuarios a cada lado
+
+        Returns:
+            Dict con la entrada del usuario y la ventana ordenada del ranking, o None si
+            el usuario no está en el ranking
+        """
+        usuario = self.obtener_posicion(usuario_id)
+        if not usuario:
+            return None
+
+        clave = (-usuario["puntuacion_total"], usuario_id)
+        with self._lock:
+            clave = self._claves.get(usuario_id, clave)
+
+        orden_inverso = [(campo, -direccion) for campo, direccion in ORDEN_RANKING]
+        anteriores = list(
+            self.ranking_collection.find(self.filtro_antes(clave), {"_id": 0})
+            .sort(orden_inverso)
+            .limit(k)
+        )
+        anteriores.reverse()
+        siguientes = self.ranking_collection.find(
+            self.filtro_desde(clave, incluir=False), {"_id": 0}
+        )
+        siguientes = list(siguientes.sort(ORDEN_RANKING).limit(k))
+
+        posicion = usuario["posicion"]
+        ventana = [
+            {**self.formatear_entrada(entrada), "posicion": posicion - len(anteriores) + i}
+            for i, entrada in enumerate(anteriores)
+        ]
+        ventana.append(
+            {key: valor for key, valor in usuario.items() if key != "usuarios_por_delante"}
+        )
+        ventana.extend(
+            {**self.formatear_entrada(entrada), "posicion": posicion + i + 1}
+            for i, entrada in enumerate(siguientes)
+        )
+
+        return {"usuario": usuario, "ranking": ventana}
+
+    def obtener_pagina_periodo(
+        self, inicio: datetime, limit: int, offset: int
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Obtiene una página del ranking de puntuaciones recibidas desde una fecha.
+
+        Args:
+            inicio: Fecha de inicio del periodo
+            limit: Límite de resultados
+            offset: Desplazamiento
+
+        Returns:
+            Tupla con la página del ranking y el total de usuarios puntuados en el periodo
+        """
+        self._asegurar_inicializado()
+
+        try:
+            resultado = next(
+                self.periodos_collection.aggregate(pipeline_ranking_periodo(inicio, limit, offset))
+            )
+        except Exception as e:
+            raise DatabaseError(f"Error al obtener el ranking del periodo: {str(e)}") from e
+
+        ranking = []
+        for i, entrada in enumerate(resultado["ranking"]):
+            total_puntuaciones = entrada["total_puntuaciones"]
+            ranking.append(
+                {
+                    **entrada,
+                    "promedio_puntuacion": round(entrada["puntos"] / total_puntuaciones, 2),
+                    "posicion": offset + i + 1,
+                }
+            )
+
+        total = resultado["total"][0]["total"] if resultado["total"] else 0
+        return ranking, total
+
+    def contar(self, ciudad: Optional[str] = None) -> int:
+        """Cuenta los usuarios que forman parte del ranking o de la partición de una ciudad.
+
+        El conteo sale del índice en memoria, que contiene una clave por usuario.
+
+        Args:
+            ciudad: Ciudad a la que se restringe el conteo
+
+        Returns:
+            int: Número de usuarios en el ranking
+        """
+        self._asegurar_inicializado()
+        with self._lock:
+            if ciudad is None:
+                return len(self._indice)
+            return len(self._indice_de(normalizar_ciudad(ciudad)))
+
+
+ranking_service = RankingService()
@@ -0,0 +1,228 @@
+"""Servicio para la sincronización incremental de publicaciones"""
+
+import base64
+import heapq
+import json
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson.objectid import ObjectId
+from pymongo import ASCENDING
+
+from util.load_data import get_mongo_data
+from exceptions.custom_exceptions import ValidationError
+
+
+COLECCION_ELIMINADAS = "publicacion_eliminada"
+"""Colección con las marcas de las publicaciones eliminadas."""
+
+RETENCION_ELIMINADAS = timedelta(days=30)
+"""Tiempo que se conservan las marcas de eliminación."""
+
+MARGEN_SINCRONIZACION = timedelta(seconds=2)
+"""Antigüedad mínima de un cambio para entregarlo.
+
+Las escrituras toman su fecha antes de confirmarse, así que un cambio reciente podría
+aparecer después de que el cliente ya avanzó su cursor más allá de esa fecha. Esperar
+este margen evita perder esos cambios.
+"""
+
+ORDEN_CAMBIOS = [("updated_at", ASCENDING), ("_id", ASCENDING)]
+"""Orden en que se entregan los cambios."""
+
+ID_MAXIMO = ObjectId("f" * 24)
+"""ID mayor que cualquier otro, para cursores que cubren todos los cambios de una fecha."""
+
+
+class SincronizacionService:
+    """Lleva el registro de cambios de las publicaciones para la sincronización.
+
+    Cada publicación guarda en ``updated_at`` la fecha de su última modificación y cada
+    eliminación deja una marca con la misma fecha. El cliente recibe los cambios en
+    orden (updated_at, _id) y guarda el cursor del último para pedir solo lo que cambió
+    después.
+    """
+
+    def __init__(self):
+        self.publicaciones_collection = get_mongo_data("publicacion")
+        self.eliminadas_collection = get_mongo_data(COLECCION_ELIMINADAS)
+        self._lock = Lock()
+        self._inicializado = False
+
+    def _asegurar_inicializado(self) -> None:
+        """Asigna ``updated_at`` a las publicaciones anteriores a la sincronización.
+
+        Se usa la fecha de creación contenida en el ObjectId de la publicación. Esa fecha
+        está en UTC y las demás escrituras guardan la hora local de ``datetime.now()``,
+        así que se desplaza a la hora local del servidor.
+        """
+        if self._inicializado:
+            return
+
+        with self._lock:
+            if self._inicializado:
+                return
+
+            desfase = datetime.now().astimezone().utcoffset() // timedelta(milliseconds=1)
+            self.publicaciones_collection.update_many(
+                {"updated_at": {"$exists": False}},
+                [{"$set": {"updated_at": {"$add": [{"$toDate": "$_id"}, desfase]}}}],
+            )
+            self._inicializado = True
+
+    def registrar_eliminacion(self, publicacion_id: Any) -> None:
+        """Deja la marca de una publicación eliminada.
+
+        Args:
+            publicacion_id: ID de la publicación eliminada
+        """
+        ahora = datetime.now()
+        self.eliminadas_collection.update_one(
+            {"_id": ObjectId(publicacion_id)},
+            {"$set": {"updated_at": ahora, "expira": ahora + RETENCION_ELIMINADAS}},
+            upsert=True,
+        )
+
+    @staticmethod
+    def codificar_cursor(fecha: datetime, documento_id: ObjectId, inicio: datetime) -> str:
+        """Codifica la posición del último cambio entregado como cursor opaco.
+
+        Args:
+            fecha: Fecha del último cambio
+            documento_id: ID de la publicación del último cambio
+            inicio: Fecha desde la que el cliente necesita las marcas de eliminación
+
+        Returns:
+            str: Cursor en base64 apto para URLs
+        """
+        contenido = json.dumps(
+            [fecha.isoformat(), str(documento_id), inicio.isoformat()], separators=(",", ":")
+        )
+        return base64.urlsafe_b64encode(contenido.encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def decodificar_cursor(cursor: str) -> Tuple[datetime, ObjectId, datetime]:
+        """Obtiene la posición codificada en un cursor.
+
+        Los cursores anteriores, sin fecha de inicio, usan la fecha del último cambio.
+
+        Args:
+            cursor: Cursor recibido del cliente
+
+        Returns:
+            Tupla (updated_at, _id) del último cambio recibido y la fecha de inicio
+
+        Raises:
+            ValidationError: Si el cursor no es válido
+        """
+        try:
+            fecha, documento_id, *inicio = json.loads(base64.urlsafe_b64decode(cursor))
+            fecha = datetime.fromisoformat(fecha)
+            inicio = datetime.fromisoformat(inicio[0]) if inicio else fecha
+            return fecha, ObjectId(documento_id), inicio
+        except Exception as e:
+            raise ValidationError("El cursor no es válido") from e
+
+    @staticmethod
+    def _filtro(desde: Optional[Tuple[datetime, ObjectId]], hasta: datetime) -> Dict[str, Any]:
+        """Construye el filtro de los cambios posteriores a un cursor.
+
+        Args:
+            desde: Posición (updated_at, _id) del último cambio recibido, o None
+            hasta: Fecha máxima de los cambios a entregar
+
+        Returns:
+            Dict con el filtro
+        """
+        if desde is None:
+            return {"updated_at": {"$lte": hasta}}
+
+        fecha, documento_id = desde
+        return {
+            "updated_at": {"$lte": hasta},
+            "$or": [
+                {"updated_at": {"$gt": fecha}},
+                {"updated_at": fecha, "_id": {"$gt": documento_id}},
+            ],
+        }
+
+    def obtener_cambios(
+        self, cursor: Optional[str], limit: int, etapas_publicacion: List[dict]
+    ) -> Dict[str, Any]:
+        """Obtiene las publicaciones modificadas y eliminadas después de un cursor.
+
+        El cursor guarda, además de la posición, la fecha desde la que el cliente
+        necesita las marcas de eliminación: el ``hasta`` de la primera página de la
+        sincronización en curso, o de la última página de la sincronización anterior si
+        ya terminó. Las páginas intermedias la conservan, así que recorrer publicaciones
+        antiguas no cuenta como cursor vencido. Si esa fecha es anterior a la retención
+        de las marcas, algunas eliminaciones ya no se pueden informar; en ese caso se
+        entrega la sincronización completa desde el inicio y ``completa`` indica al
+        cliente que descarte su copia.
+
+        Args:
+            cursor: Cursor de la última sincronización, o None para la primera
+            limit: Número máximo de cambios
+            etapas_publicacion: Etapas de agregación que dan formato a las publicaciones
+
+        Returns:
+            Dict con las publicaciones actualizadas, los IDs eliminados, el cursor para
+            continuar, si hay más cambios y si la sincronización es completa
+        """
+        self._asegurar_inicializado()
+
+        ahora = datetime.now()
+        hasta = ahora - MARGEN_SINCRONIZACION
+        desde, inicio = None, hasta
+        if cursor:
+            fecha, documento_id, inicio_cursor = self.decodificar_cursor(cursor)
+            if inicio_cursor >= ahora - RETENCION_ELIMINADAS:
+                desde, inicio = (fecha, documento_id), inicio_cursor
+        completa = desde is None
+
+        filtro = self._filtro(desde, hasta)
+        publicaciones = self.publicaciones_collection.aggregate(
+            [
+                {"$match": filtro},
+                {"$sort": dict(ORDEN_CAMBIOS)},
+                {"$limit": limit + 1},
+                *etapas_publicacion,
+            ]
+        )
+        eliminadas = []
+        if not completa:
+            eliminadas = (
+                self.eliminadas_collection.find(filtro, {"updated_at": 1})
+                .sort(ORDEN_CAMBIOS)
+                .limit(limit + 1)
+            )
+
+        cambios = list(
+            heapq.merge(
+                (("actualizada", pub) for pub in publicaciones),
+                (("eliminada", marca) for marca in eliminadas),
+                key=lambda cambio: (cambio[1]["updated_at"], cambio[1]["_id"]),
+            )
+        )
+        hay_mas = len(cambios) > limit
+        cambios = cambios[:limit]
+
+        if hay_mas:
+            ultimo = cambios[-1][1]
+            siguiente_cursor = self.codificar_cursor(ultimo["updated_at"], ultimo["_id"], inicio)
+        else:
+            siguiente_cursor = self.codificar_cursor(hasta, ID_MAXIMO, hasta)
+
+        return {
+            "actualizadas": [documento for tipo, documento in cambios if tipo == "actualizada"],
+            "eliminadas": [
+                str(documento["_id"]) for tipo, documento in cambios if tipo == "eliminada"
+            ],
+            "siguiente_cursor": siguiente_cursor,
+            "hay_mas": hay_mas,
+            "completa": completa,
+        }
+
+
+sincronizacion_service = SincronizacionService()
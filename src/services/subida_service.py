@@ -0,0 +1,394 @@
+"""Servicio para las subidas reanudables de videos"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
+from bson.binary import Binary
+from bson.objectid import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from util.load_data import get_mongo_data
+from util.subida import MAX_BYTES_SUBIDA, FormularioVideo
+from exceptions.custom_exceptions import (
+    AuthorizationError,
+    BusinessLogicError,
+    FileError,
+    NotFoundError,
+    ValidationError,
+)
+
+
+COLECCION_SUBIDAS = "subidas"
+"""Colección con las sesiones de subida."""
+
+TAMANO_CHUNK_SUBIDA = 1024 * 1024
+"""Bytes de cada chunk; cada uno se guarda tal cual como un chunk de GridFS."""
+
+VIGENCIA_SUBIDA = timedelta(hours=24)
+"""Tiempo sin recibir chunks tras el cual una subida se descarta."""
+
+MAX_SUBIDAS_ABIERTAS = 3
+"""Número máximo de subidas sin finalizar que un usuario puede tener a la vez."""
+
+TIEMPO_MAXIMO_FINALIZACION = timedelta(minutes=5)
+"""Tiempo tras el cual una finalización sin terminar se considera interrumpida.
+
+Si el servidor se detiene mientras finaliza una subida, esta queda en estado
+``finalizando``; pasado este tiempo se puede volver a finalizar.
+"""
+
+
+class SubidaService:
+    """Gestiona las subidas de videos por chunks que se pueden reanudar.
+
+    El ID de la subida es también el ID del archivo en GridFS: cada chunk recibido se
+    escribe directamente en ``fs.chunks`` con su número, y al finalizar solo se crea el
+    documento de ``fs.files``. Reenviar un chunk lo sobrescribe, así que un reintento
+    tras una conexión caída no deja datos duplicados ni obliga a reenviar lo ya recibido.
+    """
+
+    def __init__(self):
+        self.subidas_collection = get_mongo_data(COLECCION_SUBIDAS)
+        db = self.subidas_collection.database
+        self.archivos_collection = db["fs.files"]
+        self.chunks_collection = db["fs.chunks"]
+
+    @staticmethod
+    def total_chunks(tamano: int) -> int:
+        """Calcula el número de chunks de un video.
+
+        Args:
+            tamano: Tamaño del video en bytes
+
+        Returns:
+            int: Número de chunks
+        """
+        return -(-tamano // TAMANO_CHUNK_SUBIDA)
+
+    @classmethod
+    def estado(cls, subida: Dict[str, Any]) -> Dict[str, Any]:
+        """Describe el avance de una subida.
+
+        Args:
+            subida: Documento de la subida
+
+        Returns:
+            Dict con los campos de SubidaEstadoResponse
+        """
+        total = cls.total_chunks(subida["tamano"])
+        return {
+            "subida_id": str(subida["_id"]),
+            "tamano": subida["tamano"],
+            "tamano_chunk": TAMANO_CHUNK_SUBIDA,
+            "total_chunks": total,
+            "siguiente_chunk": subida["siguiente_chunk"],
+            "offset": min(subida["siguiente_chunk"] * TAMANO_CHUNK_SUBIDA, subida["tamano"]),
+            "completa": subida["siguiente_chunk"] >= total,
+        }
+
+    def crear(
+        self,
+        campos: Dict[str, str],
+        tamano: int,
+        content_type: str,
+        nombre_archivo: Optional[str],
+        usuario_id: str,
+    ) -> Dict[str, Any]:
+        """Inicia una subida.
+
+        Args:
+            campos: Campos de texto de la publicación, ya validados
+            tamano: Tamaño total del video en bytes
+            content_type: Tipo de contenido del video
+            nombre_archivo: Nombre original del archivo
+            usuario_id: Email del usuario que sube el video
+
+        Returns:
+            Dict con el estado inicial de la subida
+
+        Raises:
+            FileError: Si el video supera el tamaño máximo o no es un video
+            BusinessLogicError: Si el usuario ya tiene demasiadas subidas sin finalizar
+        """
+        if tamano > MAX_BYTES_SUBIDA:
+            raise FileError(f"El video no puede superar {MAX_BYTES_SUBIDA // (1024 * 1024)} MB.")
+        if not content_type.startswith("video/"):
+            raise FileError("El archivo debe ser un video.")
+
+        ahora = datetime.now()
+        abiertas = self.subidas_collection.count_documents(
+            {"usuario_id": usuario_id, "estado": {"$ne": "finalizada"}, "expira": {"$gt": ahora}}
+        )
+        if abiertas >= MAX_SUBIDAS_ABIERTAS:
+            raise BusinessLogicError(
+                f"No puedes tener más de {MAX_SUBIDAS_ABIERTAS} subidas sin finalizar", 409
+            )
+
+        subida = {
+            "_id": ObjectId(),
+            "usuario_id": usuario_id,
+            "campos": campos,
+            "tamano": tamano,
+            "content_type": content_type,
+            "nombre_archivo": nombre_archivo,
+            "siguiente_chunk": 0,
+            "estado": "abierta",
+            "creada": ahora,
+            "expira": ahora + VIGENCIA_SUBIDA,
+        }
+        self.subidas_collection.insert_one(subida)
+        return self.estado(subida)
+
+    def obtener(self, subida_id: str, usuario_id: str) -> Dict[str, Any]:
+        """Obtiene una subida del usuario.
+
+        Args:
+            subida_id: ID de la subida
+            usuario_id: Email del usuario autenticado
+
+        Returns:
+            Dict con el documento de la subida
+
+        Raises:
+            NotFoundError: Si la subida no existe o expiró
+            AuthorizationError: Si la subida es de otro usuario
+        """
+        if not ObjectId.is_valid(subida_id):
+            raise NotFoundError("Subida")
+
+        subida = self.subidas_collection.find_one({"_id": ObjectId(subida_id)})
+        if not subida or subida["expira"] < datetime.now():
+            raise NotFoundError("Subida")
+        if subida["usuario_id"] != usuario_id:
+            raise AuthorizationError("No tienes permiso para acceder a esta subida")
+
+        return subida
+
+    def guardar_chunk(
+        self, subida_id: str, numero: int, datos: bytes, usuario_id: str
+    ) -> Dict[str, Any]:
+        """Guarda un chunk del video directamente en GridFS.
+
+        Se aceptan chunks ya recibidos (reintentos) y el siguiente pendiente; un chunk
+        posterior indica que el cliente perdió el hilo y debe consultar el estado.
+
+        Args:
+            subida_id: ID de la subida
+            numero: Número del chunk, desde 0
+            datos: Bytes del chunk
+            usuario_id: Email del usuario autenticado
+
+        Returns:
+            Dict con el estado de la subida
+
+        Raises:
+            NotFoundError: Si la subida no existe o expiró
+            AuthorizationError: Si la subida es de otro usuario
+            BusinessLogicError: Si la subida ya no admite chunks o falta uno anterior
+            ValidationError: Si el número o el tamaño del chunk no son válidos
+        """
+        subida = self.obtener(subida_id, usuario_id)
+        if subida["estado"] != "abierta":
+            raise BusinessLogicError("La subida ya fue finalizada", 409)
+
+        total = self.total_chunks(subida["tamano"])
+        if not 0 <= numero < total:
+            raise ValidationError(f"El número de chunk debe estar entre 0 y {total - 1}.")
+        if numero > subida["siguiente_chunk"]:
+            raise BusinessLogicError(
+                f"Se esperaba el chunk {subida['siguiente_chunk']}, no el {numero}", 409
+            )
+
+        esperado = min(TAMANO_CHUNK_SUBIDA, subida["tamano"] - numero * TAMANO_CHUNK_SUBIDA)
+        if len(datos) != esperado:
+            raise ValidationError(f"El chunk {numero} debe tener {esperado} bytes.")
+
+        filtro = {"files_id": subida["_id"], "n": numero}
+        try:
+            self.chunks_collection.update_one(
+                filtro, {"$set": {"data": Binary(datos)}}, upsert=True
+            )
+        except DuplicateKeyError:
+            self.chunks_collection.update_one(filtro, {"$set": {"data": Binary(datos)}})
+
+        subida = self.subidas_collection.find_one_and_update(
+            {"_id": subida["_id"]},
+            {
+                "$max": {"siguiente_chunk": numero + 1},
+                "$set": {"expira": datetime.now() + VIGENCIA_SUBIDA},
+            },
+            return_document=ReturnDocument.AFTER,
+        )
+        return self.estado(subida)
+
+    def finalizar(
+        self,
+        subida_id: str,
+        usuario_id: str,
+        validar: Callable[[Dict[str, str]], None],
+        guardar: Callable[[FormularioVideo], Dict[str, Any]],
+        recuperar: Callable[[ObjectId], Optional[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        """Cierra el archivo en GridFS y crea la publicación de una subida completa.
+
+        Finalizar de nuevo una subida ya finalizada devuelve la misma respuesta, para
+        que el cliente pueda reintentar si pierde la conexión esperando la respuesta.
+        Una finalización interrumpida se puede retomar pasado TIEMPO_MAXIMO_FINALIZACION.
+        Antes de crear la publicación se busca una ya creada con el video, así que un
+        reintento tras un fallo a medias nunca la duplica; y el archivo de GridFS solo se
+        elimina al fallar si ninguna publicación lo usa.
+
+        Args:
+            subida_id: ID de la subida
+            usuario_id: Email del usuario autenticado
+            validar: Función que vuelve a validar los campos de la publicación
+            guardar: Función que crea la publicación y devuelve su respuesta como dict
+            recuperar: Función que busca la publicación ya creada con el ID del video y
+                devuelve su respuesta como dict, o None si no existe
+
+        Returns:
+            Dict con la respuesta de la creación de la publicación
+
+        Raises:
+            NotFoundError: Si la subida no existe o expiró
+            AuthorizationError: Si la subida es de otro usuario
+            BusinessLogicError: Si faltan chunks o la subida se está finalizando
+        """
+        subida = self.obtener(subida_id, usuario_id)
+        if subida["estado"] == "finalizada":
+            return subida["respuesta"]
+
+        total = self.total_chunks(subida["tamano"])
+        recibidos = self.chunks_collection.count_documents({"files_id": subida["_id"]})
+        if subida["siguiente_chunk"] < total or recibidos != total:
+            raise BusinessLogicError(
+                f"Faltan chunks: se recibieron {subida['siguiente_chunk']} de {total}", 409
+            )
+
+        ahora = datetime.now()
+        reclamada = self.subidas_collection.find_one_and_update(
+            {
+                "_id": subida["_id"],
+                "$or": [
+                    {"estado": "abierta"},
+                    {
+                        "estado": "finalizando",
+                        "finalizando_desde": {"$lt": ahora - TIEMPO_MAXIMO_FINALIZACION},
+                    },
+                ],
+            },
+            {"$set": {"estado": "finalizando", "finalizando_desde": ahora}},
+        )
+        if not reclamada:
+            raise BusinessLogicError("La subida se está finalizando", 409)
+
+        try:
+            respuesta = recuperar(subida["_id"])
+            if respuesta is not None:
+                self._marcar_finalizada(subida["_id"], respuesta)
+                return respuesta
+
+            validar(subida["campos"])
+            self.archivos_collection.replace_one(
+                {"_id": subida["_id"]},
+                {
+                    "_id": subida["_id"],
+                    "length": subida["tamano"],
+                    "chunkSize": TAMANO_CHUNK_SUBIDA,
+                    "uploadDate": datetime.now(timezone.utc),
+                    "filename": subida["nombre_archivo"],
+                    "contentType": subida["content_type"],
+                },
+                upsert=True,
+            )
+            respuesta = guardar(FormularioVideo(campos=subida["campos"], video_id=subida["_id"]))
+        except Exception:
+            self._deshacer_finalizacion(subida["_id"], recuperar)
+            raise
+
+        self._marcar_finalizada(subida["_id"], respuesta)
+        return respuesta
+
+    def _deshacer_finalizacion(
+        self, subida_id: ObjectId, recuperar: Callable[[ObjectId], Optional[Dict[str, Any]]]
+    ) -> None:
+        """Devuelve a ``abierta`` una subida cuya finalización falló.
+
+        El documento de ``fs.files`` solo se elimina si ninguna publicación usa el video;
+        si no se puede comprobar, se conserva. El reintento encontrará la publicación.
+        """
+        try:
+            publicada = recuperar(subida_id) is not None
+        except Exception:
+            publicada = True
+
+        if not publicada:
+            self.archivos_collection.delete_one({"_id": subida_id})
+        self.subidas_collection.update_one({"_id": subida_id}, {"$set": {"estado": "abierta"}})
+
+    def _marcar_finalizada(self, subida_id: ObjectId, respuesta: Dict[str, Any]) -> None:
+        """Guarda la respuesta de una subida finalizada para devolverla en los reintentos."""
+        self.subidas_collection.update_one(
+            {"_id": subida_id},
+            {
+                "$set": {
+                    "estado": "finalizada",
+                    "respuesta": respuesta,
+                    "expira": datetime.now() + VIGENCIA_SUBIDA,
+                }
+            },
+        )
+
+    def cancelar(self, subida_id: str, usuario_id: str) -> None:
+        """Cancela una subida y elimina los chunks recibidos.
+
+        Args:
+            subida_id: ID de la subida
+            usuario_id: Email del usuario autenticado
+
+        Raises:
+            NotFoundError: Si la subida no existe
+            AuthorizationError: Si la subida es de otro usuario
+            BusinessLogicError: Si la subida ya fue finalizada
+        """
+        subida = self.obtener(subida_id, usuario_id)
+        if subida["estado"] != "abierta":
+            raise BusinessLogicError("La subida ya fue finalizada", 409)
+
+        self.subidas_collection.delete_one({"_id": subida["_id"]})
+        self.chunks_collection.delete_many({"files_id": subida["_id"]})
+
+    def limpiar_expiradas(self) -> Dict[str, Any]:
+        """Elimina las subidas vencidas y los chunks de las que no se finalizaron.
+
+        Los chunks se conservan si el archivo ya existe en GridFS, por ejemplo si el
+        servidor se detuvo después de crear la publicación y antes de marcar la subida.
+
+        Returns:
+            Dict con estadísticas de la limpieza
+        """
+        subidas_expiradas = self.subidas_collection.find(
+            {"expira": {"$lt": datetime.now()}}, {"estado": 1}
+        )
+
+        subidas_eliminadas = 0
+        chunks_eliminados = 0
+        for subida in subidas_expiradas:
+            if subida["estado"] != "finalizada" and not self.archivos_collection.find_one(
+                {"_id": subida["_id"]}, {"_id": 1}
+            ):
+                result = self.chunks_collection.delete_many({"files_id": subida["_id"]})
+                chunks_eliminados += result.deleted_count
+            self.subidas_collection.delete_one({"_id": subida["_id"]})
+            subidas_eliminadas += 1
+
+        return {
+            "success": True,
+            "subidas_eliminadas": subidas_eliminadas,
+            "chunks_eliminados": chunks_eliminados,
+            "timestamp": datetime.now().isoformat(),
+        }
+
+
+subida_service = SubidaService()
@@ -0,0 +1,260 @@
+"""Caché en disco de los videos más reproducidos"""
+
+import json
+import os
+import secrets
+import tempfile
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+DIRECTORIO_CACHE = os.getenv(
+    "VIDEO_CACHE_DIR", os.path.join(tempfile.gettempdir(), "ucofit_videos")
+)
+"""Directorio donde se guardan los videos en caché."""
+
+MAX_BYTES_CACHE = int(os.getenv("VIDEO_CACHE_MAX_MB", "1024")) * 1024 * 1024
+"""Espacio máximo en disco que ocupan los videos en caché."""
+
+MAX_BYTES_VIDEO = int(os.getenv("VIDEO_CACHE_MAX_VIDEO_MB", "200")) * 1024 * 1024
+"""Tamaño máximo de un video para guardarlo en caché."""
+
+
+class EscrituraVideo:
+    """Escritura de un video en la caché a medida que se envía al cliente.
+
+    Los bytes se escriben en un archivo temporal y el video solo entra en la caché al
+    confirmarlo completo. Si se cierra sin confirmar, por ejemplo porque el cliente se
+    desconectó, el archivo temporal se elimina. Un error de disco solo detiene la
+    escritura: nunca interrumpe la respuesta al cliente.
+
+    Los métodos escriben en disco de forma bloqueante, así que desde una ruta
+    asíncrona se llaman en el threadpool.
+    """
+
+    def __init__(self, cache: "VideoCacheService", video_id: str, temporal: str):
+        self.cache = cache
+        self.video_id = video_id
+        self.temporal = temporal
+        self._archivo = None
+        self._fallida = False
+
+    def escribir(self, datos: bytes) -> None:
+        """Añade bytes al final del archivo temporal.
+
+        Args:
+            datos: Bytes del video, en orden
+        """
+        if self._fallida:
+            return
+        try:
+            if self._archivo is None:
+                self._archivo = open(self.temporal, "wb")
+            self._archivo.write(datos)
+        except OSError as e:
+            print(f"⚠️ No se pudo guardar el video {self.video_id} en caché: {e}")
+            self._fallida = True
+
+    def confirmar(self, metadatos: Dict[str, Any]) -> None:
+        """Publica el video en la caché una vez escrito completo.
+
+        Args:
+            metadatos: Tamaño, tipo de contenido y fecha de subida del video
+        """
+        try:
+            if self._archivo is None:
+                self.escribir(b"")
+            if not self._fallida:
+                self._archivo.close()
+                self.cache._publicar(self.video_id, self.temporal, metadatos)
+        finally:
+            self.cerrar()
+
+    def cerrar(self) -> None:
+        """Libera la reserva y elimina el archivo temporal si el video no se publicó."""
+        if self._archivo is not None:
+            self._archivo.close()
+        self.cache._liberar(self.video_id, self.temporal)
+
+
+class VideoCacheService:
+    """Caché LRU en disco de videos de GridFS, indexado por el ID del archivo.
+
+    El contenido de un archivo de GridFS no cambia, así que un video guardado en disco
+    sirve indefinidamente hasta que se desaloja por espacio o se elimina su publicación.
+    Cada video se guarda junto a un archivo ``.json`` con los metadatos necesarios para
+    responder sin consultar MongoDB. Los videos se escriben mientras se envían desde
+    GridFS, sin descargarlos otra vez, con un nombre temporal que se renombra al
+    terminar, de modo que nunca se sirve un video a medio escribir.
+    """
+
+    def __init__(self, directorio: str = DIRECTORIO_CACHE, max_bytes: int = MAX_BYTES_CACHE):
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        self._lock = Lock()
+        self._videos: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._en_progreso: Dict[str, str] = {}
+        self.aciertos = 0
+        self.fallos = 0
+        self._cargar_existentes()
+
+    def _ruta(self, video_id: str, extension: str = "") -> str:
+        """Obtiene la ruta en disco de un video o de sus metadatos."""
+        return os.path.join(self.directorio, f"{video_id}{extension}")
+
+    def _cargar_existentes(self) -> None:
+        """Recupera los videos que quedaron en disco de una ejecución anterior."""
+        os.makedirs(self.directorio, exist_ok=True)
+        encontrados = []
+        for nombre in os.listdir(self.directorio):
+            ruta = os.path.join(self.directorio, nombre)
+            if nombre.startswith("."):
+                os.remove(ruta)
+                continue
+            if not nombre.endswith(".json"):
+                continue
+
+            video_id = nombre[: -len(".json")]
+            try:
+                with open(ruta, encoding="utf-8") as archivo:
+                    metadatos = json.load(archivo)
+                uso = os.stat(self._ruta(video_id)).st_atime
+            except (OSError, ValueError):
+                self._eliminar_archivos(video_id)
+                continue
+            encontrados.append((uso, video_id, metadatos))
+
+        for _, video_id, metadatos in sorted(encontrados):
+            self._videos[video_id] = metadatos
+            self._bytes += metadatos["tamano"]
+        self._desalojar()
+
+    def _eliminar_archivos(self, video_id: str) -> None:
+        """Elimina del disco un video y sus metadatos."""
+        for extension in ("", ".json"):
+            try:
+                os.remove(self._ruta(video_id, extension))
+            except FileNotFoundError:
+                pass
+
+    def _desalojar(self) -> None:
+        """Elimina los videos usados hace más tiempo hasta respetar el espacio máximo."""
+        with self._lock:
+            desalojados = []
+            while self._bytes > self.max_bytes and self._videos:
+                video_id, metadatos = self._videos.popitem(last=False)
+                self._bytes -= metadatos["tamano"]
+                desalojados.append(video_id)
+
+        for video_id in desalojados:
+            self._eliminar_archivos(video_id)
+
+    def obtener(self, video_id: str) -> Optional[Dict[str, Any]]:
+        """Obtiene un video de la caché y lo marca como usado recientemente.
+
+        Args:
+            video_id: ID del archivo en GridFS
+
+        Returns:
+            Dict con la ruta y los metadatos del video, o None si no está en caché
+        """
+        with self._lock:
+            metadatos = self._videos.get(video_id)
+            if metadatos is None:
+                self.fallos += 1
+                return None
+            self._videos.move_to_end(video_id)
+            self.aciertos += 1
+
+        return {**metadatos, "ruta": self._ruta(video_id)}
+
+    def reservar(self, video_id: str) -> Optional[EscrituraVideo]:
+        """Reserva la escritura de un video que todavía no está en caché.
+
+        Solo una petición a la vez escribe cada video. La reserva se toma antes de abrir
+        el archivo en GridFS: si el video se descarta después, la escritura ya no se
+        publica, y si se descartó antes, el archivo ya no existe en GridFS.
+
+        Args:
+            video_id: ID del archivo en GridFS
+
+        Returns:
+            EscrituraVideo, o None si el video ya está en caché o se está escribiendo
+        """
+        with self._lock:
+            if video_id in self._videos or video_id in self._en_progreso:
+                return None
+            temporal = self._ruta(f".{video_id}.{secrets.token_hex(4)}")
+            self._en_progreso[video_id] = temporal
+
+        return EscrituraVideo(self, video_id, temporal)
+
+    def _publicar(self, video_id: str, temporal: str, metadatos: Dict[str, Any]) -> None:
+        """Mueve a la caché un video escrito completo, si su reserva sigue vigente."""
+        try:
+            with open(temporal + ".json", "w", encoding="utf-8") as archivo:
+                json.dump(metadatos, archivo)
+
+            with self._lock:
+                if self._en_progreso.get(video_id) != temporal:
+                    return
+                os.replace(temporal, self._ruta(video_id))
+                os.replace(temporal + ".json", self._ruta(video_id, ".json"))
+                self._videos[video_id] = metadatos
+                self._bytes += metadatos["tamano"]
+            self._desalojar()
+
+        except OSError as e:
+            print(f"⚠️ No se pudo guardar el video {video_id} en caché: {e}")
+
+    def _liberar(self, video_id: str, temporal: str) -> None:
+        """Termina una reserva y elimina sus archivos temporales si quedaron."""
+        with self._lock:
+            if self._en_progreso.get(video_id) == temporal:
+                del self._en_progreso[video_id]
+
+        for ruta in (temporal, temporal + ".json"):
+            try:
+                os.remove(ruta)
+            except FileNotFoundError:
+                pass
+
+    def descartar(self, video_id: str) -> None:
+        """Elimina un video de la caché, por ejemplo al eliminar su publicación.
+
+        Una escritura del video que esté en curso ya no se publicará.
+
+        Args:
+            video_id: ID del archivo en GridFS
+        """
+        with self._lock:
+            metadatos = self._videos.pop(video_id, None)
+            if metadatos is not None:
+                self._bytes -= metadatos["tamano"]
+            self._en_progreso.pop(video_id, None)
+        if metadatos is not None:
+            self._eliminar_archivos(video_id)
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """Obtiene las métricas de uso de la caché.
+
+        Returns:
+            Dict con videos, bytes ocupados, capacidad, aciertos y fallos
+        """
+        with self._lock:
+            return {
+                "videos": len(self._videos),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+            }
+
+
+video_cache_service = VideoCacheService()
@@ -0,0 +1,129 @@
+"""Caché en memoria con expiración por tiempo y desalojo LRU"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class CacheTTL:
+    """Caché acotado en tamaño cuyas entradas expiran tras un tiempo de vida.
+
+    Al superar el tamaño máximo se desaloja la entrada usada hace más tiempo. Es seguro
+    para usarse desde los hilos en los que FastAPI ejecuta los endpoints síncronos.
+
+    Para lecturas a través del caché, el llamador toma ``generacion()`` antes de leer de
+    la base de datos y la pasa a ``guardar``: si hubo una invalidación entretanto, el
+    valor leído puede estar desactualizado y no se guarda.
+    """
+
+    def __init__(self, max_entradas: int, ttl_segundos: float):
+        """Inicializa el caché vacío.
+
+        Args:
+            max_entradas: Número máximo de entradas almacenadas
+            ttl_segundos: Segundos que una entrada permanece válida
+        """
+        self.max_entradas = max_entradas
+        self.ttl_segundos = ttl_segundos
+        self._entradas: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generacion = 0
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave: Hashable, defecto: Any = None) -> Any:
+        """Obtiene el valor de una clave si sigue vigente.
+
+        Args:
+            clave: Clave buscada
+            defecto: Valor a retornar si la clave no está o expiró
+
+        Returns:
+            Valor almacenado o el valor por defecto
+        """
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None or entrada[0] < time.monotonic():
+                if entrada is not None:
+                    del self._entradas[clave]
+                self.fallos += 1
+                return defecto
+
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return entrada[1]
+
+    def consultar(self, clave: Hashable) -> Any:
+        """Obtiene el valor de una clave vigente sin marcarla como usada ni contarla.
+
+        Args:
+            clave: Clave buscada
+
+        Returns:
+            Valor almacenado, o None si la clave no está o expiró
+        """
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None or entrada[0] < time.monotonic():
+                return None
+            return entrada[1]
+
+    def generacion(self) -> int:
+        """Obtiene el contador de invalidaciones del caché.
+
+        Returns:
+            int: Generación actual
+        """
+        with self._lock:
+            return self._generacion
+
+    def guardar(self, clave: Hashable, valor: Any, generacion: Optional[int] = None) -> None:
+        """Guarda un valor, desalojando la entrada menos reciente si el caché está lleno.
+
+        Args:
+            clave: Clave del valor
+            valor: Valor a almacenar
+            generacion: Generación tomada antes de leer el valor; si hubo invalidaciones
+                desde entonces el valor no se guarda
+        """
+        with self._lock:
+            if generacion is not None and generacion != self._generacion:
+                return
+            self._entradas[clave] = (time.monotonic() + self.ttl_segundos, valor)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def invalidar(self, clave: Hashable) -> None:
+        """Elimina una clave del caché.
+
+        Args:
+            clave: Clave a eliminar
+        """
+        with self._lock:
+            self._entradas.pop(clave, None)
+            self._generacion += 1
+
+    def limpiar(self) -> None:
+        """Elimina todas las entradas del caché."""
+        with self._lock:
+            self._entradas.clear()
+            self._generacion += 1
+
+    def estadisticas(self) -> Dict[str, Optional[float]]:
+        """Obtiene las métricas de uso del caché.
+
+        Returns:
+            Dict con entradas, capacidad, aciertos, fallos y tasa de aciertos
+        """
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._entradas),
+                "max_entradas": self.max_entradas,
+                "ttl_segundos": self.ttl_segundos,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": round(self.aciertos / consultas, 4) if consultas else None,
+            }
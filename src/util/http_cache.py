@@ -0,0 +1,139 @@
+"""Utilidades para respuestas HTTP condicionales"""
+
+import hashlib
+from datetime import datetime, timezone
+from typing import Any, Optional, Union
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+
+def etag_coincide(request: Request, etag: str) -> bool:
+    """Verifica si el ETag actual está en la cabecera If-None-Match de la petición.
+
+    Args:
+        request: Petición HTTP
+        etag: ETag actual del recurso, entre comillas
+
+    Returns:
+        bool: True si el cliente ya tiene la versión actual del recurso
+    """
+    cabecera = request.headers.get("if-none-match")
+    if not cabecera:
+        return False
+
+    if cabecera.strip() == "*":
+        return True
+
+    for etiqueta in cabecera.split(","):
+        etiqueta = etiqueta.strip()
+        if etiqueta.startswith("W/"):
+            etiqueta = etiqueta[2:]
+        if etiqueta == etag:
+            return True
+
+    return False
+
+
+def etag_fuerte(contenido: bytes) -> str:
+    """Calcula un ETag fuerte a partir del contenido exacto de la respuesta.
+
+    Args:
+        contenido: Cuerpo de la respuesta
+
+    Returns:
+        str: ETag entre comillas
+    """
+    return f'"{hashlib.sha256(contenido).hexdigest()[:32]}"'
+
+
+def etag_version(recurso_id: Any, version: Optional[Union[datetime, str]]) -> Optional[str]:
+    """Calcula un ETag a partir del ID del recurso y de la fecha de su última modificación.
+
+    La fecha se usa con la precisión de milisegundos con la que la guarda MongoDB, así
+    que dos modificaciones en el mismo segundo producen ETags distintos. Permite
+    responder 304 sin leer ni serializar el recurso completo.
+
+    Args:
+        recurso_id: ID del recurso
+        version: Fecha de la última modificación como datetime o en formato ISO
+
+    Returns:
+        str: ETag entre comillas, o None si el recurso no tiene fecha de modificación
+    """
+    if version is None:
+        return None
+    if isinstance(version, str):
+        version = datetime.fromisoformat(version)
+    version = version.replace(microsecond=version.microsecond // 1000 * 1000)
+    return etag_fuerte(f"{recurso_id}:{version.isoformat()}".encode())
+
+
+def fecha_http(fecha: Union[datetime, str]) -> datetime:
+    """Convierte una fecha de GridFS a UTC con precisión de segundos.
+
+    Las fechas sin zona horaria se interpretan en UTC, que es como las devuelve pymongo.
+
+    Args:
+        fecha: Fecha como datetime o en formato ISO
+
+    Returns:
+        datetime: Fecha en UTC sin microsegundos, como la admiten las cabeceras HTTP
+    """
+    if isinstance(fecha, str):
+        fecha = datetime.fromisoformat(fecha)
+    if fecha.tzinfo is None:
+        fecha = fecha.replace(tzinfo=timezone.utc)
+    return fecha.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def respuesta_no_modificada(etag: str, cache_control: str) -> Response:
+    """Construye la respuesta 304 para un cliente que ya tiene la versión actual.
+
+    Args:
+        etag: ETag actual del recurso
+        cache_control: Valor de la cabecera Cache-Control para la ruta
+
+    Returns:
+        Response: Respuesta 304 sin cuerpo
+    """
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+def respuesta_condicional(
+    request: Request,
+    contenido: Any,
+    cache_control: str,
+    etag: Optional[str] = None,
+) -> Response:
+    """Construye una respuesta JSON con ETag y política de caché.
+
+    Si no se indica ``etag`` se calcula sobre el cuerpo serializado, así que cambia
+    exactamente cuando cambia la respuesta. Si se indica, por ejemplo con
+    ``etag_version``, el 304 se responde sin serializar el contenido. No se envía
+    Last-Modified: su precisión de segundos daría 304 con datos viejos si el recurso
+    cambia dos veces en el mismo segundo.
+
+    Args:
+        request: Petición HTTP
+        contenido: Contenido serializable a JSON
+        cache_control: Valor de la cabecera Cache-Control para la ruta
+        etag: ETag ya conocido del recurso
+
+    Returns:
+        Response: Respuesta 200 con el contenido o 304 si no cambió
+    """
+    if etag is not None and etag_coincide(request, etag):
+        return respuesta_no_modificada(etag, cache_control)
+
+    cuerpo = JSONResponse(content=contenido).body
+    if etag is None:
+        etag = etag_fuerte(cuerpo)
+        if etag_coincide(request, etag):
+            return respuesta_no_modificada(etag, cache_control)
+
+    return Response(
+        content=cuerpo,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
@@ -0,0 +1,173 @@
+"""Índice ordenado con consultas de posición en tiempo logarítmico"""
+
+import random
+from typing import Any, List, Optional, Tuple
+
+
+MAX_NIVELES = 32
+"""Número máximo de niveles de la skip list (suficiente para 2^32 elementos)."""
+
+
+class _Nodo:
+    """Nodo de la skip list."""
+
+    __slots__ = ("clave", "siguientes", "anchos")
+
+    def __init__(self, clave: Any, niveles: int):
+        self.clave = clave
+        self.siguientes: List[Optional["_Nodo"]] = [None] * niveles
+        self.anchos: List[int] = [1] * niveles
+
+
+class IndiceRanking:
+    """Skip list indexable que actúa como árbol de estadísticos de orden.
+
+    Cada enlace guarda cuántos elementos salta, lo que permite insertar, eliminar,
+    obtener la posición de una clave y la clave de una posición en O(log n) esperado.
+    Las claves deben ser comparables y únicas, por ejemplo ``(-puntuacion, usuario_id)``.
+    """
+
+    def __init__(self):
+        self._cabeza = _Nodo(None, MAX_NIVELES)
+        self._tamano = 0
+
+    def __len__(self) -> int:
+        return self._tamano
+
+    @staticmethod
+    def _nivel_aleatorio() -> int:
+        """Calcula la altura de un nodo nuevo con distribución geométrica."""
+        nivel = 1
+        while nivel < MAX_NIVELES and random.random() < 0.5:
+            nivel += 1
+        return nivel
+
+    def _buscar(self, clave: Any) -> Tuple[List[_Nodo], List[int]]:
+        """Busca los nodos que preceden a la clave en cada nivel.
+
+        Args:
+            clave: Clave buscada
+
+        Returns:
+            Tupla con el nodo previo de cada nivel y su posición (la cabeza es 0)
+        """
+        previos: List[_Nodo] = [self._cabeza] * MAX_NIVELES
+        posiciones = [0] * MAX_NIVELES
+        nodo = self._cabeza
+        posicion = 0
+
+        for nivel in reversed(range(MAX_NIVELES)):
+            siguiente = nodo.siguientes[nivel]
+            while siguiente is not None and siguiente.clave < clave:
+                posicion += nodo.anchos[nivel]
+                nodo = siguiente
+                siguiente = nodo.siguientes[nivel]
+            previos[nivel] = nodo
+            posiciones[nivel] = posicion
+
+        return previos, posiciones
+
+    def insertar(self, clave: Any) -> None:
+        """Inserta una clave en el índice.
+
+        Args:
+            clave: Clave a insertar
+        """
+        previos, posiciones = self._buscar(clave)
+        niveles = self._nivel_aleatorio()
+        nuevo = _Nodo(clave, niveles)
+        posicion = posiciones[0] + 1
+
+        for nivel in range(niveles):
+            previo = previos[nivel]
+            nuevo.siguientes[nivel] = previo.siguientes[nivel]
+            nuevo.anchos[nivel] = posiciones[nivel] + previo.anchos[nivel] + 1 - posicion
+            previo.siguientes[nivel] = nuevo
+            previo.anchos[nivel] = posicion - posiciones[nivel]
+
+        for nivel in range(niveles, MAX_NIVELES):
+            previos[nivel].anchos[nivel] += 1
+
+        self._tamano += 1
+
+    def eliminar(self, clave: Any) -> bool:
+        """Elimina una clave del índice.
+
+        Args:
+            clave: Clave a eliminar
+
+        Returns:
+            bool: True si la clave existía
+        """
+        previos, _ = self._buscar(clave)
+        nodo = previos[0].siguientes[0]
+        if nodo is None or nodo.clave != clave:
+            return False
+
+        niveles = len(nodo.siguientes)
+        for nivel in range(niveles):
+            previo = previos[nivel]
+            previo.siguientes[nivel] = nodo.siguientes[nivel]
+            previo.anchos[nivel] += nodo.anchos[nivel] - 1
+
+        for nivel in range(niveles, MAX_NIVELES):
+            previos[nivel].anchos[nivel] -= 1
+
+        self._tamano -= 1
+        return True
+
+    def contar_menores(self, clave: Any) -> int:
+        """Cuenta las claves estrictamente menores que la clave dada.
+
+        Args:
+            clave: Clave de referencia (no necesita estar en el índice)
+
+        Returns:
+            int: Número de claves menores
+        """
+        _, posiciones = self._buscar(clave)
+        return posiciones[0]
+
+    def posicion(self, clave: Any) -> Optional[int]:
+        """Obtiene la posición (desde 0) de una clave del índice.
+
+        Args:
+            clave: Clave buscada
+
+        Returns:
+            int: Posición de la clave, o None si no está en el índice
+        """
+        previos, posiciones = self._buscar(clave)
+        nodo = previos[0].siguientes[0]
+        if nodo is None or nodo.clave != clave:
+            return None
+        return posiciones[0]
+
+    def clave_en(self, posicion: int) -> Any:
+        """Obtiene la clave que ocupa una posición (desde 0) del índice.
+
+        Args:
+            posicion: Posición buscada
+
+        Returns:
+            Clave en esa posición
+
+        Raises:
+            IndexError: Si la posición está fuera del índice
+        """
+        if not 0 <= posicion < self._tamano:
+            raise IndexError("Posición fuera del índice")
+
+        objetivo = posicion + 1
+        nodo = self._cabeza
+        recorrido = 0
+        for nivel in reversed(range(MAX_NIVELES)):
+            while nodo.siguientes[nivel] is not None and recorrido + nodo.anchos[nivel] <= objetivo:
+                recorrido += nodo.anchos[nivel]
+                nodo = nodo.siguientes[nivel]
+        return nodo.clave
+
+    def limpiar(self) -> None:
+        """Elimina todas las claves del índice."""
+        self._cabeza = _Nodo(None, MAX_NIVELES)
+        self._tamano = 0
@@ -3,7 +3,7 @@
 import os
 
 from fastapi.security import OAuth2PasswordBearer
-from data.mongo import MongoDBClientSingleton
+from data.mongo import MongoDBAsyncClientSingleton, MongoDBClientSingleton
 
 
 def get_auth() -> OAuth2PasswordBearer:
@@ -29,6 +29,15 @@ def get_mongo_data(coleccion: str = "usuarios"):
     return data
 
 
+def get_async_mongo_db():
+    """Retorna la base de datos de MongoDB con el cliente asíncrono.
+
+    Returns:
+        AsyncDatabase: Base de datos para usar con await en rutas asíncronas
+    """
+    return MongoDBAsyncClientSingleton().get_database("UCOfit")
+
+
 def get_secrets() -> tuple[str, str]:
     """Retorna las claves de encriptación de datos.
 
@@ -0,0 +1,47 @@
+"""Utilidades para respuestas en streaming con formato NDJSON"""
+
+import json
+from typing import Iterable, Iterator
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+from util.json_utils import limpiar_datos_para_json
+
+
+NDJSON = "application/x-ndjson"
+"""Tipo de contenido de las respuestas con un documento JSON por línea."""
+
+
+def acepta_ndjson(request: Request) -> bool:
+    """Indica si el cliente pidió la respuesta en streaming con la cabecera Accept.
+
+    Args:
+        request: Petición HTTP
+
+    Returns:
+        bool: True si Accept incluye application/x-ndjson
+    """
+    aceptados = request.headers.get("accept", "")
+    return any(tipo.split(";")[0].strip() == NDJSON for tipo in aceptados.split(","))
+
+
+def respuesta_ndjson(documentos: Iterable[dict]) -> StreamingResponse:
+    """Serializa los documentos uno por línea a medida que se leen del cursor.
+
+    La memoria usada no depende del número de documentos y el primer byte se envía en
+    cuanto llega el primer documento, en lugar de esperar a serializar la lista completa.
+
+    Args:
+        documentos: Documentos a enviar, normalmente un cursor de pymongo
+
+    Returns:
+        StreamingResponse: Respuesta con un documento JSON por línea
+    """
+
+    def lineas() -> Iterator[bytes]:
+        for documento in documentos:
+            linea = json.dumps(limpiar_datos_para_json(documento), ensure_ascii=False)
+            yield linea.encode("utf-8") + b"\n"
+
+    return StreamingResponse(lineas(), media_type=NDJSON)
@@ -0,0 +1,84 @@
+"""Utilidades para peticiones HTTP de rangos de bytes"""
+
+from typing import Optional, Tuple
+
+from fastapi import Request
+
+
+TAMANO_BLOQUE = 1024 * 1024
+"""Número de bytes que se leen y envían en cada bloque del stream."""
+
+
+class RangoNoSatisfacible(ValueError):
+    """El rango pedido no se solapa con el archivo; se responde 416."""
+
+
+def parsear_rango(cabecera: Optional[str], tamano: int) -> Optional[Tuple[int, int]]:
+    """Interpreta la cabecera Range para un archivo de tamaño conocido.
+
+    Se admiten rangos simples (``bytes=inicio-fin``), abiertos (``bytes=inicio-``) y de
+    sufijo (``bytes=-n``). Las cabeceras mal formadas o con varios rangos se ignoran y
+    se envía el archivo completo, como permite el estándar.
+
+    Args:
+        cabecera: Valor de la cabecera Range, o None
+        tamano: Tamaño del archivo en bytes
+
+    Returns:
+        Tupla (inicio, fin) inclusiva, o None si se debe enviar el archivo completo
+
+    Raises:
+        RangoNoSatisfacible: Si el rango empieza después del final del archivo
+    """
+    if not cabecera:
+        return None
+
+    unidad, _, rangos = cabecera.partition("=")
+    if unidad.strip().lower() != "bytes" or "," in rangos:
+        return None
+
+    inicio_texto, separador, fin_texto = rangos.strip().partition("-")
+    if not separador:
+        return None
+
+    try:
+        if not inicio_texto:
+            sufijo = int(fin_texto)
+            if sufijo <= 0 or tamano == 0:
+                raise RangoNoSatisfacible(cabecera)
+            return max(tamano - sufijo, 0), tamano - 1
+
+        inicio = int(inicio_texto)
+        fin = int(fin_texto) if fin_texto else None
+    except RangoNoSatisfacible:
+        raise
+    except ValueError:
+        return None
+
+    if inicio < 0 or (fin is not None and fin < inicio):
+        return None
+    if inicio >= tamano:
+        raise RangoNoSatisfacible(cabecera)
+
+    return inicio, tamano - 1 if fin is None else min(fin, tamano - 1)
+
+
+def rango_vigente(request: Request, etag: str, ultima_modificacion: Optional[str]) -> bool:
+    """Evalúa If-Range: el rango solo se aplica si el cliente tiene la versión actual.
+
+    Args:
+        request: Petición HTTP
+        etag: ETag actual del archivo
+        ultima_modificacion: Last-Modified actual del archivo en formato HTTP
+
+    Returns:
+        bool: True si no hay If-Range o si coincide con la versión actual
+    """
+    condicion = request.headers.get("if-range")
+    if not condicion:
+        return True
+
+    condicion = condicion.strip()
+    if condicion.startswith('"'):
+        return condicion == etag
+    return ultima_modificacion is not None and condicion == ultima_modificacion
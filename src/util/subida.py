@@ -0,0 +1,277 @@
+"""Utilidades para recibir formularios con video directamente en GridFS"""
+
+import os
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from bson.objectid import ObjectId
+from dotenv import load_dotenv
+from fastapi import Request
+from gridfs.asynchronous.grid_file import AsyncGridIn
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.concurrency import run_in_threadpool
+
+from util.load_data import get_async_mongo_db
+from exceptions.custom_exceptions import FileError, ValidationError
+
+load_dotenv()
+
+
+MAX_BYTES_SUBIDA = int(os.getenv("MAX_VIDEO_SUBIDA_MB", "200")) * 1024 * 1024
+"""Tamaño máximo de un video subido."""
+
+MAX_BYTES_CAMPO = 4 * 1024
+"""Tamaño máximo de cada campo de texto del formulario."""
+
+MAX_PARTES = 10
+"""Número máximo de partes (campos y archivos) de un formulario."""
+
+TIPOS_GENERICOS = ("", "application/octet-stream")
+"""Tipos de contenido que no identifican el archivo; se guardan como video/mp4."""
+
+
+class FormularioVideo(NamedTuple):
+    """Resultado de recibir un formulario con video."""
+
+    campos: Dict[str, str]
+    """Campos de texto del formulario"""
+
+    video_id: ObjectId
+    """ID del video guardado en GridFS"""
+
+
+def formulario_openapi(
+    campo_video: str, requeridos: Sequence[str], opcionales: Sequence[str] = ()
+) -> Dict[str, Any]:
+    """Describe en OpenAPI un formulario con video que la ruta lee con ``recibir_video``.
+
+    Las rutas que leen el cuerpo por su cuenta no declaran parámetros ``Form``, así que
+    el esquema se indica explícitamente para que la documentación siga mostrándolo.
+
+    Args:
+        campo_video: Nombre del campo del video
+        requeridos: Campos de texto obligatorios
+        opcionales: Campos de texto opcionales
+
+    Returns:
+        Dict para el parámetro ``openapi_extra`` de la ruta
+    """
+    propiedades = {campo: {"type": "string"} for campo in [*requeridos, *opcionales]}
+    propiedades[campo_video] = {"type": "string", "format": "binary"}
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": propiedades,
+                        "required": [*requeridos, campo_video],
+                    }
+                }
+            },
+        }
+    }
+
+
+def _cabeceras_parte(cabeceras: List[Tuple[bytes, bytes]]) -> Tuple[str, Optional[str], str]:
+    """Obtiene el nombre, el nombre de archivo y el tipo de contenido de una parte.
+
+    Args:
+        cabeceras: Cabeceras de la parte como pares (nombre, valor)
+
+    Returns:
+        Tupla (nombre del campo, nombre de archivo o None, tipo de contenido)
+
+    Raises:
+        ValidationError: Si la parte no indica el nombre del campo
+    """
+    disposicion, tipo = b"", b""
+    for nombre, valor in cabeceras:
+        if nombre.lower() == b"content-disposition":
+            disposicion = valor
+        elif nombre.lower() == b"content-type":
+            tipo = valor
+
+    _, opciones = parse_options_header(disposicion)
+    if b"name" not in opciones:
+        raise ValidationError("Cada parte del formulario debe indicar su nombre.")
+
+    nombre_archivo = opciones.get(b"filename")
+    return (
+        opciones[b"name"].decode("utf-8", "replace"),
+        nombre_archivo.decode("utf-8", "replace") if nombre_archivo is not None else None,
+        tipo.decode("latin-1").strip().lower(),
+    )
+
+
+async def recibir_video(
+    request: Request,
+    campo_video: str,
+    campos_requeridos: Sequence[str],
+    validar: Callable[[Dict[str, str]], None],
+) -> FormularioVideo:
+    """Lee un formulario multipart/form-data y guarda su video en GridFS mientras llega.
+
+    El cuerpo se interpreta a medida que se recibe y los bytes del video se escriben
+    directamente en GridFS, sin pasar por un archivo temporal. Si los campos requeridos
+    llegan antes que el video, como envían los navegadores, se validan antes de guardar
+    ningún byte. La subida se interrumpe en cuanto el video supera MAX_BYTES_SUBIDA o no
+    es un video, y los chunks ya escritos se eliminan.
+
+    Args:
+        request: Petición HTTP con el formulario
+        campo_video: Nombre del campo del video
+        campos_requeridos: Campos de texto obligatorios
+        validar: Función que valida los campos de texto; se ejecuta en el threadpool,
+            así que puede consultar la base de datos
+
+    Returns:
+        FormularioVideo: Campos de texto e ID del video guardado
+
+    Raises:
+        ValidationError: Si el formulario no es válido o faltan campos
+        FileError: Si el video no es válido o supera el tamaño máximo
+    """
+    tipo, opciones = parse_options_header(request.headers.get("content-type", ""))
+    if tipo != b"multipart/form-data" or b"boundary" not in opciones:
+        raise ValidationError("El formulario debe enviarse como multipart/form-data.")
+
+    longitud = request.headers.get("content-length", "")
+    if longitud.isdigit() and int(longitud) > MAX_BYTES_SUBIDA + MAX_PARTES * MAX_BYTES_CAMPO:
+        raise FileError(f"El video no puede superar {MAX_BYTES_SUBIDA // (1024 * 1024)} MB.")
+
+    eventos: List[Tuple[str, object]] = []
+    cabeceras: List[Tuple[bytes, bytes]] = []
+    cabecera_actual = [b"", b""]
+
+    def on_header_field(data: bytes, inicio: int, fin: int) -> None:
+        cabecera_actual[0] += data[inicio:fin]
+
+    def on_header_value(data: bytes, inicio: int, fin: int) -> None:
+        cabecera_actual[1] += data[inicio:fin]
+
+    def on_header_end() -> None:
+        cabeceras.append((cabecera_actual[0], cabecera_actual[1]))
+        cabecera_actual[:] = [b"", b""]
+
+    def on_headers_finished() -> None:
+        eventos.append(("inicio", list(cabeceras)))
+        cabeceras.clear()
+
+    def on_part_data(data: bytes, inicio: int, fin: int) -> None:
+        eventos.append(("datos", data[inicio:fin]))
+
+    def on_part_end() -> None:
+        eventos.append(("fin", None))
+
+    def on_end() -> None:
+        eventos.append(("cierre", None))
+
+    parser = MultipartParser(
+        opciones[b"boundary"],
+        {
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+            "on_part_data": on_part_data,
+            "on_part_end": on_part_end,
+            "on_end": on_end,
+        },
+    )
+
+    campos: Dict[str, str] = {}
+    partes = 0
+    nombre_parte: Optional[str] = None
+    valor_parte = bytearray()
+    grid_in: Optional[AsyncGridIn] = None
+    en_video = False
+    tamano_video = 0
+    validado = False
+    campos_sin_validar = False
+    completo = False
+
+    async def procesar_eventos() -> None:
+        nonlocal partes, nombre_parte, grid_in, en_video, tamano_video
+        nonlocal validado, campos_sin_validar, completo
+
+        for evento, valor in eventos:
+            if evento == "inicio":
+                partes += 1
+                if partes > MAX_PARTES:
+                    raise ValidationError("El formulario tiene demasiados campos.")
+
+                nombre_parte, nombre_archivo, tipo_parte = _cabeceras_parte(valor)
+                en_video = nombre_parte == campo_video and nombre_archivo is not None
+                valor_parte.clear()
+                if not en_video:
+                    continue
+
+                if grid_in is not None:
+                    raise ValidationError("Solo se puede subir un video.")
+                if tipo_parte not in TIPOS_GENERICOS and not tipo_parte.startswith("video/"):
+                    raise FileError("El archivo debe ser un video.")
+
+                if all(campo in campos for campo in campos_requeridos):
+                    await run_in_threadpool(validar, dict(campos))
+                    validado = True
+
+                grid_in = AsyncGridIn(
+                    get_async_mongo_db()["fs"],
+                    filename=nombre_archivo,
+                    content_type=tipo_parte if tipo_parte.startswith("video/") else "video/mp4",
+                )
+
+            elif evento == "datos":
+                if en_video:
+                    tamano_video += len(valor)
+                    if tamano_video > MAX_BYTES_SUBIDA:
+                        raise FileError(
+                            f"El video no puede superar {MAX_BYTES_SUBIDA // (1024 * 1024)} MB."
+                        )
+                    await grid_in.write(valor)
+                else:
+                    valor_parte.extend(valor)
+                    if len(valor_parte) > MAX_BYTES_CAMPO:
+                        raise ValidationError(f"El campo {nombre_parte} es demasiado largo.")
+
+            elif evento == "cierre":
+                completo = True
+
+            elif not en_video:
+                try:
+                    campos[nombre_parte] = valor_parte.decode("utf-8")
+                except UnicodeDecodeError as e:
+                    raise ValidationError(f"El campo {nombre_parte} no es texto válido.") from e
+                campos_sin_validar = validado
+
+        eventos.clear()
+
+    try:
+        try:
+            async for chunk in request.stream():
+                parser.write(chunk)
+                await procesar_eventos()
+            parser.finalize()
+            await procesar_eventos()
+        except MultipartParseError as e:
+            raise ValidationError("El formulario multipart/form-data está mal formado.") from e
+        if not completo:
+            raise ValidationError("El formulario llegó incompleto.")
+
+        if grid_in is None:
+            raise ValidationError(f"Debe adjuntar el archivo en el campo {campo_video}.")
+        faltantes = [campo for campo in campos_requeridos if campo not in campos]
+        if faltantes:
+            raise ValidationError(f"Faltan campos obligatorios: {', '.join(faltantes)}.")
+        if not validado or campos_sin_validar:
+            await run_in_threadpool(validar, dict(campos))
+
+        await grid_in.close()
+        return FormularioVideo(campos=campos, video_id=grid_in._id)
+
+    except Exception:
+        if grid_in is not None and not grid_in.closed:
+            await grid_in.abort()
+        raise
@@ -0,0 +1,124 @@
+"""Estructura para mantener las K mejores entradas de un conjunto"""
+
+import heapq
+from typing import Any, Dict, List, Tuple
+
+
+class TopK:
+    """Mantiene las K entradas con mayor puntuación usando un min-heap.
+
+    La raíz del heap es la peor entrada del top, de modo que decidir si una entrada nueva
+    entra al top y desplazar a la última cuesta O(log K). En empates gana la entrada con
+    el ID menor (la más antigua para ObjectIds), igual que en las consultas a MongoDB.
+
+    Cuando una entrada del top baja su puntuación mientras hay entradas fuera del top,
+    la estructura ya no puede saber quién ocupa su lugar; en ese caso las operaciones
+    retornan False y el llamador debe volver a cargarla desde la base de datos.
+    """
+
+    def __init__(self, k: int, entradas: List[Tuple[str, float, dict]], hay_mas: bool):
+        """Inicializa el top con entradas ya ordenadas o no.
+
+        Args:
+            k: Número máximo de entradas del top
+            entradas: Tuplas (id, puntuación, datos) del top actual
+            hay_mas: True si existen entradas fuera del top
+        """
+        self.k = k
+        self.hay_mas = hay_mas
+        self._entradas: Dict[str, Tuple[float, dict]] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        for entrada_id, puntuacion, datos in entradas:
+            self._entradas[entrada_id] = (puntuacion, datos)
+        self._reconstruir_heap()
+
+    @staticmethod
+    def _orden(entrada_id: str) -> int:
+        """Convierte el ID hexadecimal en un entero que desempata en el heap."""
+        return -int(entrada_id, 16)
+
+    def _reconstruir_heap(self) -> None:
+        """Reconstruye el heap a partir de las entradas actuales."""
+        self._heap = [
+            (puntuacion, self._orden(entrada_id), entrada_id)
+            for entrada_id, (puntuacion, _) in self._entradas.items()
+        ]
+        heapq.heapify(self._heap)
+
+    def actualizar(self, entrada_id: str, puntuacion: float, datos: dict) -> bool:
+        """Inserta o actualiza una entrada.
+
+        Args:
+            entrada_id: ID hexadecimal de la entrada
+            puntuacion: Nueva puntuación de la entrada
+            datos: Datos de la entrada que se devuelven en el top
+
+        Returns:
+            bool: False si el top dejó de ser confiable y debe recargarse
+        """
+        anterior = self._entradas.get(entrada_id)
+        if anterior is not None:
+            if puntuacion < anterior[0] and self.hay_mas:
+                return False
+            self._entradas[entrada_id] = (puntuacion, datos)
+            self._reconstruir_heap()
+            return True
+
+        if len(self._entradas) < self.k:
+            if self.hay_mas:
+                return False
+            self._entradas[entrada_id] = (puntuacion, datos)
+            heapq.heappush(self._heap, (puntuacion, self._orden(entrada_id), entrada_id))
+            return True
+
+        nuevo = (puntuacion, self._orden(entrada_id), entrada_id)
+        self.hay_mas = True
+        if nuevo > self._heap[0]:
+            _, _, desplazado = heapq.heapreplace(self._heap, nuevo)
+            del self._entradas[desplazado]
+            self._entradas[entrada_id] = (puntuacion, datos)
+        return True
+
+    def eliminar(self, entrada_id: str) -> bool:
+        """Elimina una entrada del top.
+
+        Args:
+            entrada_id: ID hexadecimal de la entrada
+
+        Returns:
+            bool: False si el top dejó de ser confiable y debe recargarse
+        """
+        if entrada_id not in self._entradas:
+            return True
+        if self.hay_mas:
+            return False
+
+        del self._entradas[entrada_id]
+        self._reconstruir_heap()
+        return True
+
+    def contiene(self, entrada_id: str) -> bool:
+        """Indica si una entrada forma parte del top.
+
+        Args:
+            entrada_id: ID hexadecimal de la entrada
+
+        Returns:
+            bool: True si la entrada está en el top
+        """
+        return entrada_id in self._entradas
+
+    def ordenados(self, n: int) -> List[Tuple[str, float, Any]]:
+        """Obtiene las n mejores entradas de mayor a menor puntuación.
+
+        Args:
+            n: Número de entradas
+
+        Returns:
+            Lista de tuplas (id, puntuación, datos)
+        """
+        mejores = heapq.nlargest(n, self._heap)
+        return [
+            (entrada_id, puntuacion, self._entradas[entrada_id][1])
+            for puntuacion, _, entrada_id in mejores
+        ]